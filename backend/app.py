@@ -4,23 +4,67 @@ Main application with CORS support for React frontend.
 All endpoints designed for MCP/AI agent integration.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, has_request_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from decimal import Decimal
-import mysql.connector
-from mysql.connector import Error
 import json
+import base64
 from datetime import datetime
 import os
 import copy
+import csv
+import hmac
+import io
+from itertools import islice
 
 # Import services
 from services.simple_simulation_engine import SimpleSimulationEngine, SimpleDebt
+from services.amortization import DebtAmortization
 from services.avalanche_strategy import AvalancheStrategy
 from services.snowball_strategy import SnowballStrategy
 from services.hybrid_strategy import HybridStrategy
+from services.order_search import CustomOrderSearch
+from services.goal_seek import GoalSeekSolver
+from services.consolidation_analysis import ConsolidationAnalyzer
+from services.payment_schedule import PaymentSchedule
+from services.plan_trajectory import PlanTrajectory, add_months
+from services.ledger_codec import LedgerCodec, LedgerReader
+from services.payment_import import PaymentImporter
+from services.user_partitions import UserPartitions
+from services.repository import create_repository, simple_debt, RepositoryUnavailable
+from services.commitment_timeline import CommitmentTimeline
+from services.request_metrics import RequestMetrics, PhaseTimer, TimedRepository
+from services.engine_profiler import EngineProfiler
+from services.stack_sampler import StackSampler
+from services.allocation_tracker import AllocationTracker, MB
+from services.tracing import tracer, RotatingFileExporter
+
+
+def current_timer():
+    """PhaseTimer of the request being served, or None."""
+    return g.get('timer') if has_request_context() else None
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that books response encoding into the request's `serialize`
+    phase, and shows the payload to the allocation tracker before encoding it.
+    """
+    
+    def response(self, *args, **kwargs):
+        if has_request_context() and g.get('tracking_allocations'):
+            allocation_tracker.capture(args[0] if len(args) == 1 else (args or kwargs))
+        timer = current_timer()
+        with tracer.span('serialize'):
+            if timer is None:
+                return super().response(*args, **kwargs)
+            with timer.phase('serialize'):
+                return super().response(*args, **kwargs)
+
 
 app = Flask(__name__)
+app.json = TimedJSONProvider(app)
 CORS(app)  # Enable CORS for React frontend
 
 # Database configuration
@@ -29,84 +73,394 @@ DB_CONFIG = {
     'port': int(os.getenv('MYSQL_PORT', 3306)),
     'user': os.getenv('MYSQL_USER', 'financial_user'),
     'password': os.getenv('MYSQL_PASSWORD', 'financial_pass'),
-    'database': os.getenv('MYSQL_DB', 'financial_freedom')
+    'database': os.getenv('MYSQL_DB', 'financial_freedom'),
+    'connection_timeout': int(os.getenv('MYSQL_CONNECT_TIMEOUT', 5))
 }
 
+# Per-endpoint counts and phase timings served at /metrics (REQUEST_METRICS=0 turns them off)
+request_metrics = RequestMetrics() if os.getenv('REQUEST_METRICS', '1') != '0' else None
+
+# Sampling profiler of request threads, switched on at runtime via /api/admin/profiler
+# (or from startup with STACK_SAMPLER=1)
+stack_sampler = StackSampler()
+if os.getenv('STACK_SAMPLER') == '1':
+    stack_sampler.start()
+
+# Token required by the /api/admin endpoints; without one they are disabled
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
+# tracemalloc report per endpoint, switched on via /api/admin/allocations (or ALLOCATION_TRACKING=1,
+# which like the endpoint needs ADMIN_TOKEN); requests peaking above MEMORY_BUDGET_MB are logged.
+# Tracking serializes requests, so it stops by itself after a number of requests or seconds
+allocation_tracker = AllocationTracker(int(float(os.getenv('MEMORY_BUDGET_MB', 50)) * MB), log=app.logger.warning,
+                                       max_requests=int(os.getenv('ALLOCATION_TRACKING_REQUESTS', 1000)),
+                                       max_seconds=float(os.getenv('ALLOCATION_TRACKING_SECONDS', 600)))
+if os.getenv('ALLOCATION_TRACKING') == '1':
+    if ADMIN_TOKEN:
+        allocation_tracker.start()
+    else:
+        app.logger.warning('ALLOCATION_TRACKING ignored: ADMIN_TOKEN is not set')
+
+# Request traces as OpenTelemetry JSON lines, written when TRACE_FILE is set
+if os.getenv('TRACE_FILE'):
+    tracer.configure(
+        RotatingFileExporter(os.getenv('TRACE_FILE'),
+                             max_bytes=int(float(os.getenv('TRACE_FILE_MAX_MB', 10)) * MB),
+                             backups=int(os.getenv('TRACE_FILE_BACKUPS', 5))),
+        sample_rate=float(os.getenv('TRACE_SAMPLE_RATE', 1.0))
+    )
+
+# Storage: 'mysql', or 'memory' to serve without a database (see services/repository.py)
+repository = create_repository(os.getenv('REPOSITORY', 'mysql'), DB_CONFIG)
+if request_metrics or tracer.enabled:
+    repository = TimedRepository(repository, current_timer)
+
+# User for requests without an X-User-Id header (single-household installs)
+DEFAULT_USER_ID = int(os.getenv('DEFAULT_USER_ID', 1))
+
+# X-User-Id is not authenticated here: it is only honoured when the API sits behind a proxy
+# that authenticates the caller and sets the header itself (TRUST_USER_HEADER=1)
+TRUST_USER_HEADER = os.getenv('TRUST_USER_HEADER') == '1'
+
 # Initialize services
-simulation_engine = SimpleSimulationEngine()
+# Engines and solvers hold the portfolio they work on, so each request builds its own
+# (cheap: the per-portfolio constants are cached in services/compiled_portfolio.py)
 avalanche_strategy = AvalancheStrategy()
 snowball_strategy = SnowballStrategy()
 hybrid_strategy = HybridStrategy()
+plan_trajectory = PlanTrajectory()
+ledger_codec = LedgerCodec()
 
+# Last portfolio read for each user, served (marked stale) while the database is unavailable
+portfolio_cache = UserPartitions(dict)
+
+
+def route_rule():
+    """The URL rule the request matched (e.g. /api/debts/<int:debt_id>), for per-endpoint stats."""
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+@app.before_request
+def start_trace():
+    """Open the request's root span if tracing is on and the request is sampled."""
+    g.trace_span = tracer.start_trace(
+        f'{request.method} {route_rule()}',
+        {'http.method': request.method, 'http.route': route_rule(), 'http.target': request.full_path.rstrip('?')},
+        request.headers.get('traceparent')
+    )
+
+
+@app.teardown_request
+def end_trace(error=None):
+    """Close and export the request's trace; registered first so its teardown runs last."""
+    tracer.end_trace(g.pop('trace_span', None), error)
+
+
+@app.before_request
+def start_timer():
+    """Start timing the request's phases."""
+    if request_metrics:
+        g.timer = PhaseTimer()
+
+
+@app.before_request
+def track_request_thread():
+    """Let the stack sampler see this thread while it serves the request."""
+    if stack_sampler.running:
+        stack_sampler.track()
+
+
+@app.teardown_request
+def untrack_request_thread(error=None):
+    stack_sampler.untrack()
+
+
+@app.before_request
+def begin_allocation_tracking():
+    """While allocation tracking is on, trace this request alone (requests are serialized)."""
+    g.tracking_allocations = allocation_tracker.begin()
 
-def get_db_connection():
-    """Get database connection."""
-    try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        return connection
-    except Error as e:
-        print(f"Database connection error: {e}")
-        return None
 
+@app.teardown_request
+def end_allocation_tracking(error=None):
+    if g.pop('tracking_allocations', False):
+        allocation_tracker.end(f'{request.method} {route_rule()}')
 
-def debt_from_row(row):
-    """Convert database row to SimpleDebt object."""
+
+@app.after_request
+def record_metrics(response):
+    """Record the request's phase timings; registered first so it runs after the other hooks."""
+    span = g.get('trace_span')
+    if span is not None:
+        span.set_attribute('http.status_code', response.status_code)
+        if 'user_id' in g:
+            span.set_attribute('enduser.id', str(g.user_id))
+        if response.status_code >= 500:
+            span.error = f'HTTP {response.status_code}'
+        response.headers['traceparent'] = f'00-{span.trace.trace_id}-{span.span_id}-01'
+    
+    timer = g.pop('timer', None)
+    if timer is not None:
+        total, phases = timer.finish()
+        request_metrics.observe(route_rule(), request.method, response.status_code, total, phases)
+    return response
+
+
+@app.before_request
+def resolve_user():
+    """Scope the request to the user named in the X-User-Id header."""
+    value = request.headers.get('X-User-Id')
+    if value is None:
+        g.user_id = DEFAULT_USER_ID
+        return
+    if not TRUST_USER_HEADER:
+        return jsonify({'error': 'X-User-Id is only accepted behind an authenticating proxy'}), 403
+    try:
+        g.user_id = int(value)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid X-User-Id header'}), 400
+
+
+@app.after_request
+def annotate_response(response):
+    """
+    Add request-level annotations to a JSON object response: the stale flag
+    when it was computed from a cached portfolio while the database was
+    unavailable, and the engine profile when one was requested.
+    """
+    stale_since = g.get('stale_since')
+    profiler = g.get('engine_profiler')
+    if stale_since is None and profiler is None:
+        return response
+    
+    data = response.get_json(silent=True)
+    if isinstance(data, dict):
+        if stale_since is not None:
+            data['stale'] = True
+            data['stale_since'] = stale_since
+        if profiler is not None:
+            data['profile'] = profiler.to_dict()
+        response.set_data(app.json.dumps(data))
+    if stale_since is not None:
+        response.headers['Warning'] = '110 - "Response is Stale"'
+    return response
+
+
+def debt_from_dict(data, default_id=None):
+    """Convert a debt supplied in a request body to a SimpleDebt object."""
     # Convert APR from percentage to decimal if it's > 1
-    apr_value = Decimal(str(row[3]))
+    apr_value = Decimal(str(data['apr']))
     if apr_value > 1:
         apr_value = apr_value / Decimal('100')
     
     return SimpleDebt(
-        debt_id=row[0],
-        name=row[1],
-        principal=Decimal(str(row[2])),
+        debt_id=data.get('id', default_id),
+        name=data.get('name', f'Debt {default_id}'),
+        principal=Decimal(str(data['principal'])),
         apr=apr_value,
-        min_payment=Decimal(str(row[4]))
+        min_payment=Decimal(str(data['min_payment'])),
+        compounding=data.get('compounding', 'monthly'),
+        payment_frequency=data.get('payment_frequency', 'monthly')
     )
 
 
+DEBT_FIELDS = ['name', 'principal', 'apr', 'min_payment', 'payment_frequency', 'compounding', 'notes']
+MAX_BULK_ITEMS = 500
+DEBT_LIST_COLUMNS = ['id', 'name', 'principal', 'apr', 'min_payment', 'payment_frequency',
+                     'compounding', 'start_date', 'status', 'notes', 'created_at']
+PAYMENT_LIST_COLUMNS = ['id', 'debt_id', 'amount', 'payment_date', 'source', 'notes', 'created_at']
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+MAX_AMORTIZATION_MONTHS = 600
+MAX_SEARCH_NODES = int(os.getenv('MAX_SEARCH_NODES', 200000))
+MAX_TRACKED_REQUESTS = 100000
+MAX_TRACKED_SECONDS = 86400
+
+
+def bulk_results(errors):
+    """Per-item validation results for a rejected bulk request."""
+    return [
+        {'index': i, 'status': 'invalid', 'error': error} if error else {'index': i, 'status': 'valid'}
+        for i, error in enumerate(errors)
+    ]
+
+
+def validate_debt(data, partial=False):
+    """Return the first problem with a debt payload, or None if it is valid."""
+    if not isinstance(data, dict):
+        return 'Debt must be an object'
+    
+    if not partial:
+        for field in ['name', 'principal', 'apr', 'min_payment']:
+            if field not in data:
+                return f'Missing required field: {field}'
+    
+    for field in ['principal', 'apr', 'min_payment']:
+        if field in data and (isinstance(data[field], bool) or not isinstance(data[field], (int, float))):
+            return f'{field} must be a number'
+    
+    if 'principal' in data and data['principal'] <= 0:
+        return 'Principal must be positive'
+    if 'apr' in data and not (0 <= data['apr'] <= 100):
+        return 'APR must be between 0 and 100'
+    if 'min_payment' in data and data['min_payment'] <= 0:
+        return 'Minimum payment must be positive'
+    if data.get('payment_frequency', 'monthly') not in ('monthly', 'weekly'):
+        return 'Payment frequency must be monthly or weekly'
+    if data.get('compounding', 'monthly') not in ('monthly', 'daily', 'none'):
+        return 'Compounding must be monthly, daily or none'
+    return None
+
+
+def load_portfolio(data):
+    """
+    Debts for a calculation: the request's inline `debts` list if it has one,
+    otherwise the user's active debts from the repository.
+    
+    Inline debts need principal, apr and min_payment; id and name default to
+    their position. Raises ValueError if the list is invalid.
+    """
+    inline = (data or {}).get('debts')
+    if inline is None:
+        return load_active_debts()
+    
+    if not isinstance(inline, list) or len(inline) > MAX_BULK_ITEMS:
+        raise ValueError(f'debts must be a list of at most {MAX_BULK_ITEMS} debts')
+    for index, item in enumerate(inline):
+        error = validate_debt(item, partial=True) or next(
+            (f'Missing required field: {field}' for field in ('principal', 'apr', 'min_payment') if field not in item),
+            None
+        )
+        if error:
+            raise ValueError(f'debts[{index}]: {error}')
+    
+    debts = [debt_from_dict(item, index) for index, item in enumerate(inline, start=1)]
+    if len({debt.id for debt in debts}) != len(debts):
+        raise ValueError('Inline debt ids must be unique')
+    return debts
+
+
+def load_active_debts():
+    """
+    The user's active debts. While the database is unavailable the last
+    portfolio read for the user is returned instead and the response is
+    marked stale; without one RepositoryUnavailable propagates.
+    
+    The cache keeps each debt's stored values as an immutable tuple, so the
+    common path costs one small tuple per debt, and debts are only rebuilt
+    from it when it is actually served.
+    """
+    cache = portfolio_cache.get(g.user_id)
+    try:
+        debts = repository.active_debts(g.user_id)
+    except RepositoryUnavailable:
+        if 'debts' not in cache:
+            raise
+        g.stale_since = cache['fetched_at']
+        return [SimpleDebt(*row) for row in cache['debts']]
+    
+    cache['debts'] = tuple((debt.id, debt.name, debt.principal, debt.apr, debt.min_payment,
+                            debt.compounding, debt.payment_frequency) for debt in debts)
+    cache['fetched_at'] = datetime.now().isoformat(timespec='seconds')
+    return debts
+
+
+def request_engine():
+    """
+    A simulation engine for this request alone. When the request sets
+    `profile` (body `true` or `?profile=true`) it is built with the request's
+    EngineProfiler; every engine the request builds shares that profiler, and
+    its counters are returned next to the result as `profile`.
+    """
+    data = request.get_json(silent=True)
+    wanted = request.args.get('profile') == 'true' or (isinstance(data, dict) and data.get('profile') is True)
+    if wanted and 'engine_profiler' not in g:
+        g.engine_profiler = EngineProfiler()
+    return SimpleSimulationEngine(profiler=g.engine_profiler if wanted else None)
+
+
+def load_schedule(data, debts):
+    """
+    Compile the request's `schedule` for `debts`. With `use_commitments`, the
+    user's commitment history is resolved into schedule events ahead of it.
+    
+    Returns (schedule, timeline); timeline is None unless commitments were used.
+    Raises ValueError if an event names a debt that isn't in the plan.
+    """
+    events = list(data.get('schedule') or [])
+    timeline = None
+    if data.get('use_commitments'):
+        timeline = CommitmentTimeline(repository.list_commitments(g.user_id))
+        events = timeline.events(debts) + events
+    return PaymentSchedule.from_request(events, debts), timeline
+
+
+def encode_cursor(sort_value, row_id):
+    """Opaque keyset cursor for the last row of a page."""
+    raw = json.dumps([json_value(sort_value), row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(token):
+    """Decode a keyset cursor into its (sort value, id) pair, or None."""
+    if not token:
+        return None
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+
+def page_args(columns, paginate=True):
+    """
+    Parse limit, cursor and field projection for a keyset-paginated listing. With
+    paginate=False a request naming neither limit nor cursor gets every row (limit None).
+    """
+    if not paginate and 'limit' not in request.args and 'cursor' not in request.args:
+        limit = None
+    else:
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    
+    fields = request.args.get('fields')
+    fields = [field.strip() for field in fields.split(',')] if fields else list(columns)
+    unknown = set(fields) - set(columns)
+    if unknown:
+        raise ValueError(f'Unknown fields: {sorted(unknown)}')
+    
+    return limit, decode_cursor(request.args.get('cursor')), fields
+
+
+def json_value(value):
+    """Convert a database value for a JSON response."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
 # ============================================================================
 # DEBT MANAGEMENT ENDPOINTS
 # ============================================================================
 
 @app.route('/api/debts', methods=['GET'])
 def get_debts():
-    """Get all debts for the user."""
+    """Get the user's debts, newest first: all of them, or keyset pages when limit or cursor is given."""
     try:
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, start_date, status, notes, created_at
-            FROM debts 
-            WHERE user_id IS NULL OR user_id = 1
-            ORDER BY created_at DESC
-        """)
-        
-        rows = cursor.fetchall()
-        debts = []
-        for row in rows:
-            debts.append({
-                'id': row[0],
-                'name': row[1],
-                'principal': float(row[2]),
-                'apr': float(row[3]),
-                'min_payment': float(row[4]),
-                'payment_frequency': row[5],
-                'compounding': row[6],
-                'start_date': row[7].isoformat() if row[7] else None,
-                'status': row[8],
-                'notes': row[9],
-                'created_at': row[10].isoformat() if row[10] else None
-            })
+        try:
+            # Unpaginated by default, so existing clients that read only `debts` still get every debt
+            limit, after, fields = page_args(DEBT_LIST_COLUMNS, paginate=False)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        rows, next_key = repository.list_debts(g.user_id, fields, limit, after)
         
-        cursor.close()
-        connection.close()
+        debts = [{field: json_value(value) for field, value in row.items()} for row in rows]
+        next_cursor = encode_cursor(*next_key) if next_key else None
         
-        return jsonify({'debts': debts})
+        return jsonify({'debts': debts, 'next_cursor': next_cursor})
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -118,43 +472,12 @@ def create_debt():
     try:
         data = request.get_json()
         
-        # Validate required fields
-        required_fields = ['name', 'principal', 'apr', 'min_payment']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
-        
-        # Validate data types and ranges
-        if data['principal'] <= 0:
-            return jsonify({'error': 'Principal must be positive'}), 400
-        if not (0 <= data['apr'] <= 100):
-            return jsonify({'error': 'APR must be between 0 and 100'}), 400
-        if data['min_payment'] <= 0:
-            return jsonify({'error': 'Minimum payment must be positive'}), 400
-        
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            INSERT INTO debts (name, principal, apr, min_payment, payment_frequency, 
-                             compounding, notes)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """, (
-            data['name'],
-            data['principal'],
-            data['apr'],
-            data['min_payment'],
-            data.get('payment_frequency', 'monthly'),
-            data.get('compounding', 'monthly'),
-            data.get('notes', '')
-        ))
-        
-        debt_id = cursor.lastrowid
-        connection.commit()
-        cursor.close()
-        connection.close()
+        # Validate required fields, data types and ranges
+        error = validate_debt(data)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        debt_id = repository.create_debts(g.user_id, [data])[0]
         
         return jsonify({
             'message': 'Debt created successfully',
@@ -165,42 +488,117 @@ def create_debt():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/debts/bulk', methods=['POST'])
+def create_debts_bulk():
+    """Create many debts in one transaction; nothing is written unless every item is valid."""
+    try:
+        data = request.get_json() or {}
+        items = data.get('debts')
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'debts must be a non-empty list'}), 400
+        if len(items) > MAX_BULK_ITEMS:
+            return jsonify({'error': f'At most {MAX_BULK_ITEMS} debts per request'}), 400
+        
+        errors = [validate_debt(item) for item in items]
+        if any(errors):
+            return jsonify({'error': 'Validation failed', 'results': bulk_results(errors)}), 400
+        
+        debt_ids = repository.create_debts(g.user_id, items)
+        
+        return jsonify({
+            'message': f'{len(items)} debts created successfully',
+            'results': [
+                {'index': i, 'status': 'created', 'debt_id': debt_id}
+                for i, debt_id in enumerate(debt_ids)
+            ]
+        }), 201
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/debts/bulk', methods=['PUT'])
+def update_debts_bulk():
+    """Update many debts in one transaction; each item carries its id and the fields to change."""
+    try:
+        data = request.get_json() or {}
+        items = data.get('debts')
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'debts must be a non-empty list'}), 400
+        if len(items) > MAX_BULK_ITEMS:
+            return jsonify({'error': f'At most {MAX_BULK_ITEMS} debts per request'}), 400
+        
+        errors = []
+        for item in items:
+            error = validate_debt(item, partial=True)
+            if not error and not isinstance(item.get('id'), int):
+                error = 'Missing debt id'
+            elif not error and not any(field in item for field in DEBT_FIELDS):
+                error = 'No fields to update'
+            errors.append(error)
+        ids = [item['id'] for item, error in zip(items, errors) if not error]
+        if len(set(ids)) != len(ids):
+            return jsonify({'error': 'Each debt may appear only once'}), 400
+        if any(errors):
+            return jsonify({'error': 'Validation failed', 'results': bulk_results(errors)}), 400
+        
+        # Nothing is changed unless the user owns every debt
+        missing = set(repository.update_debts(g.user_id, items))
+        if missing:
+            errors = ['Debt not found' if item['id'] in missing else None for item in items]
+            return jsonify({'error': 'Validation failed', 'results': bulk_results(errors)}), 400
+        
+        return jsonify({
+            'message': f'{len(items)} debts updated successfully',
+            'results': [
+                {'index': i, 'status': 'updated', 'debt_id': item['id']}
+                for i, item in enumerate(items)
+            ]
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/debts/bulk', methods=['DELETE'])
+def delete_debts_bulk():
+    """Delete many debts in one transaction."""
+    try:
+        data = request.get_json() or {}
+        ids = data.get('ids')
+        
+        if not isinstance(ids, list) or not ids:
+            return jsonify({'error': 'ids must be a non-empty list'}), 400
+        if len(ids) > MAX_BULK_ITEMS:
+            return jsonify({'error': f'At most {MAX_BULK_ITEMS} debts per request'}), 400
+        if not all(isinstance(debt_id, int) and not isinstance(debt_id, bool) for debt_id in ids):
+            return jsonify({'error': 'ids must be integers'}), 400
+        
+        deleted = repository.delete_debts(g.user_id, ids)
+        
+        return jsonify({
+            'message': f'{len(deleted)} debts deleted successfully',
+            'results': [
+                {'index': i, 'status': 'deleted' if debt_id in deleted else 'not_found', 'debt_id': debt_id}
+                for i, debt_id in enumerate(ids)
+            ]
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/debts/<int:debt_id>', methods=['GET'])
 def get_debt(debt_id):
     """Get a specific debt by ID."""
     try:
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, start_date, status, notes, created_at
-            FROM debts 
-            WHERE id = %s
-        """, (debt_id,))
-        
-        row = cursor.fetchone()
+        row = repository.get_debt(g.user_id, debt_id)
         if not row:
             return jsonify({'error': 'Debt not found'}), 404
         
-        debt = {
-            'id': row[0],
-            'name': row[1],
-            'principal': float(row[2]),
-            'apr': float(row[3]),
-            'min_payment': float(row[4]),
-            'payment_frequency': row[5],
-            'compounding': row[6],
-            'start_date': row[7].isoformat() if row[7] else None,
-            'status': row[8],
-            'notes': row[9],
-            'created_at': row[10].isoformat() if row[10] else None
-        }
-        
-        cursor.close()
-        connection.close()
+        debt = {field: json_value(row[field]) for field in DEBT_LIST_COLUMNS}
         
         return jsonify({'debt': debt})
     
@@ -215,43 +613,16 @@ def update_debt(debt_id):
         data = request.get_json()
         
         # Validate data if provided
-        if 'principal' in data and data['principal'] <= 0:
-            return jsonify({'error': 'Principal must be positive'}), 400
-        if 'apr' in data and not (0 <= data['apr'] <= 100):
-            return jsonify({'error': 'APR must be between 0 and 100'}), 400
-        if 'min_payment' in data and data['min_payment'] <= 0:
-            return jsonify({'error': 'Minimum payment must be positive'}), 400
-        
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
+        error = validate_debt(data, partial=True)
+        if error:
+            return jsonify({'error': error}), 400
         
-        cursor = connection.cursor()
-        
-        # Build dynamic update query
-        update_fields = []
-        values = []
-        
-        for field in ['name', 'principal', 'apr', 'min_payment', 'payment_frequency', 'compounding', 'notes']:
-            if field in data:
-                update_fields.append(f"{field} = %s")
-                values.append(data[field])
-        
-        if not update_fields:
+        if not any(field in data for field in DEBT_FIELDS):
             return jsonify({'error': 'No fields to update'}), 400
         
-        values.append(debt_id)
-        query = f"UPDATE debts SET {', '.join(update_fields)} WHERE id = %s"
-        
-        cursor.execute(query, values)
-        
-        if cursor.rowcount == 0:
+        if not repository.update_debt(g.user_id, debt_id, data):
             return jsonify({'error': 'Debt not found'}), 404
         
-        connection.commit()
-        cursor.close()
-        connection.close()
-        
         return jsonify({'message': 'Debt updated successfully'})
     
     except Exception as e:
@@ -262,21 +633,80 @@ def update_debt(debt_id):
 def delete_debt(debt_id):
     """Delete a debt."""
     try:
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("DELETE FROM debts WHERE id = %s", (debt_id,))
+        if not repository.delete_debts(g.user_id, [debt_id]):
+            return jsonify({'error': 'Debt not found'}), 404
         
-        if cursor.rowcount == 0:
+        return jsonify({'message': 'Debt deleted successfully'})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def amortization_row(row):
+    """Convert an amortization month for a JSON response."""
+    return {field: json_value(value) for field, value in row.items()}
+
+
+@app.route('/api/debts/<int:debt_id>/amortization', methods=['GET'])
+def get_debt_amortization(debt_id):
+    """
+    Amortization schedule of one debt at a constant payment (its minimum, or ?payment=).
+    
+    ?month=YYYY-MM returns that calendar month alone, computed in closed form
+    without simulating the months before it; otherwise ?from= (plan month,
+    default 1) and ?limit= page through the schedule.
+    """
+    try:
+        row = repository.get_debt(g.user_id, debt_id)
+        if not row:
             return jsonify({'error': 'Debt not found'}), 404
         
-        connection.commit()
-        cursor.close()
-        connection.close()
+        limit = request.args.get('limit', 120, type=int)
+        month_from = request.args.get('from', 1, type=int)
+        month = request.args.get('month')
+        payment = request.args.get('payment')
+        if not 1 <= limit <= MAX_AMORTIZATION_MONTHS:
+            return jsonify({'error': f'limit must be between 1 and {MAX_AMORTIZATION_MONTHS}'}), 400
+        try:
+            payment = Decimal(payment) if payment is not None else None
+            if payment is not None and not (payment.is_finite() and payment > 0):
+                raise ValueError
+        except (ArithmeticError, ValueError):
+            return jsonify({'error': 'payment must be a positive number'}), 400
+        
+        debt = simple_debt(row['id'], row['name'], row['principal'], row['apr'], row['min_payment'],
+                           row['compounding'], row['payment_frequency'])
+        amortization = DebtAmortization(debt, payment, max_months=MAX_AMORTIZATION_MONTHS)
+        payoff_month = amortization.payoff_month
+        
+        result = {
+            'debt_id': debt.id,
+            'name': debt.name,
+            'payment': float(amortization.payment),
+            'payment_frequency': debt.payment_frequency,
+            'payoff_month': payoff_month,
+            'payoff_label': amortization.month_label(payoff_month) if payoff_month else None
+        }
         
-        return jsonify({'message': 'Debt deleted successfully'})
+        if month is not None:
+            try:
+                datetime.strptime(month, '%Y-%m')
+            except ValueError:
+                return jsonify({'error': 'month must be YYYY-MM'}), 400
+            number = amortization.month_number(month)
+            if number < 1:
+                return jsonify({'error': 'month is before the start of the schedule'}), 400
+            
+            schedule_month = amortization.month(number)
+            result['month'] = amortization_row(schedule_month) if schedule_month else None
+            result['balance'] = float(amortization.balance_after(number))
+            return jsonify(result)
+        
+        # The schedule is a generator, so only the requested page is computed
+        months = [amortization_row(item) for item in islice(amortization.schedule(month_from), limit + 1)]
+        result['months'] = months[:limit]
+        result['next'] = months[limit]['month'] if len(months) > limit else None
+        return jsonify(result)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -286,33 +716,35 @@ def delete_debt(debt_id):
 def get_debt_summary():
     """Get total debt summary."""
     try:
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as debt_count,
-                SUM(principal) as total_principal,
-                AVG(apr) as average_apr,
-                SUM(min_payment) as total_min_payments
-            FROM debts 
-            WHERE status = 'active'
-        """)
-        
-        row = cursor.fetchone()
-        cursor.close()
-        connection.close()
+        totals = repository.debt_summary(g.user_id)
+        # Precomputed by the projection batch job, so no simulation runs here
+        stored = repository.get_projection(g.user_id)
         
         summary = {
-            'debt_count': row[0] or 0,
-            'total_principal': float(row[1]) if row[1] else 0,
-            'average_apr': float(row[2]) if row[2] else 0,
-            'total_min_payments': float(row[3]) if row[3] else 0
+            'debt_count': totals['debt_count'],
+            'total_principal': float(totals['total_principal']) if totals['total_principal'] else 0,
+            'average_apr': float(totals['average_apr']) if totals['average_apr'] else 0,
+            'total_min_payments': float(totals['total_min_payments']) if totals['total_min_payments'] else 0
         }
         
-        return jsonify({'summary': summary})
+        projection = None
+        if stored:
+            last_updated, computed_at = totals['last_updated'], stored['computed_at']
+            projection = {
+                'strategy': stored['strategy'],
+                'extra_payment': float(stored['extra_payment']),
+                'months_to_zero': stored['months_to_zero'],
+                'debt_free_date': stored['debt_free_date'].isoformat() if stored['debt_free_date'] else None,
+                'total_interest': float(stored['total_interest']),
+                'cleared': bool(stored['cleared']),
+                'computed_at': computed_at.isoformat() if computed_at else None,
+                # Debts edited since the last batch run, or deleted (a deletion leaves no
+                # updated_at behind, but the active debt count no longer matches)
+                'stale': bool(last_updated and computed_at and last_updated > computed_at)
+                or totals['debt_count'] != stored['debt_count']
+            }
+        
+        return jsonify({'summary': summary, 'projection': projection})
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -330,37 +762,36 @@ def run_simulation():
         strategy = data.get('strategy', 'avalanche')
         extra_payment = Decimal(str(data.get('extra_payment', 0)))
         
-        # Get debts from database
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, status
-            FROM debts 
-            WHERE status = 'active'
-        """)
-        
-        rows = cursor.fetchall()
-        debts = [debt_from_row(row) for row in rows]
-        cursor.close()
-        connection.close()
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not debts:
             return jsonify({'error': 'No active debts found'}), 400
         
+        try:
+            schedule, timeline = load_schedule(data, debts)
+        except (KeyError, ValueError) as e:
+            return jsonify({'error': f'Invalid schedule: {e}'}), 400
+        if timeline and timeline.strategy and 'strategy' not in data:
+            strategy = timeline.strategy
+        
         # Load debts into simulation engine
+        simulation_engine = request_engine()
         simulation_engine.debts = debts
         
         # Run simulation using new engine
         if strategy == 'avalanche':
-            result = simulation_engine.simulate_avalanche(extra_payment)
+            result = simulation_engine.simulate_avalanche(extra_payment, schedule=schedule)
         elif strategy == 'snowball':
-            result = simulation_engine.simulate_snowball(extra_payment)
+            result = simulation_engine.simulate_snowball(extra_payment, schedule=schedule)
         else:
-            result = simulation_engine.simulate_avalanche(extra_payment)  # Default to avalanche
+            result = simulation_engine.simulate_avalanche(extra_payment, schedule=schedule)  # Default to avalanche
+        
+        if timeline:
+            result['commitments'] = timeline.to_dict()
         
         return jsonify(result)
     
@@ -375,23 +806,11 @@ def calculate_avalanche():
         data = request.get_json()
         extra_payment = Decimal(str(data.get('extra_payment', 0)))
         
-        # Get debts
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, status
-            FROM debts 
-            WHERE status = 'active'
-        """)
-        
-        rows = cursor.fetchall()
-        debts = [debt_from_row(row) for row in rows]
-        cursor.close()
-        connection.close()
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not debts:
             return jsonify({'error': 'No active debts found'}), 400
@@ -410,23 +829,11 @@ def calculate_snowball():
         data = request.get_json()
         extra_payment = Decimal(str(data.get('extra_payment', 0)))
         
-        # Get debts
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, status
-            FROM debts 
-            WHERE status = 'active'
-        """)
-        
-        rows = cursor.fetchall()
-        debts = [debt_from_row(row) for row in rows]
-        cursor.close()
-        connection.close()
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not debts:
             return jsonify({'error': 'No active debts found'}), 400
@@ -445,23 +852,11 @@ def calculate_hybrid():
         data = request.get_json()
         extra_payment = Decimal(str(data.get('extra_payment', 0)))
         
-        # Get debts
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, status
-            FROM debts 
-            WHERE status = 'active'
-        """)
-        
-        rows = cursor.fetchall()
-        debts = [debt_from_row(row) for row in rows]
-        cursor.close()
-        connection.close()
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not debts:
             return jsonify({'error': 'No active debts found'}), 400
@@ -480,28 +875,17 @@ def run_baseline_simulation():
         data = request.get_json()
         extra_payment = Decimal(str(data.get('extra_payment', 0)))
         
-        # Get debts from database
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, status
-            FROM debts 
-            WHERE status = 'active'
-        """)
-        
-        rows = cursor.fetchall()
-        debts = [debt_from_row(row) for row in rows]
-        cursor.close()
-        connection.close()
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not debts:
             return jsonify({'error': 'No active debts found'}), 400
         
         # Load debts into simulation engine
+        simulation_engine = request_engine()
         simulation_engine.debts = debts
         
         # Run baseline simulation
@@ -521,28 +905,17 @@ def compare_with_baseline():
         strategy = data.get('strategy', 'avalanche')
         extra_payment = Decimal(str(data.get('extra_payment', 0)))
         
-        # Get debts from database
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, status
-            FROM debts 
-            WHERE status = 'active'
-        """)
-        
-        rows = cursor.fetchall()
-        debts = [debt_from_row(row) for row in rows]
-        cursor.close()
-        connection.close()
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not debts:
             return jsonify({'error': 'No active debts found'}), 400
         
         # Load debts into simulation engine
+        simulation_engine = request_engine()
         simulation_engine.debts = debts
         
         # Run strategy simulation
@@ -581,28 +954,17 @@ def run_scenario_analysis():
         if not base_simulation:
             return jsonify({'error': 'Base simulation data required'}), 400
         
-        # Get debts from database
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, status
-            FROM debts 
-            WHERE status = 'active'
-        """)
-        
-        rows = cursor.fetchall()
-        debts = [debt_from_row(row) for row in rows]
-        cursor.close()
-        connection.close()
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not debts:
             return jsonify({'error': 'No active debts found'}), 400
         
         # Load debts into simulation engine
+        simulation_engine = request_engine()
         simulation_engine.debts = debts
         
         results = {}
@@ -646,76 +1008,47 @@ def run_scenario_analysis():
 
 @app.route('/api/calculate/consolidation', methods=['POST'])
 def run_consolidation_analysis():
-    """Run debt consolidation analysis."""
+    """Run debt consolidation analysis against the simulated current plan."""
     try:
         data = request.get_json()
-        debts_data = data.get('debts', [])
-        consolidation_rate = Decimal(str(data.get('consolidationRate', 0.09)))
-        consolidation_term = int(data.get('consolidationTerm', 60))
-        
-        if not debts_data:
-            return jsonify({'error': 'Debts data required'}), 400
-        
-        # Calculate current total debt and weighted average rate
-        total_debt = sum(float(debt['principal']) for debt in debts_data)
-        total_monthly_payments = sum(float(debt['min_payment']) for debt in debts_data)
+        strategy = data.get('strategy', 'avalanche')
+        extra_payment = Decimal(str(data.get('extra_payment', 0)))
         
-        # Calculate weighted average APR
-        weighted_interest = sum(
-            float(debt['principal']) * float(debt['apr']) 
-            for debt in debts_data
-        )
-        current_avg_rate = weighted_interest / total_debt if total_debt > 0 else 0
-        
-        # Calculate consolidation loan details
-        monthly_rate = consolidation_rate / Decimal('12')
-        consolidation_payment = calculate_monthly_payment(
-            Decimal(str(total_debt)), 
-            consolidation_rate, 
-            consolidation_term
-        )
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Calculate savings
-        monthly_savings = Decimal(str(total_monthly_payments)) - consolidation_payment
-        total_savings = monthly_savings * Decimal(str(consolidation_term))
+        if not debts:
+            return jsonify({'error': 'No active debts found'}), 400
         
-        return jsonify({
-            'current': {
-                'totalDebt': float(total_debt),
-                'monthlyPayments': float(total_monthly_payments),
-                'averageRate': float(current_avg_rate),
-                'totalPayments': float(total_monthly_payments * 128)  # Assuming 128 months from current simulation
-            },
-            'consolidation': {
-                'totalDebt': float(total_debt),
-                'monthlyPayment': float(consolidation_payment),
-                'interestRate': float(consolidation_rate),
-                'termMonths': consolidation_term,
-                'totalPayments': float(consolidation_payment * consolidation_term)
-            },
-            'savings': {
-                'monthlySavings': float(monthly_savings),
-                'totalSavings': float(total_savings),
-                'rateReduction': float(current_avg_rate - consolidation_rate),
-                'recommended': consolidation_rate < current_avg_rate
-            }
-        })
+        # Single rate/term pair unless a batch of offers or an offer grid is supplied
+        offers = data.get('offers')
+        grid = data.get('grid')
+        if not offers and not grid:
+            offers = [{
+                'rate': data.get('consolidationRate', 0.09),
+                'term': data.get('consolidationTerm', 60),
+                'fees': data.get('consolidationFees', 0)
+            }]
+        
+        consolidation_analyzer = ConsolidationAnalyzer(request_engine())
+        try:
+            batch = consolidation_analyzer.build_offers(debts, offers, grid)
+        except (KeyError, ValueError) as e:
+            return jsonify({'error': f'Invalid offers: {e}'}), 400
+        
+        max_monthly_payment = data.get('max_monthly_payment')
+        if max_monthly_payment is not None:
+            max_monthly_payment = Decimal(str(max_monthly_payment))
+        
+        result = consolidation_analyzer.analyze(debts, batch, strategy, extra_payment, max_monthly_payment)
+        return jsonify(result)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-def calculate_monthly_payment(principal, annual_rate, months):
-    """Calculate monthly payment for a loan."""
-    if annual_rate == 0:
-        return principal / Decimal(str(months))
-    
-    monthly_rate = annual_rate / Decimal('12')
-    months_decimal = Decimal(str(months))
-    payment = principal * (monthly_rate * (1 + monthly_rate) ** months_decimal) / ((1 + monthly_rate) ** months_decimal - 1)
-    return payment
-
-
 def simulate_job_loss_scenario(debts, months_unemployed, income_reduction):
     """Simulate impact of job loss."""
     # Create modified debts with reduced payments
@@ -727,6 +1060,7 @@ def simulate_job_loss_scenario(debts, months_unemployed, income_reduction):
         modified_debts.append(modified_debt)
     
     # Run simulation with modified payments
+    simulation_engine = request_engine()
     simulation_engine.debts = modified_debts
     result = simulation_engine.simulate_avalanche()
     
@@ -745,6 +1079,7 @@ def simulate_job_loss_scenario(debts, months_unemployed, income_reduction):
 def simulate_windfall_scenario(debts, windfall_amount, application_month):
     """Simulate impact of windfall payment."""
     # Run simulation with windfall applied at specific month
+    simulation_engine = request_engine()
     simulation_engine.debts = debts
     result = simulation_engine.simulate_avalanche(Decimal(str(windfall_amount)))
     
@@ -771,6 +1106,7 @@ def simulate_rate_change_scenario(debts, new_rate, affected_debt_ids):
         modified_debts.append(modified_debt)
     
     # Run simulation with modified rates
+    simulation_engine = request_engine()
     simulation_engine.debts = modified_debts
     result = simulation_engine.simulate_avalanche()
     
@@ -824,28 +1160,17 @@ def run_custom_order_simulation():
         if not custom_order:
             return jsonify({'error': 'Custom order required'}), 400
         
-        # Get debts from database
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, status
-            FROM debts 
-            WHERE status = 'active'
-        """)
-        
-        rows = cursor.fetchall()
-        debts = [debt_from_row(row) for row in rows]
-        cursor.close()
-        connection.close()
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not debts:
             return jsonify({'error': 'No active debts found'}), 400
         
         # Load debts into simulation engine
+        simulation_engine = request_engine()
         simulation_engine.debts = debts
         
         # Run custom order simulation
@@ -857,6 +1182,48 @@ def run_custom_order_simulation():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/calculate/custom-order/search', methods=['POST'])
+def search_custom_order():
+    """Find the best custom milestone order for an objective."""
+    try:
+        data = request.get_json()
+        objective = data.get('objective', 'interest')
+        extra_payment = Decimal(str(data.get('extra_payment', 0)))
+        
+        if objective not in CustomOrderSearch.OBJECTIVES:
+            return jsonify({'error': f'Invalid objective: {objective}'}), 400
+        
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if not debts:
+            return jsonify({'error': 'No active debts found'}), 400
+        
+        # Clamped so one request cannot keep a worker busy indefinitely
+        search = CustomOrderSearch(
+            early_win_months=int(data.get('early_win_months', 12)),
+            node_limit=min(max(int(data.get('node_limit', 50000)), 1), MAX_SEARCH_NODES)
+        )
+        start_date = datetime.now()
+        search_result = search.search(debts, extra_payment, objective, start_date)
+        
+        # Re-run the winning order through the Decimal engine for exact figures, on the same calendar
+        simulation_engine = request_engine()
+        simulation_engine.start_date = start_date
+        simulation_engine.debts = debts
+        search_result['simulation'] = simulation_engine.simulate_custom_order(
+            search_result['best_order'], extra_payment
+        )
+        
+        return jsonify(search_result)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/calculate/compare', methods=['POST'])
 def compare_strategies():
     """Compare all three strategies."""
@@ -864,31 +1231,25 @@ def compare_strategies():
         data = request.get_json()
         extra_payment = Decimal(str(data.get('extra_payment', 0)))
         
-        # Get debts
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, status
-            FROM debts 
-            WHERE status = 'active'
-        """)
-        
-        rows = cursor.fetchall()
-        debts = [debt_from_row(row) for row in rows]
-        cursor.close()
-        connection.close()
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not debts:
             return jsonify({'error': 'No active debts found'}), 400
         
+        try:
+            schedule, _ = load_schedule(data, debts)
+        except (KeyError, ValueError) as e:
+            return jsonify({'error': f'Invalid schedule: {e}'}), 400
+        
         # Load debts into simulation engine
+        simulation_engine = request_engine()
         simulation_engine.debts = debts
         
-        result = simulation_engine.compare_strategies(extra_payment)
+        result = simulation_engine.compare_strategies(extra_payment, schedule)
         return jsonify(result)
     
     except Exception as e:
@@ -904,27 +1265,16 @@ def calculate_impact():
         additional_extra = Decimal(str(data.get('additional_extra', 0)))
         strategy = data.get('strategy', 'avalanche')
         
-        # Get debts
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, status
-            FROM debts 
-            WHERE status = 'active'
-        """)
-        
-        rows = cursor.fetchall()
-        debts = [debt_from_row(row) for row in rows]
-        cursor.close()
-        connection.close()
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not debts:
             return jsonify({'error': 'No active debts found'}), 400
         
+        simulation_engine = request_engine()
         result = simulation_engine.calculate_extra_payment_impact(
             debts, base_extra, additional_extra, strategy
         )
@@ -942,28 +1292,22 @@ def get_months_to_zero():
         strategy = data.get('strategy', 'avalanche')
         extra_payment = Decimal(str(data.get('extra_payment', 0)))
         
-        # Get debts
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, status
-            FROM debts 
-            WHERE status = 'active'
-        """)
-        
-        rows = cursor.fetchall()
-        debts = [debt_from_row(row) for row in rows]
-        cursor.close()
-        connection.close()
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not debts:
             return jsonify({'months_to_zero': 0, 'debt_free_date': None})
         
-        result = simulation_engine.run_simulation(debts, extra_payment, strategy)
+        try:
+            schedule, _ = load_schedule(data, debts)
+        except (KeyError, ValueError) as e:
+            return jsonify({'error': f'Invalid schedule: {e}'}), 400
+        
+        simulation_engine = request_engine()
+        result = simulation_engine.run_simulation(debts, extra_payment, strategy, schedule)
         
         return jsonify({
             'months_to_zero': result['summary']['months_to_zero'],
@@ -974,33 +1318,67 @@ def get_months_to_zero():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/calculate/goal-seek', methods=['POST'])
+def goal_seek():
+    """Solve for the extra payment, lump sum or rate that meets a payoff goal."""
+    try:
+        data = request.get_json()
+        variable = data.get('variable', 'extra_payment')
+        target = data.get('target', 'debt_free_by')
+        value = data.get('value')
+        strategy = data.get('strategy', 'avalanche')
+        extra_payment = Decimal(str(data.get('extra_payment', 0)))
+        debt_id = data.get('debt_id')
+        
+        if variable not in GoalSeekSolver.VARIABLES:
+            return jsonify({'error': f'Invalid variable: {variable}'}), 400
+        if target not in GoalSeekSolver.TARGETS:
+            return jsonify({'error': f'Invalid target: {target}'}), 400
+        if value is None:
+            return jsonify({'error': 'Target value required'}), 400
+        if variable == 'rate' and debt_id is None:
+            return jsonify({'error': 'debt_id required when solving for rate'}), 400
+        
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if not debts:
+            return jsonify({'error': 'No active debts found'}), 400
+        
+        goal_seek_solver = GoalSeekSolver(request_engine())
+        try:
+            result = goal_seek_solver.solve(
+                debts, variable, target, value, strategy, extra_payment,
+                int(debt_id) if debt_id is not None else None
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify(result)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 # ============================================================================
 # INSIGHTS & RECOMMENDATIONS ENDPOINTS
 # ============================================================================
 
-@app.route('/api/insights/recommend', methods=['GET'])
+@app.route('/api/insights/recommend', methods=['GET', 'POST'])
 def get_recommendation():
     """Get recommended debt target."""
     try:
-        strategy = request.args.get('strategy', 'avalanche')
-        
-        # Get debts
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, status
-            FROM debts 
-            WHERE status = 'active'
-        """)
-        
-        rows = cursor.fetchall()
-        debts = [debt_from_row(row) for row in rows]
-        cursor.close()
-        connection.close()
+        data = request.get_json(silent=True) or {}
+        strategy = data.get('strategy', request.args.get('strategy', 'avalanche'))
+        
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not debts:
             return jsonify({'error': 'No active debts found'}), 400
@@ -1020,28 +1398,17 @@ def get_recommendation():
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/insights/top-targets', methods=['GET'])
+@app.route('/api/insights/top-targets', methods=['GET', 'POST'])
 def get_top_targets():
     """Get top 3 debt targets."""
     try:
-        # Get debts
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, status
-            FROM debts 
-            WHERE status = 'active'
-            ORDER BY apr DESC
-        """)
-        
-        rows = cursor.fetchall()
-        debts = [debt_from_row(row) for row in rows]
-        cursor.close()
-        connection.close()
+        data = request.get_json(silent=True) or {}
+        
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = sorted(load_portfolio(data), key=lambda debt: debt.apr, reverse=True)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not debts:
             return jsonify({'targets': []})
@@ -1082,23 +1449,11 @@ def get_marginal_benefit():
         data = request.get_json()
         extra_amount = Decimal(str(data.get('extra_amount', 0)))
         
-        # Get debts
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, status
-            FROM debts 
-            WHERE status = 'active'
-        """)
-        
-        rows = cursor.fetchall()
-        debts = [debt_from_row(row) for row in rows]
-        cursor.close()
-        connection.close()
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not debts:
             return jsonify({'benefit_per_rand': 0, 'target_debt': None})
@@ -1122,28 +1477,22 @@ def get_timeline_data():
         strategy = data.get('strategy', 'avalanche')
         extra_payment = Decimal(str(data.get('extra_payment', 0)))
         
-        # Get debts
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, status
-            FROM debts 
-            WHERE status = 'active'
-        """)
-        
-        rows = cursor.fetchall()
-        debts = [debt_from_row(row) for row in rows]
-        cursor.close()
-        connection.close()
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not debts:
             return jsonify({'timeline': []})
         
-        result = simulation_engine.run_simulation(debts, extra_payment, strategy)
+        try:
+            schedule, _ = load_schedule(data, debts)
+        except (KeyError, ValueError) as e:
+            return jsonify({'error': f'Invalid schedule: {e}'}), 400
+        
+        simulation_engine = request_engine()
+        result = simulation_engine.run_simulation(debts, extra_payment, strategy, schedule)
         
         # Format for charts
         timeline = []
@@ -1171,28 +1520,22 @@ def get_balance_trend():
         strategy = data.get('strategy', 'avalanche')
         extra_payment = Decimal(str(data.get('extra_payment', 0)))
         
-        # Get debts
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT id, name, principal, apr, min_payment, payment_frequency, 
-                   compounding, status
-            FROM debts 
-            WHERE status = 'active'
-        """)
-        
-        rows = cursor.fetchall()
-        debts = [debt_from_row(row) for row in rows]
-        cursor.close()
-        connection.close()
+        # Inline portfolio, or the user's debts from the repository
+        try:
+            debts = load_portfolio(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not debts:
             return jsonify({'trend': []})
         
-        result = simulation_engine.run_simulation(debts, extra_payment, strategy)
+        try:
+            schedule, _ = load_schedule(data, debts)
+        except (KeyError, ValueError) as e:
+            return jsonify({'error': f'Invalid schedule: {e}'}), 400
+        
+        simulation_engine = request_engine()
+        result = simulation_engine.run_simulation(debts, extra_payment, strategy, schedule)
         
         # Format for area chart
         trend = []
@@ -1211,5 +1554,568 @@ def get_balance_trend():
         return jsonify({'error': str(e)}), 500
 
 
+# ============================================================================
+# COMMITMENT ENDPOINTS
+# ============================================================================
+
+@app.route('/api/commitments', methods=['POST'])
+def create_commitment():
+    """Record a monthly extra-payment commitment, optionally starting in a later month."""
+    try:
+        data = request.get_json() or {}
+        amount = data.get('amount')
+        strategy = data.get('strategy', 'avalanche')
+        custom_alloc = data.get('custom_alloc')
+        starts_on = data.get('starts_on')
+        
+        if isinstance(amount, bool) or not isinstance(amount, (int, float)) or amount < 0:
+            return jsonify({'error': 'amount must be a non-negative number'}), 400
+        if strategy not in CommitmentTimeline.STRATEGIES:
+            return jsonify({'error': f'Invalid strategy: {strategy} (use avalanche or snowball)'}), 400
+        if custom_alloc is not None:
+            if not isinstance(custom_alloc, dict) or not all(
+                    isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+                    for value in custom_alloc.values()):
+                return jsonify({'error': 'custom_alloc must map debt ids to non-negative amounts'}), 400
+            if sum(custom_alloc.values()) > amount:
+                return jsonify({'error': 'custom_alloc cannot exceed the committed amount'}), 400
+        if starts_on is not None:
+            try:
+                starts_on = datetime.strptime(starts_on if len(starts_on) > 7 else starts_on + '-01', '%Y-%m-%d').date()
+            except (TypeError, ValueError):
+                return jsonify({'error': 'starts_on must be YYYY-MM or YYYY-MM-DD'}), 400
+        
+        # A plan runs one strategy, so refuse a commitment that would switch it in a later month
+        commitments = repository.list_commitments(g.user_id)
+        timeline = CommitmentTimeline(commitments + [{
+            'id': max((item['id'] for item in commitments), default=0) + 1,
+            'created_at': datetime.now(), 'starts_on': starts_on,
+            'amount': amount, 'strategy': strategy, 'custom_alloc': custom_alloc
+        }])
+        if timeline.strategy_switch is not None:
+            return jsonify({
+                'error': f'Commitments would switch strategy in month {timeline.strategy_switch}; a plan runs '
+                         'one strategy, so commitments that start later must use the same one'
+            }), 400
+        
+        commitment_id = repository.add_commitment(g.user_id, amount, strategy, custom_alloc, starts_on)
+        
+        return jsonify({
+            'message': 'Commitment recorded successfully',
+            'commitment_id': commitment_id
+        }), 201
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/commitments', methods=['GET'])
+def get_commitments():
+    """List the user's commitments and the extra-payment timeline they resolve to."""
+    try:
+        commitments = repository.list_commitments(g.user_id)
+        timeline = CommitmentTimeline(commitments)
+        
+        return jsonify({
+            'commitments': [
+                {field: json_value(value) for field, value in commitment.items()}
+                for commitment in commitments
+            ],
+            'timeline': timeline.to_dict()
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ============================================================================
+# PLAN TRAJECTORY ENDPOINTS
+# ============================================================================
+
+def load_plan_actuals(user_id, months):
+    """Sum a user's recorded payments per calendar month and debt for the given YYYY-MM months."""
+    if not months:
+        return {}
+    
+    totals = repository.payment_totals(user_id, months[0] + '-01', add_months(months[-1], 1) + '-01')
+    return {
+        month: {str(debt_id): amount for debt_id, amount in by_debt.items()}
+        for month, by_debt in totals.items()
+    }
+
+
+def refresh_saved_plan(state, debts):
+    """Rebuild the plan if the debts changed, otherwise roll it forward over closed months."""
+    if plan_trajectory.portfolio_signature(debts) != state['signature']:
+        rebuilt = plan_trajectory.build(debts, state['strategy'], Decimal(str(state['extra_payment'])))
+        state.clear()
+        state.update(rebuilt)
+        return {'rebuilt': True, 'months_closed': [], 'diverged_months': [], 'resimulations': 1}
+    
+    actuals = load_plan_actuals(g.user_id, plan_trajectory.months_to_close(state))
+    stats = plan_trajectory.roll_forward(state, actuals)
+    stats['rebuilt'] = False
+    return stats
+
+
+@app.route('/api/plan', methods=['POST'])
+def create_plan():
+    """Simulate and store the plan trajectory for the current calendar month."""
+    try:
+        data = request.get_json() or {}
+        strategy = data.get('strategy', 'avalanche')
+        extra_payment = Decimal(str(data.get('extra_payment', 0)))
+        
+        if strategy not in ('avalanche', 'snowball'):
+            return jsonify({'error': f'Invalid strategy: {strategy}'}), 400
+        
+        debts = repository.active_debts(g.user_id)
+        if not debts:
+            return jsonify({'error': 'No active debts found'}), 400
+        
+        state = plan_trajectory.build(debts, strategy, extra_payment)
+        repository.replace_plan(g.user_id, state)
+        
+        return jsonify(plan_trajectory.view(state)), 201
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/plan', methods=['GET'])
+def get_plan():
+    """Serve the stored plan, rolling it forward first if a calendar month has closed."""
+    try:
+        include_history = request.args.get('history', 'false').lower() == 'true'
+        
+        plan = repository.get_plan(g.user_id)
+        if not plan:
+            return jsonify({'error': 'No saved plan found'}), 404
+        
+        plan_id, state = plan
+        update = None
+        debts = repository.active_debts(g.user_id)
+        
+        if debts and (plan_trajectory.months_to_close(state) or
+                      plan_trajectory.portfolio_signature(debts) != state['signature']):
+            update = refresh_saved_plan(state, debts)
+            repository.update_plan(plan_id, state)
+        
+        result = plan_trajectory.view(state, include_history)
+        result['update'] = update
+        return jsonify(result)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/plan/roll-forward', methods=['POST'])
+def roll_plan_forward():
+    """Close finished calendar months on the stored plan (for scheduled jobs)."""
+    try:
+        plan = repository.get_plan(g.user_id)
+        if not plan:
+            return jsonify({'error': 'No saved plan found'}), 404
+        
+        plan_id, state = plan
+        debts = repository.active_debts(g.user_id)
+        if not debts:
+            return jsonify({'error': 'No active debts found'}), 400
+        
+        stats = refresh_saved_plan(state, debts)
+        repository.update_plan(plan_id, state)
+        
+        stats['closed_through'] = state['closed_through']
+        return jsonify(stats)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ============================================================================
+# PLAN SNAPSHOT ENDPOINTS
+# ============================================================================
+
+@app.route('/api/snapshots', methods=['POST'])
+def create_snapshot():
+    """Simulate the current plan and save its full ledger as a snapshot."""
+    try:
+        data = request.get_json() or {}
+        name = data.get('name')
+        strategy = data.get('strategy', 'avalanche')
+        extra_payment = Decimal(str(data.get('extra_payment', 0)))
+        
+        if not name:
+            return jsonify({'error': 'Snapshot name required'}), 400
+        # Only strategies the engine runs, so the stored strategy is the one simulated
+        if strategy not in ('avalanche', 'snowball'):
+            return jsonify({'error': f'Invalid strategy: {strategy}'}), 400
+        
+        debts = repository.active_debts(g.user_id)
+        if not debts:
+            return jsonify({'error': 'No active debts found'}), 400
+        
+        try:
+            schedule, timeline = load_schedule(data, debts)
+        except (KeyError, ValueError) as e:
+            return jsonify({'error': f'Invalid schedule: {e}'}), 400
+        if timeline and timeline.strategy and 'strategy' not in data:
+            strategy = timeline.strategy
+        
+        simulation_engine = request_engine()
+        result = simulation_engine.run_simulation(debts, extra_payment, strategy, schedule)
+        ledger = ledger_codec.encode(result)
+        
+        # The JSON column keeps what listing and comparing need; the ledger is binary
+        state = {
+            'strategy': strategy,
+            'extra_payment': float(extra_payment),
+            'schedule': data.get('schedule'),
+            'commitments': timeline.to_dict() if timeline else None,
+            'summary': result['summary'],
+            'ledger_bytes': len(ledger)
+        }
+        snapshot_id = repository.create_snapshot(g.user_id, name, state, ledger)
+        
+        return jsonify({'id': snapshot_id, 'name': name, **state}), 201
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/snapshots', methods=['GET'])
+def get_snapshots():
+    """List saved snapshots with their summaries (ledgers are not loaded)."""
+    try:
+        snapshots = [
+            {
+                'id': snapshot['id'],
+                'name': snapshot['name'],
+                'snapshot_date': json_value(snapshot['snapshot_date']),
+                **snapshot['state']
+            }
+            for snapshot in repository.list_snapshots(g.user_id)
+        ]
+        
+        return jsonify({'snapshots': snapshots})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/snapshots/<int:snapshot_id>', methods=['GET'])
+def get_snapshot(snapshot_id):
+    """Load part of a snapshot ledger: ?from=&to= months, ?debts=1,2 and ?fields=balance,payment."""
+    try:
+        month_from = request.args.get('from', 1, type=int)
+        month_to = request.args.get('to', type=int)
+        debt_ids = request.args.get('debts')
+        fields = request.args.get('fields')
+        
+        snapshot = repository.get_snapshot(g.user_id, snapshot_id)
+        
+        if not snapshot:
+            return jsonify({'error': 'Snapshot not found'}), 404
+        if not snapshot['ledger']:
+            return jsonify({'error': 'Snapshot has no ledger'}), 400
+        
+        try:
+            ledger = LedgerReader(snapshot['ledger']).read(
+                month_from, month_to,
+                debt_ids.split(',') if debt_ids else None,
+                fields.split(',') if fields else None
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'id': snapshot['id'],
+            'name': snapshot['name'],
+            'snapshot_date': json_value(snapshot['snapshot_date']),
+            **snapshot['state'],
+            'ledger': ledger
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/snapshots/compare', methods=['POST'])
+def compare_snapshots():
+    """Compare saved snapshots by summary and monthly total balance."""
+    try:
+        data = request.get_json() or {}
+        snapshot_ids = data.get('ids', [])
+        month_from = int(data.get('from', 1))
+        month_to = data.get('to')
+        
+        if not snapshot_ids:
+            return jsonify({'error': 'Snapshot ids required'}), 400
+        
+        comparison = []
+        for snapshot in repository.get_snapshots(g.user_id, snapshot_ids):
+            state = snapshot['state']
+            entry = {'id': snapshot['id'], 'name': snapshot['name'],
+                     'strategy': state.get('strategy'), 'summary': state.get('summary')}
+            if snapshot['ledger']:
+                # Only the total columns are decoded
+                entry['totals'] = LedgerReader(snapshot['ledger']).totals(month_from, month_to)
+            comparison.append(entry)
+        
+        comparison.sort(key=lambda item: (item['summary'] or {}).get('total_interest_paid', 0))
+        return jsonify({'snapshots': comparison})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/snapshots/<int:snapshot_id>', methods=['DELETE'])
+def delete_snapshot(snapshot_id):
+    """Delete a saved snapshot."""
+    try:
+        if not repository.delete_snapshot(g.user_id, snapshot_id):
+            return jsonify({'error': 'Snapshot not found'}), 404
+        
+        return jsonify({'message': 'Snapshot deleted successfully'})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ============================================================================
+# PAYMENT HISTORY ENDPOINTS
+# ============================================================================
+
+@app.route('/api/payments', methods=['GET'])
+def get_payments():
+    """Get the user's payment history, newest first, one keyset page at a time."""
+    try:
+        try:
+            limit, after, fields = page_args(PAYMENT_LIST_COLUMNS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        rows, next_key = repository.list_payments(
+            g.user_id, fields, limit, after,
+            debt_id=request.args.get('debt_id', type=int),
+            date_from=request.args.get('from'),
+            date_to=request.args.get('to')
+        )
+        
+        payments = [{field: json_value(value) for field, value in row.items()} for row in rows]
+        next_cursor = encode_cursor(*next_key) if next_key else None
+        
+        return jsonify({'payments': payments, 'next_cursor': next_cursor})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/payments/import', methods=['POST'])
+def import_payments():
+    """Bulk-import payment history from a bank CSV export and reconcile debt balances."""
+    try:
+        # Multipart upload (field "file") or a raw text/csv body
+        upload = request.files.get('file')
+        options = request.form if upload else request.args
+        stream = upload.stream if upload else request.stream
+        lines = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        
+        source = options.get('source', 'scheduled')
+        update_balances = options.get('update_balances', 'true').lower() == 'true'
+        dry_run = options.get('dry_run', 'false').lower() == 'true'
+        negative_payments = options.get('negative_payments', 'false').lower() == 'true'
+        
+        if source not in ('scheduled', 'one-off', 'freed'):
+            return jsonify({'error': f'Invalid source: {source}'}), 400
+        
+        try:
+            keywords = json.loads(options.get('keywords', '{}'))
+        except ValueError:
+            return jsonify({'error': 'keywords must be a JSON object'}), 400
+        
+        debts = repository.debt_balance_dates(g.user_id)
+        importer = PaymentImporter()
+        try:
+            # Keyword targets must be the user's own debts
+            importer.resolve_keywords(keywords, debts)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        def stored_payments(date_from, date_to):
+            return repository.payment_counts(g.user_id, source, date_from, date_to)
+        
+        try:
+            # One transaction: the payments and the balance updates commit together
+            imported = repository.import_payments(
+                g.user_id, importer.batches(lines, debts, keywords, stored_payments, negative_payments), source,
+                balance_totals=(lambda: importer.stats['totals']) if update_balances else None,
+                dry_run=dry_run
+            )
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            return jsonify({'error': f'Invalid CSV: {e}'}), 400
+        
+        stats = importer.stats
+        balance_updates = [
+            {'debt_id': debt_id, 'amount': float(amount)}
+            for debt_id, amount in stats['totals'].items()
+        ]
+        
+        return jsonify({
+            'dry_run': dry_run,
+            'rows': stats['rows'],
+            'imported': imported,
+            'unmatched': stats['unmatched'],
+            'invalid': stats['invalid'],
+            'credits': stats['credits'],
+            'duplicates': stats['duplicates'],
+            'already_reflected': stats['already_reflected'],
+            'balance_updates': balance_updates if update_balances else [],
+            'errors': stats['errors']
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ============================================================================
+# ADMIN ENDPOINTS
+# ============================================================================
+
+def admin_denied():
+    """A 403 response unless ADMIN_TOKEN is configured and the request carries it (fails closed)."""
+    if not ADMIN_TOKEN:
+        return jsonify({'error': 'Admin endpoints are disabled: ADMIN_TOKEN is not set'}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({'error': 'Admin token required'}), 403
+    return None
+
+
+@app.route('/api/admin/profiler', methods=['GET'])
+def get_profiler():
+    """Sampling profiler status."""
+    denied = admin_denied()
+    if denied:
+        return denied
+    return jsonify(stack_sampler.stats())
+
+
+@app.route('/api/admin/profiler', methods=['POST'])
+def set_profiler():
+    """
+    Start or stop the sampling profiler.
+    
+    Body: {"enabled": bool, "interval_ms": number, "lines": bool, "reset": bool}
+    """
+    denied = admin_denied()
+    if denied:
+        return denied
+    
+    data = request.get_json(silent=True) or {}
+    interval_ms = data.get('interval_ms')
+    if interval_ms is not None and (isinstance(interval_ms, bool) or not isinstance(interval_ms, (int, float))
+                                    or not 1 <= interval_ms <= 1000):
+        return jsonify({'error': 'interval_ms must be between 1 and 1000'}), 400
+    
+    if data.get('reset'):
+        stack_sampler.reset()
+    if data.get('enabled') is False:
+        stack_sampler.stop()
+    elif data.get('enabled') is True or interval_ms is not None or 'lines' in data:
+        stack_sampler.start(interval_ms / 1000 if interval_ms is not None else None,
+                            bool(data['lines']) if 'lines' in data else None)
+    return jsonify(stack_sampler.stats())
+
+
+@app.route('/api/admin/allocations', methods=['GET'])
+def get_allocations():
+    """Per-endpoint allocation report."""
+    denied = admin_denied()
+    if denied:
+        return denied
+    return jsonify(allocation_tracker.report())
+
+
+@app.route('/api/admin/allocations', methods=['POST'])
+def set_allocations():
+    """
+    Start or stop allocation tracking.
+    
+    Body: {"enabled": bool, "budget_mb": number, "frames": int, "max_requests": int,
+           "max_seconds": number, "reset": bool}
+    """
+    denied = admin_denied()
+    if denied:
+        return denied
+    
+    data = request.get_json(silent=True) or {}
+    budget_mb = data.get('budget_mb')
+    if budget_mb is not None and (isinstance(budget_mb, bool) or not isinstance(budget_mb, (int, float))
+                                  or budget_mb <= 0):
+        return jsonify({'error': 'budget_mb must be a positive number'}), 400
+    frames = data.get('frames')
+    if frames is not None and (isinstance(frames, bool) or not isinstance(frames, int) or not 1 <= frames <= 25):
+        return jsonify({'error': 'frames must be an integer between 1 and 25'}), 400
+    max_requests = data.get('max_requests')
+    if max_requests is not None and (isinstance(max_requests, bool) or not isinstance(max_requests, int)
+                                     or not 1 <= max_requests <= MAX_TRACKED_REQUESTS):
+        return jsonify({'error': f'max_requests must be an integer between 1 and {MAX_TRACKED_REQUESTS}'}), 400
+    max_seconds = data.get('max_seconds')
+    if max_seconds is not None and (isinstance(max_seconds, bool) or not isinstance(max_seconds, (int, float))
+                                    or not 0 < max_seconds <= MAX_TRACKED_SECONDS):
+        return jsonify({'error': f'max_seconds must be between 0 and {MAX_TRACKED_SECONDS}'}), 400
+    
+    if data.get('reset'):
+        allocation_tracker.reset()
+    if data.get('enabled') is False:
+        allocation_tracker.stop()
+    elif data.get('enabled') is True:
+        allocation_tracker.start(int(budget_mb * MB) if budget_mb is not None else None, frames,
+                                 max_requests, max_seconds)
+    elif budget_mb is not None:
+        allocation_tracker.budget_bytes = int(budget_mb * MB)
+    
+    report = allocation_tracker.report()
+    return jsonify({key: value for key, value in report.items() if key != 'endpoints'})
+
+
+@app.route('/api/admin/profiler/stacks', methods=['GET'])
+def get_profiler_stacks():
+    """Sampled stacks in collapsed-stack format for flamegraph tools; ?reset=true clears them after."""
+    denied = admin_denied()
+    if denied:
+        return denied
+    
+    stacks = stack_sampler.collapsed()
+    if request.args.get('reset') == 'true':
+        stack_sampler.reset()
+    return stacks, 200, {'Content-Type': 'text/plain; charset=utf-8'}
+
+
+# ============================================================================
+# HEALTH
+# ============================================================================
+
+@app.route('/api/health', methods=['GET'])
+def health():
+    """
+    Liveness and storage status. Never touches the database, so it stays cheap
+    while the circuit breaker is open; the API is `degraded` rather than down
+    then, since calculations fall back to cached portfolios.
+    """
+    storage = repository.health()
+    return jsonify({
+        'status': 'ok' if storage['available'] else 'degraded',
+        'repository': storage
+    })
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Request counts and latency histograms in the Prometheus text format."""
+    if not request_metrics:
+        return jsonify({'error': 'Request metrics are disabled'}), 404
+    return request_metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5006, debug=True)
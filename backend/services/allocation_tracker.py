@@ -0,0 +1,224 @@
+"""
+Allocation Tracker
+Opt-in tracemalloc report of what each endpoint allocates.
+
+While tracking is on, requests are served one at a time so every traced
+block belongs to exactly one request: traces and the peak are reset when a
+request starts. Just before the response is serialized, when the result
+structures are all still alive, the tracker snapshots the request's live
+allocations by source line and walks the payload to size it by structure
+(`simulation_results[].debts[]`, say) and by type. When the request ends its
+peak is recorded per endpoint, and requests that peak above the budget are
+logged with their top lines and largest structures.
+
+Tracking serializes requests and makes every allocation slower, so switch it
+on for a diagnosis (a staging box, the load test) rather than leaving it on:
+it stops by itself after `max_requests` traced requests or `max_seconds`,
+whichever comes first.
+"""
+
+from typing import List, Dict, Any, Optional, Callable
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+
+MB = 1024 * 1024
+
+
+class AllocationTracker:
+    """Per-endpoint peak memory, allocation sites and payload structure sizes."""
+    
+    def __init__(self, budget_bytes: int = 50 * MB, top: int = 10, frames: int = 1,
+                 log: Callable[[str], None] = print, max_nodes: int = 2000000,
+                 max_requests: int = 1000, max_seconds: float = 600):
+        self.budget_bytes = budget_bytes
+        self.top = top
+        self.frames = frames
+        self.log = log
+        self.max_nodes = max_nodes
+        self.max_requests = self.default_max_requests = max_requests
+        self.max_seconds = self.default_max_seconds = max_seconds
+        self.enabled = False
+        self._started = 0.0
+        self._traced = 0
+        self._serial = threading.Lock()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._endpoints = {}
+    
+    def start(self, budget_bytes: Optional[int] = None, frames: Optional[int] = None,
+              max_requests: Optional[int] = None, max_seconds: Optional[float] = None):
+        """
+        Start tracking (or change the budget of a running tracker). Either way the request
+        and time limits restart, at the given values or the defaults.
+        """
+        if budget_bytes is not None:
+            self.budget_bytes = budget_bytes
+        if frames is not None:
+            self.frames = frames
+        self.max_requests = max_requests if max_requests is not None else self.default_max_requests
+        self.max_seconds = max_seconds if max_seconds is not None else self.default_max_seconds
+        self._started = time.monotonic()
+        self._traced = 0
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.enabled = True
+    
+    def stop(self):
+        self.enabled = False
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+    
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+    
+    # ------------------------------------------------------------ per request
+    
+    def begin(self) -> bool:
+        """Start tracking the calling thread's request; False if tracking is off."""
+        if not self.enabled:
+            return False
+        self._serial.acquire()
+        if not self.enabled or self._expired():
+            self._serial.release()
+            return False
+        self._traced += 1
+        self._local.capture = None
+        if tracemalloc.is_tracing():
+            tracemalloc.clear_traces()
+            tracemalloc.reset_peak()
+        return True
+    
+    def capture(self, payload: Any):
+        """Snapshot the request's live allocations and size the payload about to be serialized."""
+        if not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        self._local.capture = {
+            'live_bytes': sum(stat.size for stat in snapshot.statistics('filename')),
+            'top_lines': [
+                {
+                    'line': f'{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}',
+                    'size_bytes': stat.size,
+                    'count': stat.count
+                }
+                for stat in snapshot.statistics('lineno')[:self.top]
+            ],
+            **self._payload_breakdown(payload)
+        }
+    
+    def end(self, endpoint: str):
+        """Record the request's peak under `endpoint` and release the next request."""
+        try:
+            peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+            capture = getattr(self._local, 'capture', None) or {}
+            self._local.capture = None
+            
+            with self._lock:
+                stats = self._endpoints.setdefault(endpoint, {
+                    'requests': 0, 'over_budget': 0, 'peak_bytes_max': 0, 'peak_bytes_total': 0, 'worst': None
+                })
+                stats['requests'] += 1
+                stats['peak_bytes_total'] += peak
+                if peak > self.budget_bytes:
+                    stats['over_budget'] += 1
+                if peak >= stats['peak_bytes_max']:
+                    stats['peak_bytes_max'] = peak
+                    stats['worst'] = capture
+            
+            if peak > self.budget_bytes:
+                self.log(self._budget_message(endpoint, peak, capture))
+        finally:
+            self._serial.release()
+    
+    # ----------------------------------------------------------------- report
+    
+    def report(self) -> Dict[str, Any]:
+        """Per-endpoint peaks, with the allocation sites and structures of each endpoint's worst request."""
+        with self._lock:
+            endpoints = {
+                endpoint: {
+                    'requests': stats['requests'],
+                    'over_budget': stats['over_budget'],
+                    'peak_bytes_max': stats['peak_bytes_max'],
+                    'peak_bytes_mean': stats['peak_bytes_total'] // stats['requests'],
+                    'worst_request': stats['worst']
+                }
+                for endpoint, stats in self._endpoints.items()
+            }
+        return {
+            'enabled': self.enabled,
+            'budget_bytes': self.budget_bytes,
+            'frames': self.frames,
+            'max_requests': self.max_requests,
+            'max_seconds': self.max_seconds,
+            'traced_requests': self._traced,
+            'endpoints': dict(sorted(endpoints.items(), key=lambda item: -item[1]['peak_bytes_max']))
+        }
+    
+    def _expired(self) -> bool:
+        """Stop tracking once it has traced max_requests requests or run for max_seconds (called under _serial)."""
+        if self._traced < self.max_requests and time.monotonic() - self._started < self.max_seconds:
+            return False
+        self.stop()
+        self.log(f'Allocation tracking stopped after {self._traced} requests '
+                 f'and {time.monotonic() - self._started:.0f} seconds')
+        return True
+    
+    def _payload_breakdown(self, payload: Any) -> Dict[str, Any]:
+        """Shallow sizes of the payload's objects summed by structure path and by type."""
+        paths = {}
+        types = {}
+        stack = [(payload, '$')]
+        visited = 0
+        while stack and visited < self.max_nodes:
+            value, path = stack.pop()
+            visited += 1
+            size = sys.getsizeof(value)
+            entry = paths.setdefault(path, [0, 0])
+            entry[0] += 1
+            entry[1] += size
+            entry = types.setdefault(type(value).__name__, [0, 0])
+            entry[0] += 1
+            entry[1] += size
+            
+            if isinstance(value, dict):
+                for key, item in value.items():
+                    # Keys are counted under the dict; the values get their own path
+                    stack.append((item, f'{path}.{key}'))
+            elif isinstance(value, (list, tuple)):
+                stack.extend((item, f'{path}[]') for item in value)
+        
+        def ranked(groups: Dict[str, List[int]], label: str) -> List[Dict[str, Any]]:
+            rows = sorted(groups.items(), key=lambda item: -item[1][1])[:self.top]
+            return [{label: name, 'count': count, 'size_bytes': size} for name, (count, size) in rows]
+        
+        return {
+            'payload_bytes': sum(size for _, size in paths.values()),
+            'payload_truncated': bool(stack),
+            'structures': ranked(paths, 'path'),
+            'types': ranked(types, 'type')
+        }
+    
+    def _budget_message(self, endpoint: str, peak: int, capture: Dict[str, Any]) -> str:
+        lines = ', '.join(f"{site['line']} {site['size_bytes'] / MB:.1f} MB"
+                          for site in capture.get('top_lines', [])[:3])
+        structures = ', '.join(f"{item['path']} {item['size_bytes'] / MB:.1f} MB"
+                               for item in capture.get('structures', [])[:3])
+        return (f'Memory budget exceeded: {endpoint} peaked at {peak / MB:.1f} MB '
+                f'(budget {self.budget_bytes / MB:.1f} MB); top lines: {lines or "n/a"}; '
+                f'largest structures: {structures or "n/a"}')
+
+
+def _short_path(filename: str) -> str:
+    """The last two components of a source path."""
+    parts = filename.replace('\\', '/').split('/')
+    return os.path.join(*parts[-2:]) if len(parts) > 1 else filename
@@ -0,0 +1,176 @@
+"""
+Amortization
+Per-debt balance, interest and principal for any month, in closed form.
+
+A debt paying a constant amount P at a constant monthly rate r follows the
+engine's monthly step (interest on the opening balance, then the payment),
+so its balance after k months is
+    
+    B_k = B_0 (1 + r)^k - P ((1 + r)^k - 1) / r      (B_0 - kP when r = 0)
+
+and month k's interest and principal split follow from B_(k-1). Any month is
+one Decimal power away instead of k simulated months, and the payoff month
+solves B_n <= 0 with logarithms. This serves drill-downs and questions like
+"the car loan's balance in June 2028" without simulating the portfolio.
+
+The schedule is per debt at its own payment: extra payments and freed
+minimums that a strategy cascades onto the debt are not included. Daily
+compounding and weekly payments change with each month's length and
+paydays, so for those debts month k is reached by stepping months with the
+engine's rules (see month_calendar).
+"""
+
+from decimal import Decimal
+from datetime import datetime
+from typing import Dict, Any, Iterator, Optional
+
+from .compiled_portfolio import daily_compounded_rate, monthly_rate, weekly_payment_credit
+from .plan_trajectory import add_months
+from .simple_simulation_engine import SimpleDebt, month_calendar
+
+
+class DebtAmortization:
+    """Amortization schedule of one debt paying a constant amount."""
+    
+    def __init__(self, debt: SimpleDebt, payment: Optional[Decimal] = None,
+                 start_date: Optional[datetime] = None, max_months: int = 600):
+        self.debt = debt
+        # Per month, or per payday for weekly-paid debts (the debt's minimum by default)
+        self.payment = debt.min_payment if payment is None else payment
+        self.start_date = start_date or datetime.now()
+        self.max_months = max_months
+        self.rate = monthly_rate(debt.apr, debt.compounding)
+        self.closed_form = debt.compounding != 'daily' and debt.payment_frequency != 'weekly'
+        self._payoff = False
+    
+    # ---------------------------------------------------------------- months
+    
+    def month_label(self, month: int) -> str:
+        """Calendar month (YYYY-MM) of plan month `month`; month one is the start date's month."""
+        return add_months(self.start_date.strftime('%Y-%m'), month - 1)
+    
+    def month_number(self, label: str) -> int:
+        """Plan month of a YYYY-MM calendar month (0 or less if it is before the start)."""
+        year, month = int(label[:4]), int(label[5:7])
+        return (year * 12 + month) - (self.start_date.year * 12 + self.start_date.month) + 1
+    
+    # ----------------------------------------------------------- random access
+    
+    @property
+    def payoff_month(self) -> Optional[int]:
+        """Month in which the balance is cleared, or None if it isn't within max_months."""
+        if self._payoff is False:
+            self._payoff = self._find_payoff()
+        return self._payoff
+    
+    def balance_after(self, month: int) -> Decimal:
+        """Balance at the end of plan month `month` (the opening balance for month 0)."""
+        if month <= 0 or self.debt.principal <= 0:
+            return max(self.debt.principal, Decimal('0'))
+        if not self.closed_form:
+            closing = self.debt.principal
+            for row in self.schedule():
+                closing = row['closing_balance']
+                if row['month'] == month:
+                    break
+            return closing
+        
+        payoff = self.payoff_month
+        if payoff is not None and month >= payoff:
+            return Decimal('0')
+        return self._closed_balance(month)
+    
+    def month(self, month: int) -> Optional[Dict[str, Any]]:
+        """Opening balance, interest, payment, principal and closing balance of month `month`, or None."""
+        if month < 1 or month > self.max_months:
+            return None
+        if not self.closed_form:
+            return next((row for row in self.schedule(month) if row['month'] == month), None)
+        
+        opening = self.balance_after(month - 1)
+        if opening <= 0:
+            return None
+        return self._row(month, opening)
+    
+    # ---------------------------------------------------------------- schedule
+    
+    def schedule(self, start: int = 1) -> Iterator[Dict[str, Any]]:
+        """Months from `start` until the debt is paid off (or max_months), generated lazily."""
+        start = max(start, 1)
+        month = 1
+        balance = self.debt.principal
+        if self.closed_form and start > 1:
+            # Jump straight to the first requested month
+            month, balance = start, self.balance_after(start - 1)
+        
+        while month <= self.max_months and balance > 0:
+            row = self._row(month, balance)
+            if month >= start:
+                yield row
+            balance = row['closing_balance']
+            month += 1
+    
+    # ---------------------------------------------------------------- helpers
+    
+    def _row(self, month: int, opening: Decimal) -> Dict[str, Any]:
+        """One month stepped by the engine's rules: interest on the opening balance, then the payment."""
+        if self.closed_form:
+            interest = opening * self.rate
+            due = self.payment
+        else:
+            days, first_payday, paydays = month_calendar(self.start_date, month)
+            if self.debt.compounding == 'daily':
+                interest = opening * daily_compounded_rate(self.debt.apr, days)
+            else:
+                interest = opening * self.rate
+            due = self.payment
+            if self.debt.payment_frequency == 'weekly':
+                interest -= weekly_payment_credit(self.debt.apr, self.debt.compounding, days, first_payday,
+                                                  self.payment, opening)
+                due = self.payment * paydays
+        
+        balance = opening + interest
+        payment = min(due, balance)
+        return {
+            'month': month,
+            'label': self.month_label(month),
+            'opening_balance': opening,
+            'interest': interest,
+            'payment': payment,
+            'principal': payment - interest,
+            'closing_balance': balance - payment
+        }
+    
+    def _closed_balance(self, month: int) -> Decimal:
+        """B_k from the closed form, before clamping at zero."""
+        if self.rate == 0:
+            return self.debt.principal - self.payment * month
+        growth = (Decimal('1') + self.rate) ** month
+        return self.debt.principal * growth - self.payment * (growth - Decimal('1')) / self.rate
+    
+    def _find_payoff(self) -> Optional[int]:
+        principal = self.debt.principal
+        if principal <= 0:
+            return 0
+        if not self.closed_form:
+            last = None
+            for row in self.schedule():
+                last = row
+            return last['month'] if last and last['closing_balance'] <= 0 else None
+        
+        if self.payment <= 0 or self.payment <= principal * self.rate:
+            # The payment doesn't cover the interest, so the balance never falls
+            return None
+        if self.rate == 0:
+            months = -(-principal // self.payment)
+        else:
+            ratio = self.payment / (self.payment - self.rate * principal)
+            months = (ratio.ln() / (Decimal('1') + self.rate).ln()).to_integral_value(rounding='ROUND_CEILING')
+        months = max(int(months), 1)
+        
+        # Settle rounding at the boundary: the first month whose closing balance is not positive
+        while months > 1 and self._closed_balance(months - 1) <= 0:
+            months -= 1
+        while self._closed_balance(months) > 0:
+            months += 1
+        return months if months <= self.max_months else None
@@ -6,6 +6,7 @@ Mathematically optimal strategy - targets highest APR debt first.
 from decimal import Decimal
 from typing import List, Dict, Any
 from .simulation_engine import SimulationEngine, Debt
+from .tracing import traced
 
 
 class AvalancheStrategy:
@@ -14,6 +15,7 @@ class AvalancheStrategy:
     def __init__(self):
         self.simulation_engine = SimulationEngine()
     
+    @traced('strategy.avalanche')
     def calculate_strategy(self, debts: List[Debt], extra_payment: Decimal = Decimal('0')) -> Dict[str, Any]:
         """Calculate avalanche strategy results."""
         return self.simulation_engine.run_simulation(debts, extra_payment, 'avalanche')
@@ -0,0 +1,81 @@
+"""
+Circuit Breaker
+Fails fast while a dependency is down instead of waiting out every timeout.
+
+Closed: calls go through and consecutive failures are counted. After
+`failure_threshold` of them the breaker opens and calls are refused for
+`reset_timeout` seconds. Then it is half-open: a single trial call goes
+through. Success closes the breaker, failure opens it for another period.
+"""
+
+from typing import Dict, Any, Callable
+import threading
+import time
+
+
+class CircuitBreaker:
+    """Thread-safe closed / open / half-open breaker."""
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._rejected = 0
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+    
+    def allow(self) -> bool:
+        """Whether a call may go through now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._trial_running = False
+            if self._state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            self._rejected += 1
+            return False
+    
+    def record_success(self):
+        """A call succeeded: close the breaker."""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_running = False
+    
+    def record_failure(self):
+        """A call failed: open the breaker once the threshold is reached (or the trial failed)."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+                self._trial_running = False
+    
+    def stats(self) -> Dict[str, Any]:
+        """State and counters for health checks."""
+        with self._lock:
+            retry_in = None
+            if self._state == self.OPEN:
+                retry_in = max(0.0, round(self.reset_timeout - (self.clock() - self._opened_at), 1))
+            return {
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'rejected_calls': self._rejected,
+                'retry_in_seconds': retry_in
+            }
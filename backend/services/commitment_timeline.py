@@ -0,0 +1,119 @@
+"""
+Commitment Timeline
+A user's extra-payment commitments resolved into plan changes by month.
+
+Each commitment sets the monthly extra payment, the strategy and an optional
+custom allocation ({debt_id: amount} sent to specific debts out of the
+extra payment) from the month it takes effect. The history is resolved once:
+commitments that took effect before the simulation starts collapse into
+month one, later ones into the month they start, and within a month the
+most recent commitment wins. Only the months where something changes are
+kept, in the same (month, events) boundary form PaymentSchedule compiles
+to, so the engines step through commitments exactly like any other
+schedule event.
+
+The extra payment and allocation can change from month to month, but a
+plan runs one strategy: the engines order debts once per simulation. The
+timeline's strategy is that of its first change, and `strategy_switch`
+names the month of a later change that would need another one, so new
+commitments can be refused before they are silently ignored.
+"""
+
+from decimal import Decimal
+from datetime import datetime, date
+from typing import List, Dict, Any, Optional
+
+from .simple_simulation_engine import month_number
+
+
+class CommitmentTimeline:
+    """Commitment history resolved against a simulation start date."""
+    
+    # The strategies the engines can run; commitments stored before this check
+    # with other values were simulated as avalanche
+    STRATEGIES = ('avalanche', 'snowball')
+    
+    def __init__(self, commitments: List[Dict[str, Any]], start_date: Optional[datetime] = None):
+        start_date = start_date or datetime.now()
+        
+        resolved = {}
+        for commitment in sorted(commitments, key=lambda item: (item['created_at'], item['id'])):
+            effective = commitment.get('starts_on') or commitment['created_at']
+            month = self._month(effective, start_date)
+            resolved[month] = {
+                'month': month,
+                'date': self._format(effective),
+                'extra_payment': Decimal(str(commitment['amount'])),
+                'strategy': commitment.get('strategy') if commitment.get('strategy') in self.STRATEGIES else 'avalanche',
+                'allocation': {str(k): Decimal(str(v)) for k, v in (commitment.get('custom_alloc') or {}).items()}
+            }
+        
+        # Drop entries that repeat the terms already in effect
+        self.changes = []
+        for month in sorted(resolved):
+            entry = resolved[month]
+            previous = self.changes[-1] if self.changes else None
+            if previous and all(previous[key] == entry[key] for key in ('extra_payment', 'strategy', 'allocation')):
+                continue
+            self.changes.append(entry)
+    
+    @property
+    def strategy(self) -> Optional[str]:
+        """Strategy the plan runs with: the first commitment's, even if it starts later (None without commitments)."""
+        if not self.changes:
+            return None
+        return self.changes[0]['strategy']
+    
+    @property
+    def strategy_switch(self) -> Optional[int]:
+        """First month whose commitment changes the strategy, which a simulation can't follow (None if none do)."""
+        for entry in self.changes[1:]:
+            if entry['strategy'] != self.changes[0]['strategy']:
+                return entry['month']
+        return None
+    
+    def events(self, debts: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        """
+        The timeline as PaymentSchedule request events.
+        
+        Put them ahead of any request events: events on the same month apply in
+        order, so an explicit schedule still overrides a commitment. With `debts`,
+        allocations to debts no longer in the portfolio (deleted or paid since
+        the commitment) are dropped; they would receive nothing anyway.
+        """
+        known = {str(debt.id) for debt in debts} if debts is not None else None
+        events = []
+        for entry in self.changes:
+            allocation = {debt_id: amount for debt_id, amount in entry['allocation'].items()
+                          if known is None or debt_id in known}
+            events.append({'type': 'extra_payment', 'month': entry['month'], 'amount': entry['extra_payment']})
+            events.append({'type': 'allocation', 'month': entry['month'], 'allocation': allocation})
+        return events
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready view of the resolved timeline."""
+        return {
+            'strategy': self.strategy,
+            'changes': [
+                {
+                    'month': entry['month'],
+                    'date': entry['date'],
+                    'extra_payment': float(entry['extra_payment']),
+                    'strategy': entry['strategy'],
+                    'allocation': {k: float(v) for k, v in entry['allocation'].items()}
+                }
+                for entry in self.changes
+            ]
+        }
+    
+    def _month(self, effective: Any, start_date: datetime) -> int:
+        """Simulation month of a date: the plan month of its calendar month, as the engines label them."""
+        if isinstance(effective, str):
+            effective = datetime.strptime(effective[:10], '%Y-%m-%d')
+        return max(1, month_number(start_date, effective))
+    
+    def _format(self, effective: Any) -> str:
+        """YYYY-MM-DD for a date, datetime or ISO string."""
+        if isinstance(effective, (datetime, date)):
+            return effective.strftime('%Y-%m-%d')
+        return str(effective)[:10]
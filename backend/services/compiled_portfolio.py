@@ -0,0 +1,177 @@
+"""
+Compiled Portfolio
+Per-portfolio constants computed once and shared by the engines and strategies.
+
+Everything a simulation needs that does not change from month to month (the
+monthly rates, the minimum payments and their total, the avalanche order and
+the square roots the hybrid score divides by) depends only on the debts' ids,
+rates, compounding modes, payment frequencies, minimums and statuses, never
+on their balances. A compiled portfolio holds those values in flat lists
+indexed like the debts it was compiled from, and is cached under the values
+themselves, so every request, solver evaluation and strategy that sees the
+same portfolio version reuses one compilation instead of recomputing it per
+call or per simulated month. Balances are left out of the key, so payments
+and imports, which only move balances, keep hitting the same entry.
+
+Compiled portfolios are read-only. Engines that change a rate or add a debt
+mid-simulation (schedule events) copy the lists they need and update their
+copies.
+
+Daily compounding depends on the length of the month as well, so its rate is
+a function of (apr, days) cached for the process: there are only four month
+lengths, and the exponentiation runs once per APR and length instead of once
+per debt per simulated month.
+
+Weekly-paid debts are still stepped monthly. Their payments fall on a weekly
+cadence anchored on the plan's start date, so a month holds four or five of
+them, and each one lowers the balance that accrues interest for the rest of
+the month. The interest one rand of each payment saves depends only on the
+rate, the compounding mode, the month's length and the day of its first
+payment (at most 28 patterns per rate), so those weights and their running
+sums are cached too, and a month's saving is a closed-form sum over them.
+"""
+
+from collections import OrderedDict
+from decimal import Decimal
+from typing import List, Dict, Any, Tuple
+import functools
+import threading
+
+
+@functools.lru_cache(maxsize=4096)
+def daily_compounded_rate(apr: Decimal, days: int) -> Decimal:
+    """Interest rate of a `days`-day month compounded daily at apr/365: (1 + apr/365)^days - 1."""
+    return (Decimal('1') + apr / Decimal('365')) ** Decimal(days) - Decimal('1')
+
+
+@functools.lru_cache(maxsize=4096)
+def weekly_payment_weights(apr: Decimal, compounding: str, days: int,
+                           first_payday: int) -> Tuple[Tuple[Decimal, ...], Tuple[Decimal, ...]]:
+    """
+    Interest saved per rand of each weekly payment in a `days`-day month whose
+    first payment lands on day `first_payday` (0-based), and their running sums.
+    
+    A payment on day t lowers the balance for the remaining days - t days:
+    under daily compounding it saves (1 + apr/365)^(days - t) - 1 per rand;
+    under monthly compounding interest is charged on the average daily
+    balance, so it saves apr/12 * (days - t) / days.
+    """
+    paydays = range(first_payday, days, 7)
+    if compounding == 'daily':
+        growth = Decimal('1') + apr / Decimal('365')
+        weights = tuple(growth ** Decimal(days - t) - Decimal('1') for t in paydays)
+    elif compounding == 'none':
+        weights = tuple(Decimal('0') for t in paydays)
+    else:
+        rate = apr / Decimal('12')
+        weights = tuple(rate * Decimal(days - t) / Decimal(days) for t in paydays)
+    
+    running = [Decimal('0')]
+    for weight in weights:
+        running.append(running[-1] + weight)
+    return weights, tuple(running)
+
+
+def weekly_payment_credit(apr: Decimal, compounding: str, days: int, first_payday: int,
+                          payment: Decimal, balance: Decimal) -> Decimal:
+    """Interest a month's weekly payments save on `balance`; payments stop once it is cleared."""
+    if payment <= 0 or balance <= 0:
+        return Decimal('0')
+    weights, running = weekly_payment_weights(apr, compounding, days, first_payday)
+    # Whole payments made before the balance runs out, then the final partial one
+    full = min(len(weights), int(balance // payment))
+    credit = payment * running[full]
+    if full < len(weights):
+        credit += (balance - payment * full) * weights[full]
+    return credit
+
+
+def monthly_rate(apr: Decimal, compounding: str) -> Decimal:
+    """Rate charged per month under monthly compounding; interest-free debts ('none') charge nothing."""
+    return Decimal('0') if compounding == 'none' else apr / Decimal('12')
+
+
+class CompiledPortfolio:
+    """Rates, minimums and strategy orderings of one portfolio version."""
+    
+    def __init__(self, key: Tuple[Tuple[Any, ...], ...], debts: List[Any]):
+        self.key = key
+        self.ids = [debt.id for debt in debts]
+        self.aprs = [debt.apr for debt in debts]
+        self.compounding = [debt.compounding for debt in debts]
+        self.monthly_rates = [monthly_rate(apr, mode) for apr, mode in zip(self.aprs, self.compounding)]
+        # Debts whose monthly rate depends on the month's length (see daily_compounded_rate)
+        self.daily = [i for i, mode in enumerate(self.compounding) if mode == 'daily']
+        self.min_payments = [debt.min_payment for debt in debts]
+        self.active = [i for i, debt in enumerate(debts) if debt.status == 'active']
+        self.total_min_payments = sum(self.min_payments)
+        # Debts paid weekly; their min_payment is due on every payday, so a month's total varies
+        self.weekly = [i for i, debt in enumerate(debts) if debt.payment_frequency == 'weekly']
+        self.weekly_min_payments = sum(self.min_payments[i] for i in self.weekly)
+        
+        # Highest APR first; ties keep portfolio order, as the engines' stable sorts do
+        self.avalanche_order = sorted(range(len(debts)), key=lambda i: self.aprs[i], reverse=True)
+        self.avalanche_rank = [0] * len(debts)
+        for rank, i in enumerate(self.avalanche_order):
+            self.avalanche_rank[i] = rank
+        self._apr_roots = None
+    
+    @property
+    def apr_roots(self) -> List[Decimal]:
+        """sqrt(apr) per debt, the denominator of the hybrid score; computed on first use."""
+        if self._apr_roots is None:
+            self._apr_roots = [apr ** Decimal('0.5') for apr in self.aprs]
+        return self._apr_roots
+
+
+class PortfolioCompiler:
+    """Bounded LRU of compiled portfolios keyed by the values they were compiled from."""
+    
+    def __init__(self, max_portfolios: int = 256):
+        self.max_portfolios = max_portfolios
+        self._compiled = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+    
+    @staticmethod
+    def portfolio_key(debts: List[Any]) -> Tuple[Tuple[Any, ...], ...]:
+        """The portfolio version: every debt's id, rate, compounding, minimum, schedule and status, in order."""
+        return tuple((debt.id, debt.apr, debt.compounding, debt.min_payment,
+                      debt.payment_frequency, debt.status) for debt in debts)
+    
+    def compile(self, debts: List[Any]) -> CompiledPortfolio:
+        """Return the compiled form of `debts`, compiling it on first sight of this version."""
+        key = self.portfolio_key(debts)
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self._compiled.move_to_end(key)
+                self._hits += 1
+                return compiled
+            self._misses += 1
+        
+        compiled = CompiledPortfolio(key, debts)
+        with self._lock:
+            self._compiled[key] = compiled
+            if len(self._compiled) > self.max_portfolios:
+                self._compiled.popitem(last=False)
+        return compiled
+    
+    def stats(self) -> Dict[str, int]:
+        """Cached portfolio count and hit/miss counters."""
+        with self._lock:
+            return {
+                'portfolios': len(self._compiled),
+                'max_portfolios': self.max_portfolios,
+                'hits': self._hits,
+                'misses': self._misses
+            }
+
+
+portfolio_compiler = PortfolioCompiler()
+
+
+def compile_portfolio(debts: List[Any]) -> CompiledPortfolio:
+    """Compiled form of `debts` from the shared cache."""
+    return portfolio_compiler.compile(debts)
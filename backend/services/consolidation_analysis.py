@@ -0,0 +1,221 @@
+"""
+Consolidation Analysis
+Scores batches of consolidation loan offers against the simulated current plan.
+
+The current plan is simulated once. Each offer then costs only annuity math:
+the payment factor for a (rate, term) pair does not depend on the principal,
+so it is computed once and shared across every fee level and debt selection,
+and the debts left out of an offer are simulated once per distinct selection.
+"""
+
+from decimal import Decimal
+from typing import List, Dict, Any, Optional
+import copy
+import itertools
+
+from .tracing import traced
+
+
+def calculate_monthly_payment(principal, annual_rate, months):
+    """Calculate monthly payment for a loan."""
+    if annual_rate == 0:
+        return principal / Decimal(str(months))
+    
+    monthly_rate = annual_rate / Decimal('12')
+    months_decimal = Decimal(str(months))
+    payment = principal * (monthly_rate * (1 + monthly_rate) ** months_decimal) / ((1 + monthly_rate) ** months_decimal - 1)
+    return payment
+
+
+class ConsolidationAnalyzer:
+    """Rank consolidation offers by total cost against the current plan."""
+    
+    def __init__(self, simulation_engine, max_offers: int = 10000):
+        self.simulation_engine = simulation_engine
+        self.max_offers = max_offers
+    
+    def build_offers(self, debts: List[Any], offers: Optional[List[Dict[str, Any]]] = None,
+                     grid: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Expand explicit offers and/or a rate x term x fees x debt-selection grid.
+        
+        Rates are annual fractions (0.09 = 9%); `debt_ids` defaults to every debt.
+        """
+        all_ids = [debt.id for debt in debts]
+        expanded = []
+        
+        for offer in offers or []:
+            expanded.append({
+                'name': offer.get('name'),
+                'rate': Decimal(str(offer['rate'])),
+                'term': int(offer['term']),
+                'fees': Decimal(str(offer.get('fees', 0))),
+                'debt_ids': list(offer.get('debt_ids') or all_ids)
+            })
+        
+        if grid:
+            rates = grid.get('rates', [])
+            terms = grid.get('terms', [])
+            fees = grid.get('fees') or [0]
+            selections = grid.get('debt_sets') or [all_ids]
+            size = len(rates) * len(terms) * len(fees) * len(selections)
+            if len(expanded) + size > self.max_offers:
+                raise ValueError(f'Too many offers: limit is {self.max_offers}')
+            for rate, term, fee, selection in itertools.product(rates, terms, fees, selections):
+                expanded.append({
+                    'name': None,
+                    'rate': Decimal(str(rate)),
+                    'term': int(term),
+                    'fees': Decimal(str(fee)),
+                    'debt_ids': list(selection)
+                })
+        
+        if len(expanded) > self.max_offers:
+            raise ValueError(f'Too many offers: limit is {self.max_offers}')
+        
+        for offer in expanded:
+            if offer['term'] <= 0:
+                raise ValueError('Offer term must be positive')
+            if offer['rate'] < 0 or offer['fees'] < 0:
+                raise ValueError('Offer rate and fees must not be negative')
+            unknown = set(offer['debt_ids']) - set(all_ids)
+            if unknown:
+                raise ValueError(f'Unknown debt ids in offer: {sorted(unknown)}')
+        
+        return expanded
+    
+    @traced('consolidation.analyze')
+    def analyze(self, debts: List[Any], offers: List[Dict[str, Any]], strategy: str = 'avalanche',
+                extra_payment: Decimal = Decimal('0'),
+                max_monthly_payment: Optional[Decimal] = None) -> Dict[str, Any]:
+        """
+        Simulate the current plan once and rank every offer against it.
+        
+        Args:
+            debts: List of SimpleDebt objects
+            offers: Offers from build_offers
+            strategy: Strategy used for the current plan and for debts left out of an offer
+            extra_payment: Monthly extra payment on top of minimums
+            max_monthly_payment: Affordability limit; defaults to minimums plus extra payment
+        
+        Returns:
+            Dictionary with the current plan and offers ranked by total cost,
+            affordable offers first
+        """
+        # Per call, so concurrent analyses on one analyzer don't share state: the engine
+        # (a shallow copy with its own `debts`) and the simulations memoised per selection
+        engine = copy.copy(self.simulation_engine)
+        remainders = {}
+        
+        total_debt = sum(debt.principal for debt in debts)
+        total_min_payments = sum(debt.min_payment for debt in debts)
+        if max_monthly_payment is None:
+            max_monthly_payment = total_min_payments + extra_payment
+        weighted_rate = sum(debt.principal * debt.apr for debt in debts) / total_debt if total_debt > 0 else Decimal('0')
+        
+        current = self._simulate_remainder(engine, remainders, debts, strategy, extra_payment)
+        current_cost = total_debt + current['interest']
+        
+        # Payment per rand borrowed, shared by every offer with the same rate and term
+        factors = {}
+        for key in {(offer['rate'], offer['term']) for offer in offers}:
+            factors[key] = calculate_monthly_payment(Decimal('1'), key[0], key[1])
+        
+        ranked = []
+        for offer in offers:
+            included = set(offer['debt_ids'])
+            consolidated = sum(debt.principal for debt in debts if debt.id in included)
+            left_out = [debt for debt in debts if debt.id not in included]
+            remainder = self._simulate_remainder(engine, remainders, left_out, strategy, extra_payment)
+            
+            loan_principal = consolidated + offer['fees']
+            loan_payment = loan_principal * factors[(offer['rate'], offer['term'])]
+            loan_total = loan_payment * offer['term']
+            loan_interest = loan_total - loan_principal
+            
+            total_cost = loan_total + sum(debt.principal for debt in left_out) + remainder['interest']
+            required_payment = loan_payment + sum(debt.min_payment for debt in left_out)
+            monthly_payment = required_payment
+            if left_out:
+                # The extra payment keeps going to the debts outside the loan
+                monthly_payment += extra_payment
+            
+            ranked.append({
+                'name': offer['name'],
+                'interestRate': float(offer['rate']),
+                'termMonths': offer['term'],
+                'fees': float(offer['fees']),
+                'debtIds': sorted(included),
+                'consolidatedDebt': float(consolidated),
+                'monthlyPayment': float(monthly_payment),
+                'loanPayment': float(loan_payment),
+                'loanInterest': float(loan_interest),
+                'remainingDebtsInterest': float(remainder['interest']),
+                'totalCost': float(total_cost),
+                'monthsToZero': max(offer['term'], remainder['months']),
+                # Required payments on both sides; the extra payment is the user's choice either way
+                'monthlySavings': float(total_min_payments - required_payment),
+                'totalSavings': float(current_cost - total_cost),
+                'affordable': monthly_payment <= max_monthly_payment,
+                'cleared': remainder['cleared']
+            })
+        
+        ranked.sort(key=lambda item: (not item['affordable'], item['totalCost']))
+        for rank, item in enumerate(ranked, start=1):
+            item['rank'] = rank
+        
+        # Best offer in the original single-offer response shape
+        best = ranked[0] if ranked else None
+        consolidation = None
+        savings = None
+        if best:
+            consolidation = {
+                'totalDebt': best['consolidatedDebt'],
+                'monthlyPayment': best['loanPayment'],
+                'interestRate': best['interestRate'],
+                'termMonths': best['termMonths'],
+                'totalPayments': best['loanPayment'] * best['termMonths']
+            }
+            savings = {
+                'monthlySavings': best['monthlySavings'],
+                'totalSavings': best['totalSavings'],
+                'rateReduction': float(weighted_rate) - best['interestRate'],
+                'recommended': best['totalSavings'] > 0
+            }
+        
+        return {
+            'current': {
+                'totalDebt': float(total_debt),
+                'monthlyPayments': float(total_min_payments),
+                'averageRate': float(weighted_rate),
+                'totalInterest': float(current['interest']),
+                'totalPayments': float(current_cost),
+                'monthsToZero': current['months'],
+                'cleared': current['cleared'],
+                'strategy': strategy
+            },
+            'consolidation': consolidation,
+            'savings': savings,
+            'offers': ranked
+        }
+    
+    def _simulate_remainder(self, engine, remainders: Dict[frozenset, Dict[str, Any]], debts: List[Any],
+                            strategy: str, extra_payment: Decimal) -> Dict[str, Any]:
+        """Summary-only simulation of a debt selection, memoised per selection in `remainders`."""
+        key = frozenset(debt.id for debt in debts)
+        if key in remainders:
+            return remainders[key]
+        
+        if debts:
+            engine.debts = debts
+            summary = engine.simulate_summary(strategy, extra_payment)
+            remainder = {
+                'interest': Decimal(str(summary['total_interest_paid'])),
+                'months': summary['months_to_zero'],
+                'cleared': summary['final_total_balance'] == 0
+            }
+        else:
+            remainder = {'interest': Decimal('0'), 'months': 0, 'cleared': True}
+        
+        remainders[key] = remainder
+        return remainder
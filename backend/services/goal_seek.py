@@ -0,0 +1,257 @@
+"""
+Goal-Seek Solver
+Finds the extra payment, lump sum or interest rate that meets a payoff goal.
+
+Months-to-zero and total interest are monotone in each of the solved
+variables, so the solver brackets the answer and narrows the bracket with
+bisection (for the month-count step functions) or Illinois false position
+(for the smooth interest targets), running the summary-only simulation at
+every probe.
+"""
+
+from decimal import Decimal, ROUND_UP, ROUND_DOWN
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+import copy
+
+from .simple_simulation_engine import month_number
+from .tracing import traced
+
+
+class GoalSeekContext:
+    """State of one solve() call, kept off the solver so concurrent calls don't share it."""
+    
+    def __init__(self, simulation_engine, debts: List[Any], variable: str, strategy: str,
+                 extra_payment: Decimal):
+        # A shallow copy gets its own `debts` while keeping the engine's start date and profiler
+        self.simulation_engine = copy.copy(simulation_engine)
+        self.debts = debts
+        self.variable = variable
+        self.strategy = strategy
+        self.extra_payment = extra_payment
+        self.rate_index = None
+        self.score = None
+        self.evaluations = 0
+
+
+class GoalSeekSolver:
+    """Server-side goal seek over the summary-only simulation."""
+    
+    VARIABLES = ('extra_payment', 'lump_sum', 'rate')
+    TARGETS = ('debt_free_by', 'months_to_zero', 'interest_saved', 'total_interest')
+    
+    def __init__(self, simulation_engine, max_iterations: int = 60, max_expansions: int = 12):
+        self.simulation_engine = simulation_engine
+        self.max_iterations = max_iterations
+        self.max_expansions = max_expansions
+    
+    @traced('goal_seek.solve')
+    def solve(self, debts: List[Any], variable: str, target: str, value: Any,
+              strategy: str = 'avalanche', extra_payment: Decimal = Decimal('0'),
+              debt_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Solve for the variable value that meets the target.
+        
+        Args:
+            debts: List of SimpleDebt objects
+            variable: 'extra_payment', 'lump_sum' or 'rate'
+            target: 'debt_free_by', 'months_to_zero', 'interest_saved' or 'total_interest'
+            value: Target value (YYYY-MM date, month count or amount)
+            strategy: 'avalanche' or 'snowball'
+            extra_payment: Current monthly extra payment (held fixed unless solved for)
+            debt_id: Debt whose rate is solved for when variable is 'rate'
+        
+        Returns:
+            Dictionary with the solution and the plan summary at that solution
+        """
+        if variable not in self.VARIABLES:
+            raise ValueError(f'Invalid variable: {variable}')
+        if target not in self.TARGETS:
+            raise ValueError(f'Invalid target: {target}')
+        
+        context = GoalSeekContext(self.simulation_engine, debts, variable, strategy, extra_payment)
+        
+        if variable == 'rate':
+            matches = [i for i, debt in enumerate(debts) if debt.id == debt_id]
+            if not matches:
+                raise ValueError(f'Debt {debt_id} not found')
+            context.rate_index = matches[0]
+            current_value = debts[context.rate_index].apr
+        elif variable == 'extra_payment':
+            current_value = extra_payment
+        else:
+            current_value = Decimal('0')
+        
+        baseline = self._evaluate(context, current_value)
+        context.score = self._build_score(target, value, baseline)
+        
+        if variable == 'rate':
+            # Interest and months grow with the rate: find the highest rate that still meets the goal
+            tolerance = Decimal('0.000001')
+            low = Decimal('0')
+            high = max(current_value * 2, Decimal('1'))
+            feasible, infeasible = low, high
+        else:
+            # More money never hurts: find the smallest amount that meets the goal
+            tolerance = Decimal('0.01')
+            low = Decimal('0')
+            high = max(sum(debt.principal for debt in debts), Decimal('1'))
+            feasible, infeasible = high, low
+        
+        result = {
+            'variable': variable,
+            'target': target,
+            'target_value': value,
+            'strategy': strategy,
+            'current_value': float(current_value),
+            'baseline_summary': baseline
+        }
+        
+        feasible_score = self._probe(context, feasible)
+        infeasible_score = self._probe(context, infeasible)
+        
+        expansions = 0
+        while infeasible_score <= 0 and variable == 'rate' and expansions < self.max_expansions:
+            # Met at the top of the bracket: raise it until some rate misses the goal
+            feasible, feasible_score = infeasible, infeasible_score
+            infeasible = infeasible * 2
+            infeasible_score = self._probe(context, infeasible)
+            expansions += 1
+        
+        if infeasible_score <= 0:
+            if variable == 'rate':
+                # Every rate searched meets the goal, so there is no highest rate to report
+                result.update(self._finish(context, infeasible, True, 0))
+                result.update({'solution': None, 'met_up_to': result['solution']})
+                return result
+            # Already met without paying anything more
+            result.update(self._finish(context, infeasible, True, 0))
+            return result
+        
+        expansions = 0
+        while feasible_score > 0 and variable != 'rate' and expansions < self.max_expansions:
+            infeasible, infeasible_score = feasible, feasible_score
+            feasible = feasible * 2
+            feasible_score = self._probe(context, feasible)
+            expansions += 1
+        
+        if feasible_score > 0:
+            result.update(self._finish(context, feasible, False, 0))
+            return result
+        
+        solution, iterations = self._narrow(context, feasible, feasible_score, infeasible, infeasible_score,
+                                            tolerance, secant=target in ('interest_saved', 'total_interest'))
+        result.update(self._finish(context, solution, True, iterations))
+        return result
+    
+    def _build_score(self, target: str, value: Any, baseline: Dict[str, Any]):
+        """Return a function that is <= 0 exactly when a summary meets the target."""
+        if target in ('debt_free_by', 'months_to_zero'):
+            limit = self._months_until(value) if target == 'debt_free_by' else int(value)
+            
+            def score(summary):
+                if summary['final_total_balance'] > 0:
+                    return Decimal('Infinity')
+                return Decimal(summary['months_to_zero'] - limit)
+            return score
+        
+        amount = Decimal(str(value))
+        if target == 'interest_saved':
+            base_interest = Decimal(str(baseline['total_interest_paid']))
+            return lambda summary: amount - (base_interest - Decimal(str(summary['total_interest_paid'])))
+        return lambda summary: Decimal(str(summary['total_interest_paid'])) - amount
+    
+    def _months_until(self, date_value: str) -> int:
+        """Simulated month labelled with the target month (0 if it has passed)."""
+        target_date = datetime.strptime(str(date_value)[:7], '%Y-%m')
+        return max(month_number(datetime.now(), target_date), 0)
+    
+    def _narrow(self, context: GoalSeekContext, feasible: Decimal, feasible_score: Decimal, infeasible: Decimal,
+                infeasible_score: Decimal, tolerance: Decimal, secant: bool) -> Tuple[Decimal, int]:
+        """Shrink the bracket with bisection, or Illinois false position when the score is smooth."""
+        iterations = 0
+        retained = None
+        
+        while abs(feasible - infeasible) > tolerance and iterations < self.max_iterations:
+            iterations += 1
+            midpoint = (feasible + infeasible) / 2
+            probe = midpoint
+            
+            if secant and infeasible_score.is_finite() and infeasible_score != feasible_score:
+                estimate = feasible - feasible_score * (infeasible - feasible) / (infeasible_score - feasible_score)
+                # Stay strictly inside the bracket
+                margin = abs(infeasible - feasible) / 100
+                if min(feasible, infeasible) + margin < estimate < max(feasible, infeasible) - margin:
+                    probe = estimate
+            
+            probe_score = self._probe(context, probe)
+            if probe_score <= 0:
+                feasible, feasible_score = probe, probe_score
+                if retained == 'infeasible':
+                    infeasible_score /= 2
+                retained = 'infeasible'
+            else:
+                infeasible, infeasible_score = probe, probe_score
+                if retained == 'feasible':
+                    feasible_score /= 2
+                retained = 'feasible'
+        
+        return feasible, iterations
+    
+    def _finish(self, context: GoalSeekContext, solution: Decimal, achievable: bool,
+                iterations: int) -> Dict[str, Any]:
+        """Round the solution away from the infeasible side and summarise it."""
+        if context.variable == 'rate':
+            solution = solution.quantize(Decimal('0.000001'), rounding=ROUND_DOWN)
+        else:
+            solution = solution.quantize(Decimal('0.01'), rounding=ROUND_UP)
+        
+        return {
+            'achievable': achievable,
+            'solution': float(solution),
+            'summary': self._evaluate(context, solution),
+            'iterations': iterations,
+            'evaluations': context.evaluations
+        }
+    
+    def _probe(self, context: GoalSeekContext, value: Decimal) -> Decimal:
+        """Score one candidate value."""
+        return context.score(self._evaluate(context, value))
+    
+    def _evaluate(self, context: GoalSeekContext, value: Decimal) -> Dict[str, Any]:
+        """Run the summary-only simulation with the variable set to `value`."""
+        context.evaluations += 1
+        extra_payment = context.extra_payment
+        debts = context.debts
+        
+        if context.variable == 'extra_payment':
+            extra_payment = value
+        elif context.variable == 'rate':
+            debts = list(debts)
+            debts[context.rate_index] = copy.copy(debts[context.rate_index])
+            debts[context.rate_index].apr = value
+        elif value > 0:
+            debts = self._apply_lump_sum(debts, value, context.strategy)
+        
+        context.simulation_engine.debts = debts
+        return context.simulation_engine.simulate_summary(context.strategy, extra_payment)
+    
+    def _apply_lump_sum(self, debts: List[Any], amount: Decimal, strategy: str) -> List[Any]:
+        """Pay a one-off amount down in strategy order before month one."""
+        if strategy == 'snowball':
+            order = sorted(range(len(debts)), key=lambda i: debts[i].principal)
+        else:
+            order = sorted(range(len(debts)), key=lambda i: debts[i].apr, reverse=True)
+        
+        reduced = list(debts)
+        for i in order:
+            if amount <= 0:
+                break
+            debt = copy.copy(debts[i])
+            payment = min(amount, debt.principal)
+            debt.principal -= payment
+            if debt.principal <= 0:
+                debt.status = 'paid'
+            amount -= payment
+            reduced[i] = debt
+        return reduced
@@ -5,7 +5,9 @@ APR-adjusted balance heuristic - balances mathematical optimization with psychol
 
 from decimal import Decimal
 from typing import List, Dict, Any
+from .compiled_portfolio import compile_portfolio
 from .simulation_engine import SimulationEngine, Debt
+from .tracing import traced
 
 
 class HybridStrategy:
@@ -14,22 +16,27 @@ class HybridStrategy:
     def __init__(self):
         self.simulation_engine = SimulationEngine()
     
+    @traced('strategy.hybrid')
     def calculate_strategy(self, debts: List[Debt], extra_payment: Decimal = Decimal('0')) -> Dict[str, Any]:
         """Calculate hybrid strategy results."""
         return self.simulation_engine.run_simulation(debts, extra_payment, 'hybrid')
     
     def get_recommendation(self, debts: List[Debt]) -> Dict[str, Any]:
         """Get hybrid strategy recommendation."""
-        active_debts = [d for d in debts if d.status == 'active']
-        if not active_debts:
+        # The whole portfolio is compiled (not the active subset), so this shares the
+        # cached compilation with the engines instead of adding one per subset
+        compiled = compile_portfolio(debts)
+        if not compiled.active:
             return {'target_debt': None, 'rationale': 'No active debts'}
         
         # Calculate APR-adjusted balance score for each debt
+        apr_roots = compiled.apr_roots
         scored_debts = []
-        for debt in active_debts:
+        for i in compiled.active:
+            debt, apr_root = debts[i], apr_roots[i]
             # APR-adjusted balance heuristic: balance / sqrt(apr)
             # Lower score = higher priority
-            score = debt.principal / (debt.apr ** Decimal('0.5'))
+            score = debt.principal / apr_root
             scored_debts.append((debt, score))
         
         # Sort by score (lowest first)
@@ -59,14 +66,16 @@ class HybridStrategy:
     
     def get_strategy_analysis(self, debts: List[Debt]) -> Dict[str, Any]:
         """Get detailed analysis of hybrid strategy approach."""
-        active_debts = [d for d in debts if d.status == 'active']
-        if not active_debts:
+        compiled = compile_portfolio(debts)
+        if not compiled.active:
             return {'analysis': 'No active debts'}
         
         # Calculate scores for all debts
+        apr_roots = compiled.apr_roots
         scored_debts = []
-        for debt in active_debts:
-            score = debt.principal / (debt.apr ** Decimal('0.5'))
+        for i in compiled.active:
+            debt, apr_root = debts[i], apr_roots[i]
+            score = debt.principal / apr_root
             scored_debts.append({
                 'debt': debt,
                 'score': score,
@@ -83,7 +92,7 @@ class HybridStrategy:
         
         return {
             'strategy_name': 'Hybrid (APR-Adjusted Balance)',
-            'total_debts': len(active_debts),
+            'total_debts': len(compiled.active),
             'total_balance': float(total_balance),
             'average_apr': float(avg_apr),
             'debt_priorities': [
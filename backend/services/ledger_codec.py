@@ -0,0 +1,214 @@
+"""
+Ledger Codec
+Compact columnar binary encoding of a full simulation ledger.
+
+A ledger is every debt's balance, payment and interest for every simulated
+month, plus the monthly totals. Each column is stored as whole cents, split
+into fixed blocks of months, delta-encoded within the block and compressed
+on its own. A small header indexes every block, so a reader can decode just
+the months and debts it was asked for.
+
+Layout: MAGIC, version (1 byte), header length (4 bytes, big-endian),
+zlib-compressed JSON header, then the compressed blocks.
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from array import array
+import json
+import struct
+import sys
+import zlib
+
+from .simple_simulation_engine import month_date
+
+
+MAGIC = b'FFLG'
+VERSION = 1
+
+
+class LedgerCodec:
+    """Encode simulation results into the columnar ledger format."""
+    
+    DEBT_FIELDS = ('balance', 'payment', 'interest')
+    TOTAL_FIELDS = ('total_balance', 'interest', 'payments')
+    
+    def __init__(self, block_months: int = 60, level: int = 6):
+        self.block_months = block_months
+        self.level = level
+    
+    def encode(self, simulation_result: Dict[str, Any]) -> bytes:
+        """
+        Encode the `simulation_results` of a full simulation.
+        
+        Args:
+            simulation_result: Result of simulate_avalanche / simulate_snowball
+        
+        Returns:
+            Encoded ledger bytes
+        """
+        months = simulation_result['simulation_results']
+        
+        # Debts in order of first appearance (scheduled arrivals come later)
+        debts = []
+        positions = {}
+        for month_data in months:
+            for debt_info in month_data['debts']:
+                if debt_info['id'] not in positions:
+                    positions[debt_info['id']] = len(debts)
+                    debts.append({'id': debt_info['id'], 'name': debt_info['name']})
+        
+        # Debts that are paid off drop out of later months: they read as zero
+        columns = [[0] * len(months) for _ in range(len(debts) * len(self.DEBT_FIELDS))]
+        totals = [[0] * len(months) for _ in self.TOTAL_FIELDS]
+        for m, month_data in enumerate(months):
+            for debt_info in month_data['debts']:
+                base = positions[debt_info['id']] * len(self.DEBT_FIELDS)
+                columns[base][m] = self._cents(debt_info['balance'])
+                columns[base + 1][m] = self._cents(debt_info['payment_made'])
+                columns[base + 2][m] = self._cents(debt_info['interest_paid'])
+            totals[0][m] = self._cents(month_data['total_balance'])
+            totals[1][m] = self._cents(month_data['interest_this_month'])
+            totals[2][m] = self._cents(month_data['payments_this_month'])
+        
+        body = bytearray()
+        index = []
+        for column in columns + totals:
+            blocks = []
+            for start in range(0, len(months), self.block_months):
+                data = self._pack(column[start:start + self.block_months])
+                blocks.append([len(body), len(data)])
+                body += data
+            index.append(blocks)
+        
+        header = {
+            'months': len(months),
+            'start_date': months[0]['date'] if months else None,
+            'block_months': self.block_months,
+            'debts': debts,
+            'debt_fields': list(self.DEBT_FIELDS),
+            'total_fields': list(self.TOTAL_FIELDS),
+            'index': index
+        }
+        encoded_header = zlib.compress(json.dumps(header, separators=(',', ':')).encode(), self.level)
+        return MAGIC + struct.pack('>BI', VERSION, len(encoded_header)) + encoded_header + bytes(body)
+    
+    def _cents(self, value: Any) -> int:
+        """Round a money value to whole cents."""
+        return int(Decimal(str(value)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP) * 100)
+    
+    def _pack(self, values: List[int]) -> bytes:
+        """Delta-encode and compress one block of a column."""
+        deltas = array('q', values)
+        for i in range(len(values) - 1, 0, -1):
+            deltas[i] -= deltas[i - 1]
+        if sys.byteorder == 'big':
+            deltas.byteswap()
+        return zlib.compress(deltas.tobytes(), self.level)
+
+
+class LedgerReader:
+    """Lazy reader over an encoded ledger: only the requested blocks are decoded."""
+    
+    def __init__(self, blob: bytes):
+        if blob[:4] != MAGIC:
+            raise ValueError('Not an encoded ledger')
+        version, header_length = struct.unpack('>BI', blob[4:9])
+        if version != VERSION:
+            raise ValueError(f'Unsupported ledger version: {version}')
+        
+        header = json.loads(zlib.decompress(blob[9:9 + header_length]))
+        self._blob = memoryview(blob)[9 + header_length:]
+        self._index = header['index']
+        self.months = header['months']
+        self.block_months = header['block_months']
+        self.start_date = header['start_date']
+        self.debts = header['debts']
+        self.debt_fields = header['debt_fields']
+        self.total_fields = header['total_fields']
+    
+    def read(self, month_from: int = 1, month_to: Optional[int] = None,
+             debt_ids: Optional[List[Any]] = None, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Decode a month range for a subset of debts.
+        
+        Args:
+            month_from: First month (1-based, inclusive)
+            month_to: Last month (inclusive); defaults to the end of the ledger
+            debt_ids: Debts to include; defaults to every debt
+            fields: Debt fields to include; defaults to balance, payment and interest
+        
+        Returns:
+            Columnar dictionary: one list per field, aligned with `months`
+        """
+        first, last = self._clamp(month_from, month_to)
+        fields = fields or self.debt_fields
+        unknown = set(fields) - set(self.debt_fields)
+        if unknown:
+            raise ValueError(f'Unknown ledger fields: {sorted(unknown)}')
+        
+        selected = range(len(self.debts))
+        if debt_ids is not None:
+            wanted = {str(debt_id) for debt_id in debt_ids}
+            selected = [i for i, debt in enumerate(self.debts) if str(debt['id']) in wanted]
+        
+        debts = []
+        for i in selected:
+            entry = dict(self.debts[i])
+            for field in fields:
+                column = i * len(self.debt_fields) + self.debt_fields.index(field)
+                entry[field] = self._column(column, first, last)
+            debts.append(entry)
+        
+        result = self._frame(first, last)
+        result['debts'] = debts
+        result['totals'] = self.totals(first, last)
+        return result
+    
+    def totals(self, month_from: int = 1, month_to: Optional[int] = None) -> Dict[str, List[float]]:
+        """Decode only the monthly total columns for a month range."""
+        first, last = self._clamp(month_from, month_to)
+        offset = len(self.debts) * len(self.debt_fields)
+        return {
+            field: self._column(offset + i, first, last)
+            for i, field in enumerate(self.total_fields)
+        }
+    
+    def _clamp(self, month_from: int, month_to: Optional[int]):
+        """Clamp a 1-based inclusive month range to the ledger."""
+        first = max(1, int(month_from))
+        last = min(self.months, int(month_to) if month_to is not None else self.months)
+        return first, last
+    
+    def _frame(self, first: int, last: int) -> Dict[str, Any]:
+        """Month numbers and dates for a range, labelled as the engines label them."""
+        months = list(range(first, last + 1))
+        dates = []
+        if self.start_date:
+            start = datetime.strptime(self.start_date, '%Y-%m-%d')
+            dates = [month_date(start, m).strftime('%Y-%m-%d') for m in months]
+        return {'months': months, 'dates': dates}
+    
+    def _column(self, column: int, first: int, last: int) -> List[float]:
+        """Decode the blocks of one column that overlap months first..last."""
+        if last < first:
+            return []
+        
+        values = []
+        first_block = (first - 1) // self.block_months
+        last_block = (last - 1) // self.block_months
+        for block in range(first_block, last_block + 1):
+            offset, length = self._index[column][block]
+            deltas = array('q')
+            deltas.frombytes(zlib.decompress(self._blob[offset:offset + length]))
+            if sys.byteorder == 'big':
+                deltas.byteswap()
+            
+            running = 0
+            block_start = block * self.block_months + 1
+            for month, delta in enumerate(deltas, start=block_start):
+                running += delta
+                if first <= month <= last:
+                    values.append(running / 100)
+        return values
@@ -0,0 +1,373 @@
+"""
+Memory Repository
+Thread-safe in-memory Repository with the same semantics as the MySQL one.
+
+Tables are dictionaries keyed by auto-increment id and guarded by a single
+lock, so every call is atomic just like a MySQL transaction. Values are
+stored the way the schema stores them: DECIMAL columns rounded to their
+scale, timestamps truncated to whole seconds, ENUM defaults filled in.
+Callers always get copies, never the stored rows.
+
+Used to serve or load-test the API without a database:
+    
+    REPOSITORY=memory python app.py
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+from datetime import datetime, date
+from typing import List, Dict, Any, Optional, Iterable, Callable, Set, Tuple
+import copy
+import json
+import threading
+
+from .repository import Repository, DEBT_UPDATE_FIELDS, simple_debt
+from .simple_simulation_engine import SimpleDebt
+
+
+# DECIMAL scales from database/init.sql
+SCALES = {'principal': Decimal('0.01'), 'apr': Decimal('0.0001'), 'min_payment': Decimal('0.01'),
+          'amount': Decimal('0.01')}
+
+SAMPLE_DEBTS = [
+    {'name': 'Credit Card', 'principal': 15000.00, 'apr': 18.50, 'min_payment': 300.00,
+     'notes': 'High interest credit card debt'},
+    {'name': 'Car Loan', 'principal': 45000.00, 'apr': 8.75, 'min_payment': 650.00,
+     'notes': 'Vehicle financing'},
+    {'name': 'Personal Loan', 'principal': 25000.00, 'apr': 12.25, 'min_payment': 400.00,
+     'notes': 'Bank personal loan'},
+    {'name': 'Student Loan', 'principal': 35000.00, 'apr': 6.50, 'min_payment': 280.00,
+     'notes': 'Education debt'}
+]
+
+
+def _now() -> datetime:
+    """Current time at TIMESTAMP precision."""
+    return datetime.now().replace(microsecond=0)
+
+
+def _json_copy(value: Any) -> Any:
+    """Copy a value through JSON, as a JSON column round-trips it."""
+    return json.loads(json.dumps(value))
+
+
+def _store(field: str, value: Any) -> Any:
+    """Round a DECIMAL column value to its scale."""
+    if field in SCALES and value is not None:
+        return Decimal(str(value)).quantize(SCALES[field], rounding=ROUND_HALF_UP)
+    return value
+
+
+class MemoryRepository(Repository):
+    """Repository held in process memory."""
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._tables = {name: {} for name in ('debts', 'payments', 'commitments', 'plan_snapshots',
+                                              'plan_trajectories', 'projections')}
+        self._next_ids = {name: 1 for name in self._tables}
+    
+    def seed_sample_data(self, user_id: int = 1):
+        """Load the sample portfolio from database/init.sql for one user."""
+        self.create_debts(user_id, SAMPLE_DEBTS)
+    
+    def _insert(self, table: str, row: Dict[str, Any]) -> int:
+        """Insert a row with the next auto-increment id (caller holds the lock)."""
+        row_id = self._next_ids[table]
+        self._next_ids[table] += 1
+        row['id'] = row_id
+        self._tables[table][row_id] = row
+        return row_id
+    
+    def _rows(self, table: str, user_id: int) -> List[Dict[str, Any]]:
+        """The user's rows of a table in id order (caller holds the lock)."""
+        return [row for row in self._tables[table].values() if row['user_id'] == user_id]
+    
+    def _owned(self, table: str, user_id: int, row_id: Any) -> Optional[Dict[str, Any]]:
+        """The stored row if the user owns it (caller holds the lock)."""
+        row = self._tables[table].get(row_id)
+        return row if row is not None and row['user_id'] == user_id else None
+    
+    def _page(self, rows: List[Dict[str, Any]], key: str, parse: Callable, fields: List[str],
+              limit: Optional[int], after: Optional[tuple]):
+        """Newest-first keyset page over (key, id), like the indexed MySQL listing."""
+        if after:
+            after = (parse(after[0]), after[1])
+            rows = [row for row in rows if (row[key], row['id']) < after]
+        rows = sorted(rows, key=lambda row: (row[key], row['id']), reverse=True)
+        if limit is None:
+            return [{field: copy.deepcopy(row[field]) for field in fields} for row in rows], None
+        rows = rows[:limit + 1]
+        page = [{field: copy.deepcopy(row[field]) for field in fields} for row in rows[:limit]]
+        next_key = (rows[limit - 1][key], rows[limit - 1]['id']) if len(rows) > limit else None
+        return page, next_key
+    
+    # ------------------------------------------------------------------ debts
+    
+    def active_debts(self, user_id: int) -> List[SimpleDebt]:
+        with self._lock:
+            return [
+                simple_debt(row['id'], row['name'], row['principal'], row['apr'], row['min_payment'],
+                            row['compounding'], row['payment_frequency'])
+                for row in self._rows('debts', user_id) if row['status'] == 'active'
+            ]
+    
+    def list_debts(self, user_id: int, fields: List[str], limit: int,
+                   after: Optional[tuple] = None) -> Tuple[List[Dict[str, Any]], Optional[tuple]]:
+        with self._lock:
+            return self._page(self._rows('debts', user_id), 'created_at', datetime.fromisoformat,
+                              fields, limit, after)
+    
+    def get_debt(self, user_id: int, debt_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._owned('debts', user_id, debt_id)
+            if row is None:
+                return None
+            return {field: value for field, value in copy.deepcopy(row).items()
+                    if field not in ('user_id', 'updated_at')}
+    
+    def create_debts(self, user_id: int, items: List[Dict[str, Any]]) -> List[int]:
+        with self._lock:
+            now = _now()
+            return [self._insert('debts', {
+                'user_id': user_id,
+                'name': item['name'],
+                'principal': _store('principal', item['principal']),
+                'apr': _store('apr', item['apr']),
+                'min_payment': _store('min_payment', item['min_payment']),
+                'payment_frequency': item.get('payment_frequency', 'monthly'),
+                'compounding': item.get('compounding', 'monthly'),
+                'start_date': now.date(),
+                'status': 'active',
+                'notes': item.get('notes', ''),
+                'created_at': now,
+                'updated_at': now
+            }) for item in items]
+    
+    def update_debt(self, user_id: int, debt_id: int, changes: Dict[str, Any]) -> bool:
+        with self._lock:
+            row = self._owned('debts', user_id, debt_id)
+            if row is None:
+                return False
+            self._apply(row, changes)
+            return True
+    
+    def update_debts(self, user_id: int, items: List[Dict[str, Any]]) -> List[int]:
+        with self._lock:
+            missing = [item['id'] for item in items if self._owned('debts', user_id, item['id']) is None]
+            if missing:
+                return missing
+            for item in items:
+                self._apply(self._tables['debts'][item['id']], item)
+            return []
+    
+    def _apply(self, row: Dict[str, Any], changes: Dict[str, Any]):
+        """Update a debt row; updated_at moves only if a value changed (ON UPDATE semantics)."""
+        changed = False
+        for field in DEBT_UPDATE_FIELDS:
+            if field in changes:
+                value = _store(field, changes[field])
+                changed = changed or row[field] != value
+                row[field] = value
+        if changed:
+            row['updated_at'] = _now()
+    
+    def delete_debts(self, user_id: int, debt_ids: List[int]) -> Set[int]:
+        with self._lock:
+            owned = {debt_id for debt_id in debt_ids if self._owned('debts', user_id, debt_id) is not None}
+            for debt_id in owned:
+                del self._tables['debts'][debt_id]
+            # ON DELETE CASCADE
+            payments = self._tables['payments']
+            for payment_id in [pid for pid, row in payments.items() if row['debt_id'] in owned]:
+                del payments[payment_id]
+            return owned
+    
+    def debt_summary(self, user_id: int) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._rows('debts', user_id)
+            active = [row for row in rows if row['status'] == 'active']
+            last_updated = max((row['updated_at'] for row in rows), default=None)
+            if not active:
+                return {'debt_count': 0, 'total_principal': None, 'average_apr': None,
+                        'total_min_payments': None, 'last_updated': last_updated}
+            return {
+                'debt_count': len(active),
+                'total_principal': sum(row['principal'] for row in active),
+                'average_apr': sum(row['apr'] for row in active) / len(active),
+                'total_min_payments': sum(row['min_payment'] for row in active),
+                'last_updated': last_updated
+            }
+    
+    def debt_balance_dates(self, user_id: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {'id': row['id'], 'name': row['name'], 'balance_date': row['updated_at'].date()}
+                for row in self._rows('debts', user_id)
+            ]
+    
+    def get_projection(self, user_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            projection = self._tables['projections'].get(user_id)
+            return copy.deepcopy(projection) if projection else None
+    
+    # --------------------------------------------------------------- payments
+    
+    def list_payments(self, user_id: int, fields: List[str], limit: int, after: Optional[tuple] = None,
+                      debt_id: Optional[int] = None, date_from: Optional[str] = None,
+                      date_to: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[tuple]]:
+        date_from = date.fromisoformat(date_from) if date_from else None
+        date_to = date.fromisoformat(date_to) if date_to else None
+        with self._lock:
+            rows = [
+                row for row in self._rows('payments', user_id)
+                if (debt_id is None or row['debt_id'] == debt_id)
+                and (date_from is None or row['payment_date'] >= date_from)
+                and (date_to is None or row['payment_date'] <= date_to)
+            ]
+            return self._page(rows, 'payment_date', date.fromisoformat, fields, limit, after)
+    
+    def import_payments(self, user_id: int, batches: Iterable[List[tuple]], source: str,
+                        balance_totals: Optional[Callable[[], Dict[Any, Decimal]]] = None,
+                        dry_run: bool = False) -> int:
+        # Rows are staged and applied under the lock at the end, so a failed or
+        # dry-run import leaves nothing behind, as a rolled-back transaction would
+        staged = []
+        for batch in batches:
+            staged.extend(batch)
+        totals = balance_totals() if balance_totals and not dry_run else {}
+        if dry_run:
+            return len(staged)
+        
+        with self._lock:
+            # The payments.debt_id foreign key, and only the user's own debts
+            unknown = {debt_id for debt_id, _, _ in staged if self._owned('debts', user_id, debt_id) is None}
+            if unknown:
+                raise ValueError(f'Unknown debt ids: {sorted(unknown)}')
+            
+            now = _now()
+            for debt_id, amount, payment_date in staged:
+                self._insert('payments', {
+                    'user_id': user_id,
+                    'debt_id': debt_id,
+                    'amount': _store('amount', amount),
+                    'payment_date': payment_date,
+                    'source': source,
+                    'notes': None,
+                    'created_at': now
+                })
+            for debt_id, amount in totals.items():
+                row = self._owned('debts', user_id, debt_id)
+                if row is None:
+                    continue
+                principal = max(row['principal'] - _store('amount', amount), Decimal('0.00'))
+                if principal != row['principal']:
+                    row['principal'] = principal
+                    row['updated_at'] = now
+                if principal == 0:
+                    row['status'] = 'paid'
+        return len(staged)
+    
+    def payment_totals(self, user_id: int, date_from: str, date_to: str) -> Dict[str, Dict[Any, Decimal]]:
+        start, end = date.fromisoformat(date_from), date.fromisoformat(date_to)
+        with self._lock:
+            totals = {}
+            for row in self._rows('payments', user_id):
+                if start <= row['payment_date'] < end:
+                    month = totals.setdefault(row['payment_date'].strftime('%Y-%m'), {})
+                    month[row['debt_id']] = month.get(row['debt_id'], Decimal('0')) + row['amount']
+            return totals
+    
+    def payment_counts(self, user_id: int, source: str, date_from: date,
+                       date_to: date) -> Dict[Tuple[Any, date, Decimal], int]:
+        with self._lock:
+            counts = {}
+            for row in self._rows('payments', user_id):
+                if row['source'] == source and date_from <= row['payment_date'] <= date_to:
+                    key = (row['debt_id'], row['payment_date'], row['amount'])
+                    counts[key] = counts.get(key, 0) + 1
+            return counts
+    
+    # ------------------------------------------------------------ commitments
+    
+    def add_commitment(self, user_id: int, amount: Any, strategy: str = 'avalanche',
+                       custom_alloc: Optional[Any] = None, starts_on: Optional[Any] = None) -> int:
+        with self._lock:
+            return self._insert('commitments', {
+                'user_id': user_id,
+                'amount': _store('amount', amount),
+                'strategy': strategy,
+                'custom_alloc': _json_copy(custom_alloc),
+                'starts_on': date.fromisoformat(starts_on) if isinstance(starts_on, str) else starts_on,
+                'created_at': _now()
+            })
+    
+    def list_commitments(self, user_id: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = sorted(self._rows('commitments', user_id), key=lambda row: (row['created_at'], row['id']))
+            return [{field: value for field, value in copy.deepcopy(row).items() if field != 'user_id'}
+                    for row in rows]
+    
+    # -------------------------------------------------------------- snapshots
+    
+    def create_snapshot(self, user_id: int, name: str, state: Dict[str, Any],
+                        ledger: Optional[bytes] = None) -> int:
+        with self._lock:
+            return self._insert('plan_snapshots', {
+                'user_id': user_id,
+                'name': name,
+                'snapshot_date': _now(),
+                'state': _json_copy(state),
+                'ledger': bytes(ledger) if ledger else None
+            })
+    
+    def list_snapshots(self, user_id: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = sorted(self._rows('plan_snapshots', user_id),
+                          key=lambda row: (row['snapshot_date'], row['id']), reverse=True)
+            return [{'id': row['id'], 'name': row['name'], 'snapshot_date': row['snapshot_date'],
+                     'state': copy.deepcopy(row['state'])} for row in rows]
+    
+    def get_snapshot(self, user_id: int, snapshot_id: int) -> Optional[Dict[str, Any]]:
+        snapshots = self.get_snapshots(user_id, [snapshot_id])
+        return snapshots[0] if snapshots else None
+    
+    def get_snapshots(self, user_id: int, snapshot_ids: List[int]) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = [self._owned('plan_snapshots', user_id, snapshot_id) for snapshot_id in set(snapshot_ids)]
+            return [{field: value for field, value in copy.deepcopy(row).items() if field != 'user_id'}
+                    for row in sorted(filter(None, rows), key=lambda row: row['id'])]
+    
+    def delete_snapshot(self, user_id: int, snapshot_id: int) -> bool:
+        with self._lock:
+            if self._owned('plan_snapshots', user_id, snapshot_id) is None:
+                return False
+            del self._tables['plan_snapshots'][snapshot_id]
+            return True
+    
+    # ------------------------------------------------------------------ plans
+    
+    def get_plan(self, user_id: int) -> Optional[Tuple[int, Dict[str, Any]]]:
+        with self._lock:
+            rows = self._rows('plan_trajectories', user_id)
+            if not rows:
+                return None
+            row = max(rows, key=lambda row: (row['updated_at'], row['id']))
+            return row['id'], copy.deepcopy(row['state'])
+    
+    def replace_plan(self, user_id: int, state: Dict[str, Any]) -> int:
+        with self._lock:
+            # One saved plan per user
+            for row in self._rows('plan_trajectories', user_id):
+                del self._tables['plan_trajectories'][row['id']]
+            return self._insert('plan_trajectories', {
+                'user_id': user_id,
+                'state': _json_copy(state),
+                'updated_at': _now()
+            })
+    
+    def update_plan(self, plan_id: int, state: Dict[str, Any]):
+        with self._lock:
+            row = self._tables['plan_trajectories'].get(plan_id)
+            if row is not None:
+                row['state'] = _json_copy(state)
+                row['updated_at'] = _now()
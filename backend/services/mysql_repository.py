@@ -0,0 +1,481 @@
+"""
+MySQL Repository
+Repository implementation on the MySQL schema in database/init.sql.
+
+Each call opens its own connection and runs as one transaction: it commits
+when the call returns and rolls back if it raises. Listings read the
+(user_id, ...) composite indexes in order, so keyset pages never sort.
+
+Connections go through a circuit breaker. Once the database has failed a
+few times in a row, calls raise RepositoryUnavailable straight away instead
+of each waiting for a connect timeout, and a single trial connection is let
+through every `reset_timeout` seconds until one succeeds.
+"""
+
+from contextlib import contextmanager
+from decimal import Decimal
+from datetime import date
+from typing import List, Dict, Any, Optional, Iterable, Callable, Set, Tuple
+import json
+
+import mysql.connector
+from mysql.connector import Error, InterfaceError, OperationalError
+
+from .repository import Repository, RepositoryUnavailable, DEBT_UPDATE_FIELDS, simple_debt
+from .circuit_breaker import CircuitBreaker
+from .tracing import tracer, CLIENT
+from .simple_simulation_engine import SimpleDebt
+
+
+def _json(value: Any) -> Any:
+    """Decode a JSON column (the driver may already have decoded it)."""
+    return json.loads(value) if isinstance(value, (str, bytes)) else value
+
+
+class TracedCursor:
+    """Cursor wrapper that records each statement and fetch as a span of the current trace."""
+    
+    def __init__(self, cursor):
+        self._cursor = cursor
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+    
+    def __iter__(self):
+        return iter(self._cursor)
+    
+    def execute(self, query: str, params: Any = None):
+        with tracer.span('db.query', CLIENT, **{'db.system': 'mysql', 'db.statement': ' '.join(query.split())}):
+            return self._cursor.execute(query, params)
+    
+    def executemany(self, query: str, rows: List[tuple]):
+        with tracer.span('db.query', CLIENT, **{'db.system': 'mysql', 'db.statement': ' '.join(query.split()),
+                                                'db.rows': len(rows)}):
+            return self._cursor.executemany(query, rows)
+    
+    def fetchall(self) -> List[tuple]:
+        with tracer.span('db.fetch', CLIENT, **{'db.system': 'mysql'}) as span:
+            rows = self._cursor.fetchall()
+            if span:
+                span.set_attribute('db.rows', len(rows))
+            return rows
+
+
+class MySQLRepository(Repository):
+    """Repository backed by a MySQL database."""
+    
+    def __init__(self, db_config: Dict[str, Any], breaker: Optional[CircuitBreaker] = None):
+        self.db_config = db_config
+        self.breaker = breaker or CircuitBreaker()
+    
+    def health(self) -> Dict[str, Any]:
+        breaker = self.breaker.stats()
+        return {'backend': type(self).__name__, 'available': breaker['state'] != CircuitBreaker.OPEN, **breaker}
+    
+    @contextmanager
+    def _transaction(self, commit: bool = True):
+        """Yield a cursor on a new connection; commit on success, roll back on error."""
+        if not self.breaker.allow():
+            raise RepositoryUnavailable('Database unavailable')
+        try:
+            with tracer.span('db.connect', CLIENT, **{'db.system': 'mysql'}):
+                connection = mysql.connector.connect(**self.db_config)
+        except Error as e:
+            print(f"Database connection error: {e}")
+            self.breaker.record_failure()
+            raise RepositoryUnavailable('Database connection failed')
+        self.breaker.record_success()
+        
+        cursor = connection.cursor()
+        if tracer.current():
+            cursor = TracedCursor(cursor)
+        try:
+            yield cursor
+            if commit:
+                connection.commit()
+            else:
+                connection.rollback()
+        except (InterfaceError, OperationalError) as e:
+            # Lost the server mid-call: unavailable like a failed connect, so callers
+            # (and the stale-portfolio fallback) handle both the same way
+            print(f"Database error mid-transaction: {e}")
+            self.breaker.record_failure()
+            raise RepositoryUnavailable('Database connection lost') from e
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+    
+    # ------------------------------------------------------------------ debts
+    
+    def active_debts(self, user_id: int) -> List[SimpleDebt]:
+        with self._transaction() as cursor:
+            # Served by idx_debts_user_status
+            cursor.execute("""
+                SELECT id, name, principal, apr, min_payment, compounding, payment_frequency
+                FROM debts
+                WHERE user_id = %s AND status = 'active'
+            """, (user_id,))
+            rows = cursor.fetchall()
+        
+        with tracer.span('db.rows_to_debts', **{'db.rows': len(rows)}):
+            return [simple_debt(*row) for row in rows]
+    
+    def list_debts(self, user_id: int, fields: List[str], limit: int,
+                   after: Optional[tuple] = None) -> Tuple[List[Dict[str, Any]], Optional[tuple]]:
+        # Served by idx_debts_user_created; (created_at, id) keeps the order stable. The seek is
+        # spelled out rather than a row constructor, which MySQL doesn't use as an index range
+        query = f"""
+            SELECT {', '.join(fields)}, created_at, id
+            FROM debts
+            WHERE user_id = %s
+        """
+        params = [user_id]
+        if after:
+            query += " AND (created_at < %s OR (created_at = %s AND id < %s))"
+            params.extend((after[0], after[0], after[1]))
+        query += " ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit + 1)
+        
+        with self._transaction() as cursor:
+            cursor.execute(query, params)
+            return self._page(cursor.fetchall(), fields, limit)
+    
+    def get_debt(self, user_id: int, debt_id: int) -> Optional[Dict[str, Any]]:
+        with self._transaction() as cursor:
+            cursor.execute("""
+                SELECT id, name, principal, apr, min_payment, payment_frequency,
+                       compounding, start_date, status, notes, created_at
+                FROM debts
+                WHERE id = %s AND user_id = %s
+            """, (debt_id, user_id))
+            row = cursor.fetchone()
+            return dict(zip([column[0] for column in cursor.description], row)) if row else None
+    
+    def create_debts(self, user_id: int, items: List[Dict[str, Any]]) -> List[int]:
+        with self._transaction() as cursor:
+            # Sent as a single multi-row INSERT, so the new ids form one consecutive block
+            cursor.executemany("""
+                INSERT INTO debts (user_id, name, principal, apr, min_payment, payment_frequency,
+                                 compounding, notes)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """, [(
+                user_id,
+                item['name'],
+                item['principal'],
+                item['apr'],
+                item['min_payment'],
+                item.get('payment_frequency', 'monthly'),
+                item.get('compounding', 'monthly'),
+                item.get('notes', '')
+            ) for item in items])
+            first_id = cursor.lastrowid
+            return [first_id + i for i in range(len(items))]
+    
+    def update_debt(self, user_id: int, debt_id: int, changes: Dict[str, Any]) -> bool:
+        fields = [field for field in DEBT_UPDATE_FIELDS if field in changes]
+        assignments = ', '.join(f"{field} = %s" for field in fields)
+        with self._transaction() as cursor:
+            cursor.execute(f"UPDATE debts SET {assignments} WHERE id = %s AND user_id = %s",
+                           [changes[field] for field in fields] + [debt_id, user_id])
+            return cursor.rowcount > 0
+    
+    def update_debts(self, user_id: int, items: List[Dict[str, Any]]) -> List[int]:
+        ids = [item['id'] for item in items]
+        with self._transaction() as cursor:
+            # Lock the user's rows so ownership cannot change before the updates
+            placeholders = ', '.join(['%s'] * len(ids))
+            cursor.execute(f"""
+                SELECT id FROM debts
+                WHERE user_id = %s AND id IN ({placeholders})
+                FOR UPDATE
+            """, (user_id, *ids))
+            owned = {row[0] for row in cursor.fetchall()}
+            missing = [debt_id for debt_id in ids if debt_id not in owned]
+            if missing:
+                return missing
+            
+            # One executemany per distinct set of changed fields
+            groups = {}
+            for item in items:
+                fields = tuple(field for field in DEBT_UPDATE_FIELDS if field in item)
+                groups.setdefault(fields, []).append(
+                    tuple(item[field] for field in fields) + (item['id'], user_id)
+                )
+            for fields, rows in groups.items():
+                assignments = ', '.join(f"{field} = %s" for field in fields)
+                cursor.executemany(f"UPDATE debts SET {assignments} WHERE id = %s AND user_id = %s", rows)
+            return []
+    
+    def delete_debts(self, user_id: int, debt_ids: List[int]) -> Set[int]:
+        with self._transaction() as cursor:
+            placeholders = ', '.join(['%s'] * len(debt_ids))
+            cursor.execute(f"""
+                SELECT id FROM debts
+                WHERE user_id = %s AND id IN ({placeholders})
+                FOR UPDATE
+            """, (user_id, *debt_ids))
+            owned = {row[0] for row in cursor.fetchall()}
+            
+            if owned:
+                placeholders = ', '.join(['%s'] * len(owned))
+                cursor.execute(f"DELETE FROM debts WHERE user_id = %s AND id IN ({placeholders})",
+                               (user_id, *owned))
+            return owned
+    
+    def debt_summary(self, user_id: int) -> Dict[str, Any]:
+        with self._transaction() as cursor:
+            # Totals over the active debts; last_updated over all of them, so a debt
+            # marked paid (or reopened) still counts as a change
+            cursor.execute("""
+                SELECT
+                    SUM(status = 'active') as debt_count,
+                    SUM(CASE WHEN status = 'active' THEN principal END) as total_principal,
+                    AVG(CASE WHEN status = 'active' THEN apr END) as average_apr,
+                    SUM(CASE WHEN status = 'active' THEN min_payment END) as total_min_payments,
+                    MAX(updated_at) as last_updated
+                FROM debts
+                WHERE user_id = %s
+            """, (user_id,))
+            row = cursor.fetchone()
+            return {
+                'debt_count': int(row[0] or 0),
+                'total_principal': row[1],
+                'average_apr': row[2],
+                'total_min_payments': row[3],
+                'last_updated': row[4]
+            }
+    
+    def debt_balance_dates(self, user_id: int) -> List[Dict[str, Any]]:
+        with self._transaction() as cursor:
+            cursor.execute("""
+                SELECT id, name, updated_at
+                FROM debts
+                WHERE user_id = %s
+            """, (user_id,))
+            return [
+                {'id': row[0], 'name': row[1], 'balance_date': row[2].date() if row[2] else None}
+                for row in cursor.fetchall()
+            ]
+    
+    def get_projection(self, user_id: int) -> Optional[Dict[str, Any]]:
+        with self._transaction() as cursor:
+            cursor.execute("""
+                SELECT strategy, extra_payment, debt_count, months_to_zero, debt_free_date,
+                       total_interest, cleared, computed_at
+                FROM projections
+                WHERE user_id = %s
+            """, (user_id,))
+            row = cursor.fetchone()
+            return dict(zip([column[0] for column in cursor.description], row)) if row else None
+    
+    # --------------------------------------------------------------- payments
+    
+    def list_payments(self, user_id: int, fields: List[str], limit: int, after: Optional[tuple] = None,
+                      debt_id: Optional[int] = None, date_from: Optional[str] = None,
+                      date_to: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[tuple]]:
+        # Served by idx_payments_user_date (or idx_payments_debt_date for one debt);
+        # InnoDB appends the primary key, so (payment_date, id) is read in index order; the seek
+        # is spelled out rather than a row constructor, which MySQL doesn't use as an index range
+        query = f"""
+            SELECT {', '.join(fields)}, payment_date, id
+            FROM payments
+            WHERE user_id = %s
+        """
+        params = [user_id]
+        if debt_id is not None:
+            query += " AND debt_id = %s"
+            params.append(debt_id)
+        if date_from:
+            query += " AND payment_date >= %s"
+            params.append(date_from)
+        if date_to:
+            query += " AND payment_date <= %s"
+            params.append(date_to)
+        if after:
+            query += " AND (payment_date < %s OR (payment_date = %s AND id < %s))"
+            params.extend((after[0], after[0], after[1]))
+        query += " ORDER BY payment_date DESC, id DESC LIMIT %s"
+        params.append(limit + 1)
+        
+        with self._transaction() as cursor:
+            cursor.execute(query, params)
+            return self._page(cursor.fetchall(), fields, limit)
+    
+    def import_payments(self, user_id: int, batches: Iterable[List[tuple]], source: str,
+                        balance_totals: Optional[Callable[[], Dict[Any, Decimal]]] = None,
+                        dry_run: bool = False) -> int:
+        imported = 0
+        # A dry run reads and matches everything, then rolls the transaction back
+        with self._transaction(commit=not dry_run) as cursor:
+            # Every batch goes in as a single multi-row INSERT
+            for batch in batches:
+                if not dry_run:
+                    cursor.executemany("""
+                        INSERT INTO payments (debt_id, amount, payment_date, source, user_id)
+                        VALUES (%s, %s, %s, %s, %s)
+                    """, [payment + (source, user_id) for payment in batch])
+                imported += len(batch)
+            
+            totals = balance_totals() if balance_totals and not dry_run else {}
+            if totals:
+                # Columns update left to right, so status sees the reduced principal
+                cursor.executemany("""
+                    UPDATE debts
+                    SET principal = GREATEST(principal - %s, 0),
+                        status = IF(principal = 0, 'paid', status)
+                    WHERE id = %s AND user_id = %s
+                """, [(amount, debt_id, user_id) for debt_id, amount in totals.items()])
+        return imported
+    
+    def payment_totals(self, user_id: int, date_from: str, date_to: str) -> Dict[str, Dict[Any, Decimal]]:
+        with self._transaction() as cursor:
+            cursor.execute("""
+                SELECT DATE_FORMAT(payment_date, '%%Y-%%m') AS month, debt_id, SUM(amount)
+                FROM payments
+                WHERE user_id = %s AND payment_date >= %s AND payment_date < %s
+                GROUP BY month, debt_id
+            """, (user_id, date_from, date_to))
+            totals = {}
+            for month, debt_id, amount in cursor.fetchall():
+                totals.setdefault(month, {})[debt_id] = Decimal(str(amount))
+            return totals
+    
+    def payment_counts(self, user_id: int, source: str, date_from: date,
+                       date_to: date) -> Dict[Tuple[Any, date, Decimal], int]:
+        with self._transaction() as cursor:
+            # Served by idx_payments_user_date
+            cursor.execute("""
+                SELECT debt_id, payment_date, amount, COUNT(*)
+                FROM payments
+                WHERE user_id = %s AND payment_date >= %s AND payment_date <= %s AND source = %s
+                GROUP BY debt_id, payment_date, amount
+            """, (user_id, date_from, date_to, source))
+            return {(debt_id, payment_date, Decimal(str(amount))): count
+                    for debt_id, payment_date, amount, count in cursor.fetchall()}
+    
+    # ------------------------------------------------------------ commitments
+    
+    def add_commitment(self, user_id: int, amount: Any, strategy: str = 'avalanche',
+                       custom_alloc: Optional[Any] = None, starts_on: Optional[Any] = None) -> int:
+        with self._transaction() as cursor:
+            cursor.execute("""
+                INSERT INTO commitments (user_id, amount, strategy, custom_alloc, starts_on)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (user_id, amount, strategy, json.dumps(custom_alloc) if custom_alloc is not None else None,
+                  starts_on))
+            return cursor.lastrowid
+    
+    def list_commitments(self, user_id: int) -> List[Dict[str, Any]]:
+        with self._transaction() as cursor:
+            # Served by idx_commitments_user_created
+            cursor.execute("""
+                SELECT id, amount, strategy, custom_alloc, starts_on, created_at
+                FROM commitments
+                WHERE user_id = %s
+                ORDER BY created_at, id
+            """, (user_id,))
+            return [
+                {'id': row[0], 'amount': row[1], 'strategy': row[2],
+                 'custom_alloc': _json(row[3]) if row[3] is not None else None,
+                 'starts_on': row[4], 'created_at': row[5]}
+                for row in cursor.fetchall()
+            ]
+    
+    # -------------------------------------------------------------- snapshots
+    
+    def create_snapshot(self, user_id: int, name: str, state: Dict[str, Any],
+                        ledger: Optional[bytes] = None) -> int:
+        with self._transaction() as cursor:
+            cursor.execute("""
+                INSERT INTO plan_snapshots (user_id, name, json_state, ledger)
+                VALUES (%s, %s, %s, %s)
+            """, (user_id, name, json.dumps(state), ledger))
+            return cursor.lastrowid
+    
+    def list_snapshots(self, user_id: int) -> List[Dict[str, Any]]:
+        with self._transaction() as cursor:
+            cursor.execute("""
+                SELECT id, name, snapshot_date, json_state
+                FROM plan_snapshots
+                WHERE user_id = %s
+                ORDER BY snapshot_date DESC, id DESC
+            """, (user_id,))
+            return [
+                {'id': row[0], 'name': row[1], 'snapshot_date': row[2], 'state': _json(row[3])}
+                for row in cursor.fetchall()
+            ]
+    
+    def get_snapshot(self, user_id: int, snapshot_id: int) -> Optional[Dict[str, Any]]:
+        snapshots = self.get_snapshots(user_id, [snapshot_id])
+        return snapshots[0] if snapshots else None
+    
+    def get_snapshots(self, user_id: int, snapshot_ids: List[int]) -> List[Dict[str, Any]]:
+        if not snapshot_ids:
+            return []
+        with self._transaction() as cursor:
+            placeholders = ', '.join(['%s'] * len(snapshot_ids))
+            cursor.execute(f"""
+                SELECT id, name, snapshot_date, json_state, ledger
+                FROM plan_snapshots
+                WHERE user_id = %s AND id IN ({placeholders})
+            """, (user_id, *snapshot_ids))
+            return [
+                {'id': row[0], 'name': row[1], 'snapshot_date': row[2], 'state': _json(row[3]),
+                 'ledger': bytes(row[4]) if row[4] else None}
+                for row in cursor.fetchall()
+            ]
+    
+    def delete_snapshot(self, user_id: int, snapshot_id: int) -> bool:
+        with self._transaction() as cursor:
+            cursor.execute("DELETE FROM plan_snapshots WHERE id = %s AND user_id = %s", (snapshot_id, user_id))
+            return cursor.rowcount > 0
+    
+    # ------------------------------------------------------------------ plans
+    
+    def get_plan(self, user_id: int) -> Optional[Tuple[int, Dict[str, Any]]]:
+        with self._transaction() as cursor:
+            cursor.execute("""
+                SELECT id, trajectory FROM plan_trajectories
+                WHERE user_id = %s
+                ORDER BY updated_at DESC LIMIT 1
+            """, (user_id,))
+            row = cursor.fetchone()
+            return (row[0], _json(row[1])) if row else None
+    
+    def replace_plan(self, user_id: int, state: Dict[str, Any]) -> int:
+        with self._transaction() as cursor:
+            # One saved plan per user
+            cursor.execute("DELETE FROM plan_trajectories WHERE user_id = %s", (user_id,))
+            cursor.execute("""
+                INSERT INTO plan_trajectories (user_id, strategy, extra_payment, anchor_month,
+                                               closed_through, portfolio_signature, trajectory)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, (user_id, state['strategy'], state['extra_payment'], state['anchor_month'] + '-01',
+                  state['closed_through'] + '-01' if state.get('closed_through') else None,
+                  state['signature'], json.dumps(state)))
+            return cursor.lastrowid
+    
+    def update_plan(self, plan_id: int, state: Dict[str, Any]):
+        with self._transaction() as cursor:
+            cursor.execute("""
+                UPDATE plan_trajectories
+                SET anchor_month = %s, closed_through = %s, portfolio_signature = %s, trajectory = %s
+                WHERE id = %s
+            """, (state['anchor_month'] + '-01',
+                  state['closed_through'] + '-01' if state['closed_through'] else None,
+                  state['signature'], json.dumps(state), plan_id))
+    
+    # ---------------------------------------------------------------- helpers
+    
+    def _page(self, rows: List[tuple], fields: List[str], limit: Optional[int]):
+        """Split a LIMIT n+1 result into one page and the key of its last row."""
+        if limit is None:
+            return [dict(zip(fields, row)) for row in rows], None
+        page = [dict(zip(fields, row)) for row in rows[:limit]]
+        next_key = (rows[limit - 1][-2], rows[limit - 1][-1]) if len(rows) > limit else None
+        return page, next_key
@@ -0,0 +1,323 @@
+"""
+Custom Order Search
+Branch-and-bound search for the best custom payoff order.
+
+Under the custom-order rules only the highest-priority active debt receives
+the surplus payment, so a payoff order is really a sequence of "phases":
+the plan targets one debt until it is paid off, then moves to the next.
+Permutations that share a prefix share every simulated month up to the end
+of that prefix, so the search walks a tree of phases, simulating each phase
+once and reusing its end state for all of its children.
+
+Phases are simulated with the engine's monthly step on the plan's calendar:
+daily-compounded debts charge interest for each month's actual length,
+interest-free debts charge none, and weekly-paid debts are due their minimum
+on every payday of the month (four or five) and accrue less interest for
+paying through the month, with the rates taken from the compiled portfolio.
+"""
+
+from decimal import Decimal
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+import math
+
+from .compiled_portfolio import compile_portfolio, daily_compounded_rate, weekly_payment_weights
+from .simple_simulation_engine import month_calendar
+from .tracing import traced
+
+
+class CustomOrderSearch:
+    """Find the custom_order permutation that best meets an objective."""
+    
+    OBJECTIVES = ('interest', 'months', 'early_wins')
+    
+    def __init__(self, max_months: int = 600, early_win_months: int = 12, node_limit: int = 50000):
+        self.max_months = max_months
+        self.early_win_months = early_win_months
+        self.node_limit = node_limit
+    
+    @traced('custom_order.search')
+    def search(self, debts: List[Any], extra_payment: Decimal = Decimal('0'),
+               objective: str = 'interest', start_date: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Search payoff orders with branch-and-bound.
+        
+        Args:
+            debts: List of SimpleDebt objects
+            extra_payment: Additional monthly payment amount
+            objective: 'interest', 'months' or 'early_wins'
+            start_date: Date of month one, as given to the engine (default now)
+        
+        Returns:
+            Dictionary with the best order and search statistics
+        """
+        if objective not in self.OBJECTIVES:
+            raise ValueError(f'Invalid objective: {objective}')
+        
+        # The search runs on floats for speed; the winning order is
+        # re-simulated with the Decimal engine by the caller.
+        compiled = compile_portfolio(debts)
+        names = [debt.name for debt in debts]
+        mins = [float(payment) for payment in compiled.min_payments]
+        weekly_mins = sum(mins[i] for i in compiled.weekly)
+        
+        # Each month's rates, minimums due and weekly interest savings, shared by
+        # every month with the same length (and, for weekly debts, first payday)
+        start_date = start_date or datetime.now()
+        tables = {}
+        credits = {}
+        self._month_rates = [None]
+        self._month_dues = [None]
+        self._month_credits = [None]
+        self._budgets = [None]
+        for month in range(1, self.max_months + 1):
+            days, first_payday, paydays = month_calendar(start_date, month)
+            if days not in tables:
+                tables[days] = [float(daily_compounded_rate(compiled.aprs[i], days)) if i in compiled.daily
+                                else float(rate) for i, rate in enumerate(compiled.monthly_rates)]
+            if (days, first_payday) not in credits:
+                credits[days, first_payday] = {i: self._weekly_weights(compiled, i, days, first_payday)
+                                               for i in compiled.weekly}
+            self._month_rates.append(tables[days])
+            self._month_credits.append(credits[days, first_payday])
+            self._month_dues.append([payment * paydays if i in compiled.weekly else payment
+                                     for i, payment in enumerate(mins)])
+            # Every minimum, paid-off debts' included, stays in the budget
+            self._budgets.append(sum(mins) + weekly_mins * (paydays - 1) + float(extra_payment))
+        self._lowest_rates = [min(table[i] for table in tables.values()) for i in range(len(debts))]
+        
+        self._mins = mins
+        # The lower bound pays the largest monthly budget, and pays it before interest when
+        # weekly payments save some of the month's interest
+        self._budget = max(self._budgets[1:])
+        self._pay_first = bool(compiled.weekly)
+        self._objective = objective
+        self._child_order = self._heuristic_order(debts, objective)
+        self._best_key = None
+        self._best_prefix = None
+        self._nodes = 0
+        self._pruned = 0
+        self._budget_hit = False
+        self._frontier = {}
+        
+        root = {
+            'balances': [float(debt.principal) for debt in debts],
+            'month': 0,
+            'interest': 0.0,
+            'payoff_months': [None] * len(debts)
+        }
+        self._branch(root, [])
+        
+        best_order = [names[i] for i in self._best_prefix]
+        best_order += [name for i, name in enumerate(names) if i not in self._best_prefix]
+        
+        return {
+            'objective': objective,
+            'best_order': best_order,
+            'nodes_evaluated': self._nodes,
+            'branches_pruned': self._pruned,
+            'exhaustive': not self._budget_hit
+        }
+    
+    def _heuristic_order(self, debts: List[Any], objective: str) -> List[int]:
+        """Child visiting order so the first dive yields a strong incumbent."""
+        indices = list(range(len(debts)))
+        if objective == 'early_wins':
+            # Snowball: smallest balance first
+            return sorted(indices, key=lambda i: debts[i].principal)
+        # Avalanche: highest APR first
+        return sorted(indices, key=lambda i: debts[i].apr, reverse=True)
+    
+    def _branch(self, state: Dict[str, Any], prefix: List[int]):
+        """Depth-first expansion of one node in the phase tree."""
+        active = [i for i, balance in enumerate(state['balances']) if balance > 0]
+        
+        if not active or state['month'] >= self.max_months:
+            key = self._final_key(state)
+            if self._best_key is None or key < self._best_key:
+                self._best_key = key
+                self._best_prefix = list(prefix)
+            return
+        
+        for target in self._child_order:
+            if target not in active:
+                continue
+            if self._nodes >= self.node_limit and self._best_key is not None:
+                self._budget_hit = True
+                return
+            
+            self._nodes += 1
+            child = self._simulate_phase(state, target)
+            if self._best_key is not None and self._lower_bound(child) >= self._best_key:
+                self._pruned += 1
+                continue
+            # A phase that ran out of months without clearing its target can look
+            # dominated by its own parent, so complete plans are always scored
+            if child['month'] < self.max_months and self._is_dominated(child):
+                self._pruned += 1
+                continue
+            
+            prefix.append(target)
+            self._branch(child, prefix)
+            prefix.pop()
+    
+    def _simulate_phase(self, state: Dict[str, Any], target: int) -> Dict[str, Any]:
+        """Simulate months while `target` receives the surplus, until it is paid off."""
+        balances = list(state['balances'])
+        payoff_months = list(state['payoff_months'])
+        month = state['month']
+        interest = state['interest']
+        mins = self._mins
+        active = [i for i, balance in enumerate(balances) if balance > 0]
+        
+        while active and month < self.max_months and balances[target] > 0:
+            month += 1
+            rates = self._month_rates[month]
+            dues = self._month_dues[month]
+            credits = self._month_credits[month]
+            
+            # Interest on every active debt, less what weekly payments save
+            for i in active:
+                monthly_interest = balances[i] * rates[i]
+                if i in credits:
+                    monthly_interest -= self._weekly_credit(credits[i], mins[i], balances[i])
+                balances[i] += monthly_interest
+                interest += monthly_interest
+            
+            # Minimum payments (the budget always covers every active minimum)
+            remaining = self._budgets[month]
+            for i in active:
+                remaining -= dues[i]
+                if dues[i] >= balances[i]:
+                    balances[i] = 0.0
+                    payoff_months[i] = month
+                else:
+                    balances[i] -= dues[i]
+            
+            # Surplus to the target; lost if the target already cleared this month
+            if remaining > 0 and balances[target] > 0:
+                if remaining >= balances[target]:
+                    balances[target] = 0.0
+                    payoff_months[target] = month
+                else:
+                    balances[target] -= remaining
+            
+            active = [i for i in active if balances[i] > 0]
+        
+        return {
+            'balances': balances,
+            'month': month,
+            'interest': interest,
+            'payoff_months': payoff_months
+        }
+    
+    @staticmethod
+    def _weekly_weights(compiled: Any, i: int, days: int, first_payday: int) -> Tuple[List[float], List[float]]:
+        """Interest saved per rand of each of a weekly debt's payments in a month, and their running sums."""
+        weights, running = weekly_payment_weights(compiled.aprs[i], compiled.compounding[i], days, first_payday)
+        return [float(weight) for weight in weights], [float(total) for total in running]
+    
+    @staticmethod
+    def _weekly_credit(weights: Tuple[List[float], List[float]], payment: float, balance: float) -> float:
+        """The month's interest saving on `balance`, as weekly_payment_credit computes it."""
+        if payment <= 0 or balance <= 0:
+            return 0.0
+        weights, running = weights
+        full = min(len(weights), int(balance // payment))
+        credit = payment * running[full]
+        if full < len(weights):
+            credit += (balance - payment * full) * weights[full]
+        return credit
+    
+    def _is_dominated(self, state: Dict[str, Any]) -> bool:
+        """
+        Check a state against others that reached the same set of open debts.
+        
+        Different prefixes often clear the same debts; if an earlier branch got
+        there no later, with no more interest, no fewer early wins and no larger
+        balance on any debt, nothing below this state can beat it.
+        """
+        balances = state['balances']
+        signature = tuple(balance > 0 for balance in balances)
+        wins = self._early_wins(state['payoff_months'])
+        seen = self._frontier.setdefault(signature, [])
+        
+        for month, interest, seen_wins, seen_balances in seen:
+            if (month <= state['month'] and interest <= state['interest'] and seen_wins >= wins
+                    and all(a <= b for a, b in zip(seen_balances, balances))):
+                return True
+        
+        seen.append((state['month'], state['interest'], wins, balances))
+        return False
+    
+    def _early_wins(self, payoff_months: List[Optional[int]]) -> int:
+        """Number of debts cleared within the early-win window."""
+        return sum(1 for m in payoff_months if m is not None and m <= self.early_win_months)
+    
+    def _final_key(self, state: Dict[str, Any]) -> Tuple:
+        """Sort key of a complete plan (lower is better)."""
+        if self._objective == 'months':
+            return (state['month'], state['interest'])
+        if self._objective == 'early_wins':
+            return (-self._early_wins(state['payoff_months']), state['interest'])
+        return (state['interest'], state['month'])
+    
+    def _lower_bound(self, state: Dict[str, Any]) -> Tuple:
+        """Optimistic key for any plan that continues from this state."""
+        active = [i for i, balance in enumerate(state['balances']) if balance > 0]
+        if not active or state['month'] >= self.max_months:
+            return self._final_key(state)
+        
+        # Relaxation: pool every active balance at the lowest rate any active
+        # debt charges in any month and pay it down with the whole budget. The
+        # pooled balance never exceeds the real total, so its interest and
+        # payoff month are lower bounds.
+        remaining_balance = sum(state['balances'][i] for i in active)
+        lowest_rate = min(self._lowest_rates[i] for i in active)
+        horizon = self.max_months - state['month']
+        pooled_interest, pooled_months = self._pooled_payoff(remaining_balance, lowest_rate, horizon)
+        
+        interest_lb = state['interest'] + pooled_interest
+        months_lb = state['month'] + pooled_months
+        
+        if self._objective == 'months':
+            return (months_lb, interest_lb)
+        if self._objective == 'early_wins':
+            wins_ub = self._early_wins(state['payoff_months'])
+            if state['month'] < self.early_win_months:
+                wins_ub += len(active)
+            return (-wins_ub, interest_lb)
+        return (interest_lb, months_lb)
+    
+    def _pooled_payoff(self, balance: float, rate: float, horizon: int) -> Tuple[float, int]:
+        """
+        Closed-form interest and months to clear one pooled balance with the full budget.
+        
+        With weekly debts the budget is paid before the month's interest is
+        charged: B_k = (B_(k-1) - P)(1 + r), the usual recurrence with a
+        payment of P(1 + r).
+        """
+        budget = self._budget
+        if budget <= 0:
+            return balance * rate * horizon, horizon
+        if rate <= 0:
+            return 0.0, min(horizon, max(1, math.ceil(balance / budget)))
+        
+        growth = 1 + rate
+        step = budget * growth if self._pay_first else budget
+        if step > balance * rate:
+            months = max(1, math.ceil(math.log(step / (step - balance * rate)) / math.log(growth) - 1e-9))
+        else:
+            months = horizon + 1
+        
+        if months <= horizon:
+            # Balance left before the final (partial) payment
+            factor = growth ** (months - 1)
+            before_last = max(0.0, balance * factor - step * (factor - 1) / rate)
+            if self._pay_first:
+                return budget * (months - 1) + before_last - balance, months
+            return budget * (months - 1) + before_last * growth - balance, months
+        
+        factor = growth ** horizon
+        balance_at_horizon = balance * factor - step * (factor - 1) / rate
+        return budget * horizon + balance_at_horizon - balance, horizon
@@ -0,0 +1,235 @@
+"""
+Payment Import
+Streams bank CSV exports into payment rows matched to debts.
+
+Rows are parsed one at a time and handed out in fixed-size batches, so an
+export with years of history never has to be held in memory. Each row is
+matched to one of the user's debts by an explicit debt column, by a keyword
+mapping, or by the debt name appearing in the transaction description, and
+the matched amounts are aggregated per debt as they stream past. Payments
+dated on or before the day a debt's balance was last updated are already
+part of that balance, so only later payments count towards reducing it.
+
+Re-importing an export must not pay the debts twice. Before a batch is handed
+out, its rows are checked against the payments already stored with the same
+(debt, date, amount) and source; as many matching rows as are stored are
+skipped as duplicates, so identical payments made on one day still import
+once each.
+"""
+
+from decimal import Decimal, InvalidOperation
+from datetime import datetime, date
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Callable
+import csv
+import re
+
+
+CENTS = Decimal('0.01')
+
+
+class PaymentImporter:
+    """Parse, match and batch payment rows from a CSV export."""
+    
+    DATE_COLUMNS = ('payment_date', 'date', 'transaction date', 'posting date', 'value date')
+    AMOUNT_COLUMNS = ('amount', 'debit', 'debit amount', 'value')
+    DESCRIPTION_COLUMNS = ('description', 'reference', 'narrative', 'details', 'memo')
+    DEBT_COLUMNS = ('debt_id', 'debt')
+    DATE_FORMATS = ('%Y-%m-%d', '%Y/%m/%d', '%d/%m/%Y', '%d-%m-%Y', '%Y%m%d')
+    
+    def __init__(self, batch_size: int = 500, max_reported_errors: int = 20):
+        self.batch_size = batch_size
+        self.max_reported_errors = max_reported_errors
+    
+    def batches(self, lines: Iterable[str], debts: List[Dict[str, Any]],
+                keywords: Optional[Dict[str, Any]] = None,
+                existing: Optional[Callable[[date, date], Dict[tuple, int]]] = None,
+                negative_payments: bool = False) -> Iterator[List[tuple]]:
+        """
+        Yield batches of (debt_id, amount, payment_date) tuples.
+        
+        Args:
+            lines: Text lines of the CSV file (e.g. a file stream)
+            debts: The user's debts as dictionaries with `id`, `name` and optional `balance_date`
+            keywords: Optional {description keyword: debt_id} mapping (see resolve_keywords)
+            existing: Called with a batch's first and last payment dates; returns how many
+                      payments of each (debt_id, payment_date, amount) are already stored
+            negative_payments: The export shows payments as negative amounts (money out);
+                               by default payments are positive
+        
+        Amounts with the other sign are refunds or credits to the account, not
+        payments, and are skipped. Statistics are collected on `self.stats`
+        while the batches are consumed.
+        """
+        reader = csv.reader(lines)
+        header = next(reader, None)
+        if not header:
+            raise ValueError('CSV file is empty')
+        columns = self._resolve_columns(header)
+        
+        by_id = {str(debt['id']): debt['id'] for debt in debts}
+        balance_dates = {debt['id']: debt.get('balance_date') for debt in debts}
+        # Longest names first so "Car Loan 2" wins over "Car Loan"
+        by_name = sorted(((debt['name'].lower(), debt['id']) for debt in debts),
+                         key=lambda item: len(item[0]), reverse=True)
+        keywords = self.resolve_keywords(keywords, debts)
+        
+        self.stats = {
+            'rows': 0,
+            'matched': 0,
+            'unmatched': 0,
+            'invalid': 0,
+            'credits': 0,
+            'duplicates': 0,
+            'already_reflected': 0,
+            'totals': {},
+            'errors': []
+        }
+        # Stored payments per (debt_id, payment_date, amount) not yet matched by a row of this file
+        stored = {}
+        
+        batch = []
+        for line_number, row in enumerate(reader, start=2):
+            if not any(cell.strip() for cell in row):
+                continue
+            self.stats['rows'] += 1
+            
+            try:
+                payment_date = self._parse_date(row[columns['date']])
+                amount = self._parse_amount(row[columns['amount']])
+            except (ValueError, IndexError, InvalidOperation):
+                self._record_error(line_number, 'invalid', 'Unreadable date or amount')
+                continue
+            if amount == 0:
+                self._record_error(line_number, 'invalid', 'Zero amount')
+                continue
+            if negative_payments:
+                amount = -amount
+            if amount < 0:
+                self._record_error(line_number, 'credits', 'Refund or credit, not a payment')
+                continue
+            
+            debt_id = self._match(row, columns, by_id, by_name, keywords)
+            if debt_id is None:
+                self._record_error(line_number, 'unmatched', 'No matching debt')
+                continue
+            
+            self.stats['matched'] += 1
+            batch.append((debt_id, amount, payment_date))
+            if len(batch) >= self.batch_size:
+                batch = self._new_payments(batch, existing, stored, balance_dates)
+                if batch:
+                    yield batch
+                batch = []
+        
+        batch = self._new_payments(batch, existing, stored, balance_dates)
+        if batch:
+            yield batch
+    
+    def resolve_keywords(self, keywords: Optional[Dict[str, Any]], debts: List[Dict[str, Any]]) -> List[tuple]:
+        """
+        (keyword, debt_id) pairs of a {description keyword: debt_id} mapping.
+        
+        Raises ValueError unless every target is one of `debts` (the user's own).
+        """
+        if keywords is None:
+            return []
+        if not isinstance(keywords, dict):
+            raise ValueError('keywords must be a JSON object')
+        by_id = {str(debt['id']): debt['id'] for debt in debts}
+        unknown = sorted(str(debt_id) for debt_id in keywords.values()
+                         if isinstance(debt_id, bool) or str(debt_id) not in by_id)
+        if unknown:
+            raise ValueError(f'keywords refer to unknown debts: {", ".join(unknown)}')
+        return [(str(keyword).lower(), by_id[str(debt_id)]) for keyword, debt_id in keywords.items()]
+    
+    def _new_payments(self, batch: List[tuple], existing: Optional[Callable[[date, date], Dict[tuple, int]]],
+                      stored: Dict[tuple, int], balance_dates: Dict[Any, Optional[date]]) -> List[tuple]:
+        """Drop rows already stored by an earlier import and count the rest towards the balances."""
+        if batch and existing is not None:
+            dates = [payment_date for _, _, payment_date in batch]
+            # Keys seen in an earlier batch keep their count: a fresh read could include this import's rows
+            for key, count in existing(min(dates), max(dates)).items():
+                stored.setdefault((key[0], key[1], key[2].quantize(CENTS)), count)
+        
+        payments = []
+        for debt_id, amount, payment_date in batch:
+            key = (debt_id, payment_date, amount.quantize(CENTS))
+            if stored.get(key, 0) > 0:
+                stored[key] -= 1
+                self.stats['duplicates'] += 1
+                continue
+            stored.setdefault(key, 0)
+            
+            balance_date = balance_dates.get(debt_id)
+            if balance_date is None or payment_date > balance_date:
+                self.stats['totals'][debt_id] = self.stats['totals'].get(debt_id, Decimal('0')) + amount
+            else:
+                self.stats['already_reflected'] += 1
+            payments.append((debt_id, amount, payment_date))
+        return payments
+    
+    def _resolve_columns(self, header: List[str]) -> Dict[str, Optional[int]]:
+        """Find the date, amount, description and debt columns by their header names."""
+        names = [name.strip().lower() for name in header]
+        
+        def find(aliases):
+            for alias in aliases:
+                if alias in names:
+                    return names.index(alias)
+            return None
+        
+        columns = {
+            'date': find(self.DATE_COLUMNS),
+            'amount': find(self.AMOUNT_COLUMNS),
+            'description': find(self.DESCRIPTION_COLUMNS),
+            'debt': find(self.DEBT_COLUMNS)
+        }
+        if columns['date'] is None or columns['amount'] is None:
+            raise ValueError('CSV needs a date and an amount column')
+        if columns['description'] is None and columns['debt'] is None:
+            raise ValueError('CSV needs a description or a debt column to match payments')
+        return columns
+    
+    def _parse_date(self, value: str) -> date:
+        """Parse a date in any of the common bank export formats."""
+        value = value.strip()
+        for fmt in self.DATE_FORMATS:
+            try:
+                return datetime.strptime(value, fmt).date()
+            except ValueError:
+                continue
+        raise ValueError(f'Unrecognised date: {value}')
+    
+    def _parse_amount(self, value: str) -> Decimal:
+        """Parse a signed amount; accounting-style parentheses, "(50.00)", are negative."""
+        cleaned = re.sub(r'[^0-9.()-]', '', value)
+        if cleaned.startswith('(') and cleaned.endswith(')'):
+            return -Decimal(cleaned[1:-1])
+        return Decimal(cleaned)
+    
+    def _match(self, row: List[str], columns: Dict[str, Optional[int]], by_id: Dict[str, Any],
+               by_name: List[tuple], keywords: List[tuple]) -> Optional[Any]:
+        """Match a row to a debt id, or None."""
+        if columns['debt'] is not None and columns['debt'] < len(row):
+            value = row[columns['debt']].strip()
+            if value in by_id:
+                return by_id[value]
+            for name, debt_id in by_name:
+                if value.lower() == name:
+                    return debt_id
+        
+        if columns['description'] is not None and columns['description'] < len(row):
+            description = row[columns['description']].lower()
+            for keyword, debt_id in keywords:
+                if keyword in description:
+                    return debt_id
+            for name, debt_id in by_name:
+                if name in description:
+                    return debt_id
+        return None
+    
+    def _record_error(self, line_number: int, kind: str, message: str):
+        """Count a skipped row and keep the first few for the response."""
+        self.stats[kind] += 1
+        if len(self.stats['errors']) < self.max_reported_errors:
+            self.stats['errors'].append({'line': line_number, 'error': message})
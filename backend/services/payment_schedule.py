@@ -0,0 +1,137 @@
+"""
+Payment Schedule
+Sparse, time-varying changes to a repayment plan.
+
+Events are compiled once into a list of (month, events) boundaries sorted by
+month. The engines keep a pointer into that list and only touch it when the
+simulated month reaches the next boundary, so months without events cost
+nothing extra.
+"""
+
+from decimal import Decimal
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from .simple_simulation_engine import SimpleDebt, month_number
+
+
+class PaymentSchedule:
+    """Compiled schedule of plan changes keyed by simulation month (1-based)."""
+    
+    EVENT_TYPES = ('extra_payment', 'bonus', 'pause', 'new_debt', 'rate_change', 'allocation')
+    
+    def __init__(self, events: List[Dict[str, Any]]):
+        by_month = {}
+        self.arrival_count = 0
+        
+        for index, event in enumerate(events):
+            for month, compiled in self._compile(event, index):
+                by_month.setdefault(month, []).append(compiled)
+        
+        self.boundaries = sorted(by_month.items())
+    
+    @classmethod
+    def from_request(cls, events: Optional[List[Dict[str, Any]]],
+                     debts: Optional[List[SimpleDebt]] = None) -> Optional['PaymentSchedule']:
+        """
+        Build a schedule from a request body list, or None when there are no events.
+        
+        With `debts`, every rate change and allocation must name one of them or a
+        debt the schedule itself adds; ValueError otherwise, since the engines
+        would silently skip the event.
+        """
+        if not events:
+            return None
+        schedule = cls(events)
+        if debts is not None:
+            schedule._check_debt_ids(debts)
+        return schedule
+    
+    def _check_debt_ids(self, debts: List[SimpleDebt]):
+        """Raise ValueError naming the debt ids events refer to that are not in the plan."""
+        compiled = [event for _, events in self.boundaries for event in events]
+        known = {debt.id for debt in debts}
+        known.update(event['debt'].id for event in compiled if event['type'] == 'new_debt')
+        
+        unknown = set()
+        for event in compiled:
+            if event['type'] == 'rate_change':
+                unknown.update(debt_id for debt_id in [event['debt_id']] if debt_id not in known)
+            elif event['type'] == 'allocation':
+                unknown.update(debt_id for debt_id in event['allocation'] if debt_id not in known)
+        if unknown:
+            raise ValueError(f'events refer to unknown debts: {", ".join(sorted(map(str, unknown)))}')
+    
+    def _compile(self, event: Dict[str, Any], index: int) -> List[Any]:
+        """Normalise one request event into (month, event) pairs."""
+        event_type = event.get('type')
+        if event_type not in self.EVENT_TYPES:
+            raise ValueError(f'Invalid schedule event type: {event_type}')
+        month = self._event_month(event)
+        
+        if event_type == 'extra_payment':
+            # New monthly extra payment from this month on (e.g. a salary increase)
+            return [(month, {'type': 'extra_payment', 'amount': Decimal(str(event['amount']))})]
+        
+        if event_type == 'allocation':
+            # Fixed monthly amounts of the extra payment sent to chosen debts from this month on
+            # (an empty allocation hands the whole extra payment back to the strategy)
+            allocation = {}
+            for debt_id, amount in (event.get('allocation') or {}).items():
+                amount = Decimal(str(amount))
+                if amount < 0:
+                    raise ValueError('Allocation amounts must not be negative')
+                allocation[self._debt_key(debt_id)] = amount
+            return [(month, {'type': 'allocation', 'allocation': allocation})]
+        
+        if event_type == 'bonus':
+            return [(month, {'type': 'bonus', 'amount': Decimal(str(event['amount']))})]
+        
+        if event_type == 'pause':
+            months = int(event.get('months', 1))
+            if months <= 0:
+                raise ValueError('Pause length must be positive')
+            return [
+                (month, {'type': 'pause', 'paused': True}),
+                (month + months, {'type': 'pause', 'paused': False})
+            ]
+        
+        if event_type == 'rate_change':
+            apr_value = Decimal(str(event['apr']))
+            if apr_value > 1:
+                apr_value = apr_value / Decimal('100')
+            return [(month, {'type': 'rate_change', 'debt_id': self._debt_key(event['debt_id']), 'apr': apr_value})]
+        
+        # New debt arriving mid-plan
+        data = event['debt']
+        apr_value = Decimal(str(data['apr']))
+        if apr_value > 1:
+            apr_value = apr_value / Decimal('100')
+        self.arrival_count += 1
+        debt = SimpleDebt(
+            debt_id=data.get('id', -(index + 1)),
+            name=data.get('name', f'New debt {index + 1}'),
+            principal=Decimal(str(data['principal'])),
+            apr=apr_value,
+            min_payment=Decimal(str(data['min_payment'])),
+            compounding=data.get('compounding', 'monthly'),
+            payment_frequency=data.get('payment_frequency', 'monthly')
+        )
+        return [(month, {'type': 'new_debt', 'debt': debt})]
+    
+    def _debt_key(self, debt_id: Any) -> Any:
+        """Debt ids arrive as JSON object keys (strings); stored debts use integer ids."""
+        if isinstance(debt_id, str) and debt_id.lstrip('-').isdigit():
+            return int(debt_id)
+        return debt_id
+    
+    def _event_month(self, event: Dict[str, Any]) -> int:
+        """Simulation month of an event given either `month` or a YYYY-MM(-DD) `date`."""
+        if 'month' in event:
+            return max(1, int(event['month']))
+        if 'date' in event:
+            value = str(event['date'])
+            event_date = datetime.strptime(value[:10] if len(value) > 7 else value + '-01', '%Y-%m-%d')
+            # Month m is the m-th calendar month from now, as the engines label them
+            return max(1, month_number(datetime.now(), event_date))
+        raise ValueError('Schedule event needs a month or a date')
@@ -0,0 +1,243 @@
+"""
+Plan Trajectory
+Persisted month-by-month plan that is rolled forward as calendar months close.
+
+A trajectory is simulated once and labelled with calendar months, so the
+same plan is served every day of a month instead of drifting with the time
+of the request. When a month closes, the recorded payments for it are
+replayed against the planned balances; the remainder of the plan is only
+re-simulated if the actual balances diverge from the planned ones.
+"""
+
+from decimal import Decimal
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional, Tuple
+import hashlib
+
+from .compiled_portfolio import daily_compounded_rate, monthly_rate, weekly_payment_credit
+from .simple_simulation_engine import SimpleSimulationEngine, SimpleDebt, month_calendar
+
+
+def add_months(month: str, count: int) -> str:
+    """Shift a YYYY-MM label by a number of calendar months."""
+    year, month_number = int(month[:4]), int(month[5:7])
+    total = year * 12 + (month_number - 1) + count
+    return f'{total // 12:04d}-{total % 12 + 1:02d}'
+
+
+class PlanTrajectory:
+    """Build, roll forward and serve a persisted plan trajectory."""
+    
+    def __init__(self, tolerance: Decimal = Decimal('1.00')):
+        # Balance difference (in rand) above which actuals count as diverged
+        self.tolerance = tolerance
+    
+    def portfolio_signature(self, debts: List[SimpleDebt]) -> str:
+        """
+        Fingerprint of the plan's inputs: which debts it covers and their
+        rates, minimums, compounding and payment frequency. Balances are
+        left out; payments change them every month, and roll_forward
+        reconciles them against the recorded payments instead.
+        """
+        parts = [
+            f'{d.id}:{d.apr}:{d.min_payment}:{d.compounding}:{d.payment_frequency}'
+            for d in sorted(debts, key=lambda d: str(d.id))
+        ]
+        return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+    
+    def build(self, debts: List[SimpleDebt], strategy: str = 'avalanche',
+              extra_payment: Decimal = Decimal('0'), today: Optional[date] = None) -> Dict[str, Any]:
+        """Simulate a new trajectory whose first month is the current calendar month."""
+        today = today or date.today()
+        anchor = today.strftime('%Y-%m')
+        
+        state = {
+            'strategy': strategy,
+            'extra_payment': float(extra_payment),
+            'anchor_month': anchor,
+            'closed_through': None,
+            'signature': self.portfolio_signature(debts),
+            'debts': [
+                {
+                    'id': debt.id,
+                    'name': debt.name,
+                    'apr': float(debt.apr),
+                    'min_payment': float(debt.min_payment),
+                    'compounding': debt.compounding,
+                    'payment_frequency': debt.payment_frequency,
+                    'opening_balance': float(debt.principal)
+                } for debt in debts
+            ],
+            'months': []
+        }
+        state['months'] = self._simulate_from(state, {str(d.id): d.principal for d in debts}, anchor)
+        return state
+    
+    def months_to_close(self, state: Dict[str, Any], today: Optional[date] = None) -> List[str]:
+        """Calendar months that have closed since the trajectory was last rolled forward."""
+        current = (today or date.today()).strftime('%Y-%m')
+        last_closed = state['closed_through']
+        return [
+            entry['month'] for entry in state['months']
+            if entry['month'] < current and (last_closed is None or entry['month'] > last_closed)
+        ]
+    
+    def roll_forward(self, state: Dict[str, Any], actuals: Dict[str, Dict[str, Decimal]],
+                     today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Close every finished calendar month.
+        
+        Args:
+            state: Trajectory from build or a previous roll forward
+            actuals: Recorded payments as {month: {debt_id: amount}}
+            today: Date used to decide which months have closed
+        
+        Returns:
+            Statistics about the roll; `state` is updated in place
+        """
+        closing = self.months_to_close(state, today)
+        debts = {str(d['id']): d for d in state['debts']}
+        diverged = []
+        resimulations = 0
+        
+        for month in closing:
+            index = next(i for i, entry in enumerate(state['months']) if entry['month'] == month)
+            entry = state['months'][index]
+            # A month without recorded payments is reconciled against none, so missed minimums diverge
+            paid = actuals.get(month, {})
+            
+            opening = self._balances_before(state, index)
+            days, first_payday, _ = self._month_calendar(state, month)
+            balances = {}
+            for debt_id, balance in opening.items():
+                if balance > 0:
+                    balance += self._interest(debts[debt_id], balance, days, first_payday)
+                balances[debt_id] = max(Decimal('0'), balance - paid.get(debt_id, Decimal('0')))
+            
+            planned = {k: Decimal(str(v)) for k, v in entry['balances'].items()}
+            drift = max((abs(balances[k] - planned.get(k, Decimal('0'))) for k in balances), default=Decimal('0'))
+            
+            entry['actual'] = True
+            entry['payments'] = {k: float(v) for k, v in paid.items()}
+            if drift > self.tolerance:
+                # Keep the closed history and re-simulate only what is left
+                entry['balances'] = {k: float(v) for k, v in balances.items()}
+                entry['total_balance'] = float(sum(balances.values()))
+                state['months'] = state['months'][:index + 1] + self._simulate_from(
+                    state, balances, add_months(month, 1)
+                )
+                diverged.append(month)
+                resimulations += 1
+            
+            state['closed_through'] = month
+        
+        return {
+            'months_closed': closing,
+            'diverged_months': diverged,
+            'resimulations': resimulations
+        }
+    
+    def view(self, state: Dict[str, Any], include_history: bool = False,
+             today: Optional[date] = None) -> Dict[str, Any]:
+        """Serve the stored trajectory without simulating anything."""
+        current = (today or date.today()).strftime('%Y-%m')
+        upcoming = [entry for entry in state['months'] if entry['month'] >= current]
+        history = [entry for entry in state['months'] if entry['month'] < current]
+        
+        total_balance = upcoming[0]['total_balance'] if upcoming else 0
+        result = {
+            'strategy': state['strategy'],
+            'extra_payment': state['extra_payment'],
+            'anchor_month': state['anchor_month'],
+            'closed_through': state['closed_through'],
+            'summary': {
+                'months_remaining': len(upcoming),
+                'debt_free_month': state['months'][-1]['month'] if state['months'] else None,
+                'remaining_interest': sum(entry['interest'] for entry in upcoming),
+                'current_month_balance': total_balance
+            },
+            'months': upcoming
+        }
+        if include_history:
+            result['history'] = history
+        return result
+    
+    @staticmethod
+    def _month_calendar(state: Dict[str, Any], month: str) -> Tuple[int, int, int]:
+        """
+        month_calendar of a plan month. Weekly paydays fall every 7 days from
+        the start of the simulation that produced the month, which is the
+        last re-simulation (or the anchor month).
+        """
+        start = datetime.strptime(state.get('simulated_from', state['anchor_month']), '%Y-%m')
+        number = (int(month[:4]) * 12 + int(month[5:7])) - (start.year * 12 + start.month) + 1
+        return month_calendar(start, number)
+    
+    @staticmethod
+    def _interest(debt: Dict[str, Any], balance: Decimal, days: int, first_payday: int) -> Decimal:
+        """Interest charged on a plan debt's balance in a `days`-day month, as the engine charges it."""
+        apr = Decimal(str(debt['apr']))
+        compounding = debt.get('compounding', 'monthly')
+        if compounding == 'daily':
+            interest = balance * daily_compounded_rate(apr, days)
+        else:
+            interest = balance * monthly_rate(apr, compounding)
+        if debt.get('payment_frequency', 'monthly') == 'weekly':
+            # Weekly payments cut the balance interest accrues on during the month
+            interest -= weekly_payment_credit(apr, compounding, days, first_payday,
+                                              Decimal(str(debt['min_payment'])), balance)
+        return interest
+    
+    def _balances_before(self, state: Dict[str, Any], index: int) -> Dict[str, Decimal]:
+        """Balances at the start of month `index` (the previous month's closing balances)."""
+        if index == 0:
+            return {str(d['id']): Decimal(str(d['opening_balance'])) for d in state['debts']}
+        return {k: Decimal(str(v)) for k, v in state['months'][index - 1]['balances'].items()}
+    
+    def _simulate_from(self, state: Dict[str, Any], balances: Dict[str, Decimal], first_month: str) -> List[Dict[str, Any]]:
+        """Simulate the plan from the given balances, labelling months from `first_month`."""
+        debts = []
+        for data in state['debts']:
+            debt = SimpleDebt(
+                debt_id=data['id'],
+                name=data['name'],
+                principal=balances.get(str(data['id']), Decimal('0')),
+                apr=Decimal(str(data['apr'])),
+                min_payment=Decimal(str(data['min_payment'])),
+                compounding=data.get('compounding', 'monthly'),
+                payment_frequency=data.get('payment_frequency', 'monthly')
+            )
+            if debt.principal <= 0:
+                # Paid-off debts stay loaded so their freed minimums roll over
+                debt.principal = Decimal('0')
+                debt.status = 'paid'
+            debts.append(debt)
+        
+        if not any(debt.status == 'active' for debt in debts):
+            return []
+        
+        state['simulated_from'] = first_month
+        engine = SimpleSimulationEngine(start_date=datetime.strptime(first_month, '%Y-%m'))
+        engine.debts = debts
+        extra_payment = Decimal(str(state['extra_payment']))
+        if state['strategy'] == 'snowball':
+            result = engine.simulate_snowball(extra_payment)
+        else:
+            result = engine.simulate_avalanche(extra_payment)
+        
+        months = []
+        for offset, month_data in enumerate(result['simulation_results']):
+            month_balances = {str(debt.id): 0.0 for debt in debts}
+            payments = {}
+            for debt_info in month_data['debts']:
+                month_balances[str(debt_info['id'])] = float(debt_info['balance'])
+                payments[str(debt_info['id'])] = float(debt_info['payment_made'])
+            months.append({
+                'month': add_months(first_month, offset),
+                'balances': month_balances,
+                'payments': payments,
+                'interest': float(month_data['interest_this_month']),
+                'total_balance': float(month_data['total_balance']),
+                'actual': False
+            })
+        return months
@@ -0,0 +1,220 @@
+"""
+Projection Batch
+Offline job that recomputes every user's payoff projection.
+
+Users are read from MySQL in keyset-ordered chunks. Each chunk's portfolios
+are simulated in a process pool with the summary-only path while the next
+chunk is being fetched, and the results are written back with one bulk
+upsert per chunk into the projections table, which the API reads instead of
+simulating on demand.
+
+Run from the backend directory:
+    
+    python -m services.projection_batch --workers 8 --chunk-users 2000
+"""
+
+from decimal import Decimal
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterator
+from multiprocessing import Pool
+import argparse
+import json
+import os
+import time
+
+from .commitment_timeline import CommitmentTimeline
+from .payment_schedule import PaymentSchedule
+from .simple_simulation_engine import SimpleSimulationEngine, SimpleDebt
+
+
+UPSERT_QUERY = """
+    INSERT INTO projections (user_id, strategy, extra_payment, debt_count, total_balance,
+                             total_min_payments, months_to_zero, debt_free_date,
+                             total_interest, cleared, computed_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        strategy = VALUES(strategy),
+        extra_payment = VALUES(extra_payment),
+        debt_count = VALUES(debt_count),
+        total_balance = VALUES(total_balance),
+        total_min_payments = VALUES(total_min_payments),
+        months_to_zero = VALUES(months_to_zero),
+        debt_free_date = VALUES(debt_free_date),
+        total_interest = VALUES(total_interest),
+        cleared = VALUES(cleared),
+        computed_at = VALUES(computed_at)
+"""
+
+
+def project_portfolio(task: tuple) -> tuple:
+    """
+    Simulate one portfolio (runs in a worker process).
+    
+    The user's commitments are resolved with CommitmentTimeline, as the API
+    does with use_commitments: each takes effect from its starts_on month with
+    its custom allocation, and the plan runs the timeline's strategy.
+    
+    Args:
+        task: (user_id, start_date, debts, commitments) where debts are (id,
+              name, principal, apr, min_payment, compounding, payment_frequency)
+              tuples of strings and commitments are list_commitments rows
+    
+    Returns:
+        A row for UPSERT_QUERY
+    """
+    user_id, start_date, debt_rows, commitments = task
+    debts = []
+    for debt_id, name, principal, apr, min_payment, compounding, payment_frequency in debt_rows:
+        apr_value = Decimal(apr)
+        if apr_value > 1:
+            apr_value = apr_value / Decimal('100')
+        debts.append(SimpleDebt(debt_id, name, Decimal(principal), apr_value, Decimal(min_payment),
+                                compounding, payment_frequency))
+    
+    total_balance = sum((debt.principal for debt in debts), Decimal('0'))
+    total_min_payments = sum((debt.min_payment for debt in debts), Decimal('0'))
+    
+    timeline = CommitmentTimeline(commitments, start_date)
+    strategy = timeline.strategy or 'avalanche'
+    # The extra payment in effect now; later commitments change it within the plan
+    first = timeline.changes[0] if timeline.changes else None
+    extra_payment = first['extra_payment'] if first and first['month'] == 1 else Decimal('0')
+    
+    if debts:
+        engine = SimpleSimulationEngine(start_date=start_date)
+        engine.debts = debts
+        schedule = PaymentSchedule.from_request(timeline.events(debts), debts)
+        summary = engine.simulate_summary(strategy, Decimal('0'), schedule=schedule)
+        months_to_zero = summary['months_to_zero']
+        debt_free_date = summary['debt_free_date']
+        total_interest = Decimal(str(summary['total_interest_paid'])).quantize(Decimal('0.01'))
+        cleared = summary['final_total_balance'] == 0
+    else:
+        months_to_zero, debt_free_date, total_interest, cleared = 0, None, Decimal('0'), True
+    
+    return (user_id, strategy, extra_payment, len(debts), total_balance, total_min_payments,
+            months_to_zero, debt_free_date, total_interest, cleared, start_date)
+
+
+class ProjectionBatch:
+    """Stream portfolios, project them in parallel and upsert the results."""
+    
+    def __init__(self, connect, workers: Optional[int] = None, chunk_users: int = 2000):
+        # `connect` returns a new MySQL connection; the job holds one for reads and writes
+        self.connect = connect
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_users = chunk_users
+    
+    def run(self, start_date: Optional[datetime] = None, log=print) -> Dict[str, Any]:
+        """Project every user's portfolio and return run statistics."""
+        start_date = start_date or datetime.now()
+        connection = self.connect()
+        cursor = connection.cursor()
+        started = time.perf_counter()
+        users = 0
+        chunks = 0
+        
+        with Pool(self.workers) as pool:
+            pending = None
+            for tasks in self._chunks(cursor, start_date):
+                # Simulate this chunk while the previous one is written and the next fetched
+                running = pool.map_async(project_portfolio, tasks, chunksize=max(1, len(tasks) // (self.workers * 4)))
+                if pending is not None:
+                    users += self._write(cursor, connection, pending.get())
+                    chunks += 1
+                    log(f'{users} users projected ({users / (time.perf_counter() - started):.0f}/s)')
+                pending = running
+            if pending is not None:
+                users += self._write(cursor, connection, pending.get())
+                chunks += 1
+        
+        cursor.close()
+        connection.close()
+        elapsed = time.perf_counter() - started
+        return {
+            'users': users,
+            'chunks': chunks,
+            'workers': self.workers,
+            'seconds': round(elapsed, 2),
+            'users_per_second': round(users / elapsed, 1) if elapsed else None
+        }
+    
+    def _chunks(self, cursor, start_date: datetime) -> Iterator[List[tuple]]:
+        """Yield one list of simulation tasks per chunk of users, in user id order."""
+        last_user = 0
+        while True:
+            cursor.execute("""
+                SELECT id FROM users
+                WHERE id > %s
+                ORDER BY id
+                LIMIT %s
+            """, (last_user, self.chunk_users))
+            user_ids = [row[0] for row in cursor.fetchall()]
+            if not user_ids:
+                return
+            first_user, last_user = user_ids[0], user_ids[-1]
+            
+            # Both ranges are served by the (user_id, ...) composite indexes
+            cursor.execute("""
+                SELECT user_id, id, name, principal, apr, min_payment, compounding, payment_frequency
+                FROM debts
+                WHERE user_id BETWEEN %s AND %s AND status = 'active'
+                ORDER BY user_id, id
+            """, (first_user, last_user))
+            portfolios = {}
+            for user_id, debt_id, name, principal, apr, min_payment, compounding, frequency in cursor.fetchall():
+                portfolios.setdefault(user_id, []).append(
+                    (debt_id, name, str(principal), str(apr), str(min_payment), compounding or 'monthly',
+                     frequency or 'monthly')
+                )
+            
+            # Whole commitment histories, resolved per user by CommitmentTimeline
+            cursor.execute("""
+                SELECT user_id, id, amount, strategy, custom_alloc, starts_on, created_at
+                FROM commitments
+                WHERE user_id BETWEEN %s AND %s
+                ORDER BY user_id, created_at, id
+            """, (first_user, last_user))
+            commitments = {}
+            for user_id, commitment_id, amount, strategy, custom_alloc, starts_on, created_at in cursor.fetchall():
+                if isinstance(custom_alloc, (str, bytes)):
+                    custom_alloc = json.loads(custom_alloc)
+                commitments.setdefault(user_id, []).append({
+                    'id': commitment_id, 'amount': str(amount), 'strategy': strategy,
+                    'custom_alloc': custom_alloc, 'starts_on': starts_on, 'created_at': created_at
+                })
+            
+            yield [
+                (user_id, start_date, portfolios.get(user_id, []), commitments.get(user_id, []))
+                for user_id in user_ids
+            ]
+    
+    def _write(self, cursor, connection, rows: List[tuple]) -> int:
+        """Bulk upsert one chunk of projections in its own transaction."""
+        # executemany sends the rows as one multi-row INSERT ... ON DUPLICATE KEY UPDATE
+        cursor.executemany(UPSERT_QUERY, rows)
+        connection.commit()
+        return len(rows)
+
+
+def main():
+    import mysql.connector
+    
+    parser = argparse.ArgumentParser(description='Recompute every user\'s payoff projection.')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunk-users', type=int, default=2000, help='Users fetched and written per chunk')
+    args = parser.parse_args()
+    
+    config = {
+        'host': os.getenv('MYSQL_HOST', 'localhost'),
+        'port': int(os.getenv('MYSQL_PORT', 3306)),
+        'user': os.getenv('MYSQL_USER', 'financial_user'),
+        'password': os.getenv('MYSQL_PASSWORD', 'financial_pass'),
+        'database': os.getenv('MYSQL_DB', 'financial_freedom')
+    }
+    batch = ProjectionBatch(lambda: mysql.connector.connect(**config), args.workers, args.chunk_users)
+    print(batch.run())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+"""
+Repository
+Data access interface for debts, payments, commitments, snapshots and plans.
+
+The API talks to storage only through a Repository, so the same endpoints run
+against MySQL in production or against the in-memory implementation when
+there is no database (local development, load tests, stateless simulation
+workers). Both implementations share the semantics of the MySQL schema:
+auto-increment ids, second-precision timestamps, newest-first keyset ordering
+on (timestamp, id), every query scoped by user, and payments deleted along
+with their debt.
+
+Select the implementation with the REPOSITORY environment variable
+(`mysql`, the default, or `memory`).
+"""
+
+from decimal import Decimal
+from datetime import date
+from typing import List, Dict, Any, Optional, Iterable, Callable, Set, Tuple
+from abc import ABC, abstractmethod
+
+from .simple_simulation_engine import SimpleDebt
+
+
+DEBT_COLUMNS = ['id', 'name', 'principal', 'apr', 'min_payment', 'payment_frequency',
+                'compounding', 'start_date', 'status', 'notes', 'created_at']
+PAYMENT_COLUMNS = ['id', 'debt_id', 'amount', 'payment_date', 'source', 'notes', 'created_at']
+DEBT_UPDATE_FIELDS = ['name', 'principal', 'apr', 'min_payment', 'payment_frequency', 'compounding', 'notes']
+
+
+class RepositoryError(Exception):
+    """Storage is unavailable or rejected the operation."""
+
+
+class RepositoryUnavailable(RepositoryError):
+    """Storage cannot be reached (connection failed or the circuit breaker is open)."""
+
+
+def simple_debt(debt_id: Any, name: str, principal: Any, apr: Any, min_payment: Any,
+                compounding: Optional[str] = 'monthly', payment_frequency: Optional[str] = 'monthly') -> SimpleDebt:
+    """Build a SimpleDebt from stored values (APR is stored as a percentage)."""
+    # Convert APR from percentage to decimal if it's > 1
+    apr_value = Decimal(str(apr))
+    if apr_value > 1:
+        apr_value = apr_value / Decimal('100')
+    
+    return SimpleDebt(
+        debt_id=debt_id,
+        name=name,
+        principal=Decimal(str(principal)),
+        apr=apr_value,
+        min_payment=Decimal(str(min_payment)),
+        compounding=compounding or 'monthly',
+        payment_frequency=payment_frequency or 'monthly'
+    )
+
+
+class Repository(ABC):
+    """
+    Storage interface used by the API. Every method is scoped to one user.
+    
+    Backends implement every abstract method; one that leaves any out can't
+    be constructed.
+    """
+    
+    def health(self) -> Dict[str, Any]:
+        """Availability of the storage backend, without touching it."""
+        return {'backend': type(self).__name__, 'available': True}
+    
+    # ------------------------------------------------------------------ debts
+    
+    @abstractmethod
+    def active_debts(self, user_id: int) -> List[SimpleDebt]:
+        """The user's active debts, ready for the simulation engines."""
+    
+    @abstractmethod
+    def list_debts(self, user_id: int, fields: List[str], limit: int,
+                   after: Optional[tuple] = None) -> Tuple[List[Dict[str, Any]], Optional[tuple]]:
+        """
+        One keyset page of the user's debts, newest first.
+        
+        Args:
+            user_id: Owner of the debts
+            fields: Columns to return (from DEBT_COLUMNS)
+            limit: Page size, or None for every row (next_key is then None)
+            after: (created_at, id) of the last row of the previous page
+        
+        Returns:
+            (rows, next_key) where next_key is the (created_at, id) to continue
+            after, or None on the last page
+        """
+    
+    @abstractmethod
+    def get_debt(self, user_id: int, debt_id: int) -> Optional[Dict[str, Any]]:
+        """One debt with every DEBT_COLUMNS field, or None."""
+    
+    @abstractmethod
+    def create_debts(self, user_id: int, items: List[Dict[str, Any]]) -> List[int]:
+        """Insert validated debts in one transaction and return their ids in order."""
+    
+    @abstractmethod
+    def update_debt(self, user_id: int, debt_id: int, changes: Dict[str, Any]) -> bool:
+        """Apply changes to one debt; False if the user has no such debt."""
+    
+    @abstractmethod
+    def update_debts(self, user_id: int, items: List[Dict[str, Any]]) -> List[int]:
+        """
+        Update many debts in one transaction; each item carries its `id`.
+        
+        Returns:
+            Ids the user does not own. When it is not empty nothing was changed.
+        """
+    
+    @abstractmethod
+    def delete_debts(self, user_id: int, debt_ids: List[int]) -> Set[int]:
+        """Delete debts (and their payments) in one transaction; returns the ids deleted."""
+    
+    @abstractmethod
+    def debt_summary(self, user_id: int) -> Dict[str, Any]:
+        """Count, totals and average APR of the active debts, and the last update time of any debt."""
+    
+    @abstractmethod
+    def debt_balance_dates(self, user_id: int) -> List[Dict[str, Any]]:
+        """Every debt's id, name and the date its balance was last updated."""
+    
+    @abstractmethod
+    def get_projection(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """The precomputed payoff projection written by the batch job, or None."""
+    
+    # --------------------------------------------------------------- payments
+    
+    @abstractmethod
+    def list_payments(self, user_id: int, fields: List[str], limit: int, after: Optional[tuple] = None,
+                      debt_id: Optional[int] = None, date_from: Optional[str] = None,
+                      date_to: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[tuple]]:
+        """One keyset page of payments, newest first; keys are (payment_date, id)."""
+    
+    @abstractmethod
+    def import_payments(self, user_id: int, batches: Iterable[List[tuple]], source: str,
+                        balance_totals: Optional[Callable[[], Dict[Any, Decimal]]] = None,
+                        dry_run: bool = False) -> int:
+        """
+        Insert payment batches and reconcile balances in one transaction.
+        
+        Args:
+            user_id: Owner of the payments
+            batches: Lists of (debt_id, amount, payment_date) tuples
+            source: Payment source for every row
+            balance_totals: Called once all batches are in; returns {debt_id: amount}
+                            to take off each debt's principal
+            dry_run: Consume the batches but roll everything back
+        
+        Returns:
+            Number of payment rows read from the batches
+        
+        An exception raised while consuming the batches rolls back the import.
+        """
+    
+    @abstractmethod
+    def payment_totals(self, user_id: int, date_from: str, date_to: str) -> Dict[str, Dict[Any, Decimal]]:
+        """Payments summed per YYYY-MM month and debt, for date_from <= payment_date < date_to."""
+    
+    @abstractmethod
+    def payment_counts(self, user_id: int, source: str, date_from: date,
+                       date_to: date) -> Dict[Tuple[Any, date, Decimal], int]:
+        """Stored payments from `source` per (debt_id, payment_date, amount), for date_from <= payment_date <= date_to."""
+    
+    # ------------------------------------------------------------ commitments
+    
+    @abstractmethod
+    def add_commitment(self, user_id: int, amount: Any, strategy: str = 'avalanche',
+                       custom_alloc: Optional[Any] = None, starts_on: Optional[Any] = None) -> int:
+        """Record a monthly extra-payment commitment (effective from starts_on, default now) and return its id."""
+    
+    @abstractmethod
+    def list_commitments(self, user_id: int) -> List[Dict[str, Any]]:
+        """The user's commitments, oldest first."""
+    
+    def latest_commitment(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """The most recent commitment, or None."""
+        commitments = self.list_commitments(user_id)
+        return commitments[-1] if commitments else None
+    
+    # -------------------------------------------------------------- snapshots
+    
+    @abstractmethod
+    def create_snapshot(self, user_id: int, name: str, state: Dict[str, Any],
+                        ledger: Optional[bytes] = None) -> int:
+        """Save a snapshot and return its id."""
+    
+    @abstractmethod
+    def list_snapshots(self, user_id: int) -> List[Dict[str, Any]]:
+        """Snapshots newest first as {id, name, snapshot_date, state}, without ledgers."""
+    
+    @abstractmethod
+    def get_snapshot(self, user_id: int, snapshot_id: int) -> Optional[Dict[str, Any]]:
+        """One snapshot including its `ledger` bytes, or None."""
+    
+    @abstractmethod
+    def get_snapshots(self, user_id: int, snapshot_ids: List[int]) -> List[Dict[str, Any]]:
+        """The user's snapshots among the given ids, including ledgers."""
+    
+    @abstractmethod
+    def delete_snapshot(self, user_id: int, snapshot_id: int) -> bool:
+        """Delete a snapshot; False if the user has no such snapshot."""
+    
+    # ------------------------------------------------------------------ plans
+    
+    @abstractmethod
+    def get_plan(self, user_id: int) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """The user's saved plan trajectory as (plan_id, state), or None."""
+    
+    @abstractmethod
+    def replace_plan(self, user_id: int, state: Dict[str, Any]) -> int:
+        """Store a new plan trajectory in place of the user's current one."""
+    
+    @abstractmethod
+    def update_plan(self, plan_id: int, state: Dict[str, Any]):
+        """Write an updated trajectory back to its plan."""
+
+
+def create_repository(kind: str, db_config: Optional[Dict[str, Any]] = None) -> Repository:
+    """
+    Build the repository named by `kind`.
+    
+    Args:
+        kind: 'mysql' or 'memory'
+        db_config: mysql.connector connection arguments (MySQL only)
+    
+    The in-memory repository starts with the sample portfolio from
+    database/init.sql for the default user.
+    """
+    if kind == 'mysql':
+        from .mysql_repository import MySQLRepository
+        return MySQLRepository(db_config or {})
+    if kind == 'memory':
+        from .memory_repository import MemoryRepository
+        repository = MemoryRepository()
+        repository.seed_sample_data()
+        return repository
+    raise ValueError(f'Unknown repository: {kind}')
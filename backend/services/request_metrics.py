@@ -0,0 +1,248 @@
+"""
+Request Metrics
+Per-endpoint request counts and phase-timing histograms in Prometheus format.
+
+Every request records its status and total time, split into phases: `db`
+(repository calls, including the conversion of rows to debts), `serialize`
+(JSON encoding of the response) and `compute` (the rest: validation,
+simulation, ranking). Observations go into fixed cumulative buckets, so
+recording one is a bisect and a few increments under a lock; nothing is
+aggregated or formatted until /metrics is scraped.
+
+Percentiles from a running API, run from the backend directory:
+    
+    python -m services.request_metrics http://localhost:5006/metrics --phases
+"""
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Callable, Tuple
+import argparse
+import re
+import threading
+import time
+import urllib.request
+
+from .tracing import tracer
+
+
+# Upper bounds in seconds; +Inf is implied
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASES = ('db', 'compute', 'serialize')
+
+
+class PhaseTimer:
+    """Wall-clock time of one request, split by phase."""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Add the time spent in the block to `name`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+    
+    def finish(self) -> Tuple[float, Dict[str, float]]:
+        """Total seconds and the time per phase; `compute` is whatever no other phase claimed."""
+        total = time.perf_counter() - self.started
+        phases = {name: self.phases.get(name, 0.0) for name in PHASES if name != 'compute'}
+        phases['compute'] = max(0.0, total - sum(phases.values()))
+        return total, phases
+
+
+class TimedRepository:
+    """
+    Repository proxy that books every call into the current request's `db`
+    phase and, in a sampled trace, runs it in a `repository.<method>` span.
+    
+    `current_timer` returns the PhaseTimer of the request being served, or
+    None outside a request or with metrics off.
+    """
+    
+    def __init__(self, repository: Any, current_timer: Callable[[], Optional[PhaseTimer]]):
+        self._repository = repository
+        self._current_timer = current_timer
+    
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._repository, name)
+        if not callable(attribute):
+            return attribute
+        
+        def timed(*args, **kwargs):
+            timer = self._current_timer()
+            with tracer.span(f'repository.{name}'):
+                if timer is None:
+                    return attribute(*args, **kwargs)
+                with timer.phase('db'):
+                    return attribute(*args, **kwargs)
+        return timed
+
+
+class RequestMetrics:
+    """Thread-safe request counters and latency histograms."""
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._requests = {}     # (endpoint, method, status) -> count
+        self._durations = {}    # (endpoint, method) -> [bucket counts..., sum]
+        self._phases = {}       # (endpoint, method, phase) -> [bucket counts..., sum]
+    
+    def observe(self, endpoint: str, method: str, status: int, total: float, phases: Dict[str, float]):
+        """Record one finished request."""
+        with self._lock:
+            key = (endpoint, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._add(self._durations, (endpoint, method), total)
+            for phase, seconds in phases.items():
+                self._add(self._phases, (endpoint, method, phase), seconds)
+    
+    def _add(self, histograms: Dict[tuple, List[float]], key: tuple, seconds: float):
+        histogram = histograms.get(key)
+        if histogram is None:
+            # One count per bucket plus +Inf, then the sum
+            histogram = histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        histogram[bisect_left(self.buckets, seconds)] += 1
+        histogram[-1] += seconds
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            requests = dict(self._requests)
+            durations = {key: list(value) for key, value in self._durations.items()}
+            phases = {key: list(value) for key, value in self._phases.items()}
+        
+        lines = [
+            '# HELP http_requests_total Requests handled, by endpoint, method and status.',
+            '# TYPE http_requests_total counter'
+        ]
+        for (endpoint, method, status), count in sorted(requests.items()):
+            lines.append(f'http_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {count}')
+        
+        lines += [
+            '# HELP http_request_duration_seconds Request wall-clock time.',
+            '# TYPE http_request_duration_seconds histogram'
+        ]
+        for (endpoint, method), histogram in sorted(durations.items()):
+            lines += self._histogram_lines('http_request_duration_seconds', histogram,
+                                           endpoint=endpoint, method=method)
+        
+        lines += [
+            '# HELP http_request_phase_seconds Request time spent in db, compute and serialize.',
+            '# TYPE http_request_phase_seconds histogram'
+        ]
+        for (endpoint, method, phase), histogram in sorted(phases.items()):
+            lines += self._histogram_lines('http_request_phase_seconds', histogram,
+                                           endpoint=endpoint, method=method, phase=phase)
+        return '\n'.join(lines) + '\n'
+    
+    def _histogram_lines(self, name: str, histogram: List[float], **labels) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), histogram):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'{name}_bucket{_labels(**labels, le=le)} {cumulative}')
+        lines.append(f'{name}_sum{_labels(**labels)} {histogram[-1]:.6f}')
+        lines.append(f'{name}_count{_labels(**labels)} {cumulative}')
+        return lines
+
+
+def _labels(**labels) -> str:
+    """{name="value",...} with values escaped for the text format."""
+    escaped = (
+        f'{name}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in labels.items()
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+# ---------------------------------------------------------------------- CLI
+
+SAMPLE_PATTERN = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+LABEL_PATTERN = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_histograms(text: str, name: str) -> Dict[tuple, List[Tuple[float, float]]]:
+    """Cumulative (le, count) buckets of histogram `name`, keyed by its other labels."""
+    histograms = {}
+    for line in text.splitlines():
+        match = SAMPLE_PATTERN.match(line)
+        if not match or match.group(1) != f'{name}_bucket':
+            continue
+        labels = {key: re.sub(r'\\(.)', lambda m: '\n' if m.group(1) == 'n' else m.group(1), value)
+                  for key, value in LABEL_PATTERN.findall(match.group(2))}
+        le = float(labels.pop('le'))
+        histograms.setdefault(tuple(sorted(labels.items())), []).append((le, float(match.group(3))))
+    return {key: sorted(buckets) for key, buckets in histograms.items()}
+
+
+def quantile(q: float, buckets: List[Tuple[float, float]]) -> Optional[float]:
+    """
+    Estimate a quantile from cumulative buckets, interpolating linearly within
+    the bucket it falls in (as Prometheus' histogram_quantile does).
+    """
+    total = buckets[-1][1] if buckets else 0
+    if not total:
+        return None
+    rank = q * total
+    lower, below = 0.0, 0.0
+    for bound, cumulative in buckets:
+        if cumulative >= rank:
+            if bound == float('inf'):
+                return lower
+            in_bucket = cumulative - below
+            return lower + (bound - lower) * ((rank - below) / in_bucket if in_bucket else 1)
+        lower, below = bound, cumulative
+    return lower
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Print p50/p95/p99 latency per endpoint from /metrics.')
+    parser.add_argument('url', nargs='?', default='http://localhost:5006/metrics', help='Metrics endpoint')
+    parser.add_argument('--phases', action='store_true', help='Also break each endpoint down by phase')
+    args = parser.parse_args()
+    
+    with urllib.request.urlopen(args.url) as response:
+        text = response.read().decode('utf-8')
+    
+    errors = {}
+    for line in text.splitlines():
+        match = SAMPLE_PATTERN.match(line)
+        if match and match.group(1) == 'http_requests_total':
+            labels = dict(LABEL_PATTERN.findall(match.group(2)))
+            key = (labels['endpoint'], labels['method'])
+            failed = float(match.group(3)) if labels['status'].startswith('5') else 0
+            errors[key] = errors.get(key, 0) + failed
+    
+    rows = []
+    durations = parse_histograms(text, 'http_request_duration_seconds')
+    phases = parse_histograms(text, 'http_request_phase_seconds') if args.phases else {}
+    for key, buckets in sorted(durations.items()):
+        labels = dict(key)
+        endpoint, method = labels['endpoint'], labels['method']
+        count = buckets[-1][1]
+        rows.append((f'{method} {endpoint}', count, buckets, errors.get((endpoint, method), 0) / count if count else 0))
+        for phase in PHASES:
+            phase_buckets = phases.get(tuple(sorted({**labels, 'phase': phase}.items())))
+            if phase_buckets:
+                rows.append((f'    {phase}', phase_buckets[-1][1], phase_buckets, None))
+    
+    def ms(value):
+        return '-' if value is None else f'{value * 1000:.1f}'
+    
+    print(f'{"endpoint":<48} {"count":>8} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"errors":>7}')
+    for name, count, buckets, error_rate in rows:
+        error = '' if error_rate is None else f'{error_rate:.1%}'
+        line = (f'{name:<48} {int(count):>8} {ms(quantile(0.5, buckets)):>9} '
+                f'{ms(quantile(0.95, buckets)):>9} {ms(quantile(0.99, buckets)):>9} {error:>7}')
+        print(line.rstrip())
+
+
+if __name__ == '__main__':
+    main()
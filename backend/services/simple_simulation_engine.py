@@ -1,32 +1,97 @@
 from decimal import Decimal
-from typing import Dict, List, Any
-from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import date, datetime
+import calendar
 import copy
 
+from .compiled_portfolio import compile_portfolio, daily_compounded_rate, monthly_rate, weekly_payment_credit
+from .tracing import traced
+
+
+def month_calendar(start_date: datetime, month: int) -> Tuple[int, int, int]:
+    """
+    Calendar of month `month` (1-based) of a plan starting in start_date's month.
+    
+    Returns (days, first_payday, paydays): the month's length, the 0-based day
+    of its first weekly payment (weekly payments fall every 7 days from the
+    start date) and the number of weekly payments in it.
+    """
+    year, index = divmod(start_date.year * 12 + start_date.month + month - 2, 12)
+    days = calendar.monthrange(year, index + 1)[1]
+    first_payday = (start_date.toordinal() - date(year, index + 1, 1).toordinal()) % 7
+    return days, first_payday, (days - 1 - first_payday) // 7 + 1
+
+
+def month_date(start_date: datetime, month: int) -> datetime:
+    """
+    Date labelling month `month` of a plan starting on start_date: the start
+    date's day in the month month_calendar charges (clamped to its length).
+    """
+    year, index = divmod(start_date.year * 12 + start_date.month + month - 2, 12)
+    day = min(start_date.day, calendar.monthrange(year, index + 1)[1])
+    return start_date.replace(year=year, month=index + 1, day=day)
+
+
+def month_number(start_date: datetime, when: date) -> int:
+    """Plan month (1-based) of the calendar month containing `when`; 0 or less if it is before the start."""
+    return (when.year * 12 + when.month) - (start_date.year * 12 + start_date.month) + 1
+
 
 class SimpleDebt:
     """Simple debt class with correct payment logic."""
     
-    def __init__(self, debt_id: int, name: str, principal: Decimal, apr: Decimal, min_payment: Decimal):
+    def __init__(self, debt_id: int, name: str, principal: Decimal, apr: Decimal, min_payment: Decimal,
+                 compounding: str = 'monthly', payment_frequency: str = 'monthly'):
         self.id = debt_id
         self.name = name
         self.principal = principal
+        # 'monthly' (apr/12), 'daily' (apr/365 per day of the month) or 'none'
+        self.compounding = compounding
         self.apr = apr
+        # With 'weekly', min_payment is due on every weekly payday rather than once a month
         self.min_payment = min_payment
+        self.payment_frequency = payment_frequency
         self.status = 'active'
         self.months_paid = 0
         self.total_interest_paid = Decimal('0')
     
-    def calculate_monthly_interest(self) -> Decimal:
-        """Calculate monthly interest."""
-        return self.principal * (self.apr / Decimal('12'))
+    @property
+    def apr(self) -> Decimal:
+        return self._apr
+    
+    @apr.setter
+    def apr(self, value: Decimal):
+        # The monthly rate is kept with the APR so the monthly step doesn't divide again
+        self._apr = value
+        self.monthly_rate = monthly_rate(value, self.compounding)
+    
+    def calculate_monthly_interest(self, days: int = 30, first_payday: Optional[int] = None) -> Decimal:
+        """
+        Calculate interest for a month of `days` days. For a weekly-paid debt,
+        `first_payday` (see month_calendar) accounts for the interest its
+        payments save during the month; None means none are made.
+        """
+        if self.compounding == 'daily':
+            interest = self.principal * daily_compounded_rate(self.apr, days)
+        else:
+            interest = self.principal * self.monthly_rate
+        if first_payday is not None and self.payment_frequency == 'weekly':
+            interest -= weekly_payment_credit(self.apr, self.compounding, days, first_payday,
+                                              self.min_payment, self.principal)
+        return interest
+    
+    def payment_due(self, paydays: int) -> Decimal:
+        """Minimum payment due in a month with `paydays` weekly paydays."""
+        if self.payment_frequency == 'weekly':
+            return self.min_payment * paydays
+        return self.min_payment
     
-    def apply_monthly_interest(self):
+    def apply_monthly_interest(self, days: int = 30, first_payday: Optional[int] = None):
         """Apply monthly interest to principal. Should be called once per month."""
         if self.status != 'active':
             return Decimal('0')
         
-        monthly_interest = self.calculate_monthly_interest()
+        monthly_interest = self.calculate_monthly_interest(days, first_payday)
         self.principal += monthly_interest
         self.total_interest_paid += monthly_interest
         return monthly_interest
@@ -60,34 +125,168 @@ class SimpleDebt:
 class SimpleSimulationEngine:
     """Simple simulation engine with correct logic."""
     
-    def __init__(self):
+    def __init__(self, start_date: Optional[datetime] = None, profiler=None):
         self.debts = []
+        # Date of month one; None means "now", read once per simulation
+        self.start_date = start_date
+        # Optional EngineProfiler (services/engine_profiler.py) filled in by the simulations
+        self.profiler = profiler
     
     def add_debt(self, debt: SimpleDebt):
         """Add a debt to the simulation."""
         self.debts.append(debt)
     
-    def simulate_avalanche(self, extra_payment: Decimal = Decimal('0'), max_months: int = 600) -> Dict[str, Any]:
+    def run_simulation(self, debts: List[SimpleDebt], extra_payment: Decimal = Decimal('0'),
+                       strategy: str = 'avalanche', schedule=None) -> Dict[str, Any]:
+        """Load debts and run the full simulation for a strategy."""
+        self.debts = debts
+        if strategy == 'snowball':
+            return self.simulate_snowball(extra_payment, schedule=schedule)
+        return self.simulate_avalanche(extra_payment, schedule=schedule)
+    
+    def _apply_schedule_events(self, events: List[Dict[str, Any]], working_debts: List[SimpleDebt],
+                               extra_payment: Decimal, paused: bool, allocation: Dict[Any, Decimal]):
+        """Apply the schedule events that fall on one month boundary."""
+        bonus = Decimal('0')
+        arrived = []
+        
+        for event in events:
+            if event['type'] == 'extra_payment':
+                extra_payment = event['amount']
+            elif event['type'] == 'allocation':
+                allocation = event['allocation']
+            elif event['type'] == 'bonus':
+                bonus += event['amount']
+            elif event['type'] == 'pause':
+                paused = event['paused']
+            elif event['type'] == 'rate_change':
+                for debt in working_debts:
+                    if debt.id == event['debt_id']:
+                        debt.apr = event['apr']
+            elif event['type'] == 'new_debt':
+                debt = copy.deepcopy(event['debt'])
+                working_debts.append(debt)
+                arrived.append(debt)
+        
+        return extra_payment, bonus, paused, arrived, allocation
+    
+    def _apply_bonus(self, bonus: Decimal, working_debts: List[SimpleDebt], month_data: Dict[str, Any],
+                     pick_target) -> Decimal:
+        """Cascade a one-off payment through the strategy order; returns the amount applied."""
+        applied = Decimal('0')
+        
+        while bonus > 0:
+            remaining_debts = [debt for debt in working_debts if debt.status == 'active']
+            if not remaining_debts:
+                break
+            
+            target_debt = pick_target(remaining_debts)
+            payment = min(bonus, target_debt.principal)
+            target_debt.apply_payment(payment)
+            bonus -= payment
+            applied += payment
+            
+            for debt_info in month_data['debts']:
+                if debt_info['id'] == target_debt.id:
+                    debt_info['balance'] = target_debt.principal
+                    debt_info['payment_made'] += payment
+                    debt_info['status'] = target_debt.status
+                    break
+            
+            month_data['payments_this_month'] += payment
+            if target_debt.status == 'paid':
+                month_data['paid_off_this_month'].append(target_debt.name)
+        
+        return applied
+    
+    def _apply_allocation(self, allocation: Dict[Any, Decimal], working_debts: List[SimpleDebt],
+                          month_data: Dict[str, Any], available: Decimal) -> Decimal:
+        """Pay the allocated part of this month's extra payment to its debts; returns the amount applied."""
+        applied = Decimal('0')
+        
+        for debt in working_debts:
+            amount = allocation.get(debt.id)
+            if not amount or debt.status != 'active' or applied >= available:
+                continue
+            
+            payment = min(amount, available - applied, debt.principal)
+            debt.apply_payment(payment)
+            applied += payment
+            
+            for debt_info in month_data['debts']:
+                if debt_info['id'] == debt.id:
+                    debt_info['balance'] = debt.principal
+                    debt_info['payment_made'] += payment
+                    debt_info['status'] = debt.status
+                    break
+            
+            month_data['payments_this_month'] += payment
+            if debt.status == 'paid':
+                month_data['paid_off_this_month'].append(debt.name)
+        
+        return applied
+    
+    @traced('simulate.avalanche')
+    def simulate_avalanche(self, extra_payment: Decimal = Decimal('0'), max_months: int = 600,
+                           schedule=None) -> Dict[str, Any]:
         """Simulate debt repayment using avalanche strategy."""
         # Create working copies
         working_debts = [copy.deepcopy(debt) for debt in self.debts]
+        start_date = self.start_date or datetime.now()
+        compiled = compile_portfolio(self.debts)
         
         simulation_results = []
         total_interest_paid = Decimal('0')
         total_payments_made = Decimal('0')
         
         # Calculate total available payment once at the beginning (constant throughout simulation)
-        total_min_payments = sum(debt.min_payment for debt in self.debts)
+        total_min_payments = compiled.total_min_payments
         total_available_payment = total_min_payments + extra_payment
+        weekly_min_payments = compiled.weekly_min_payments
+        
+        # Debts by APR (highest first); only re-sorted when a schedule event changes a rate or adds a debt
+        ordered_debts = [working_debts[i] for i in compiled.avalanche_order]
+        
+        # Sparse schedule of plan changes, consumed as the months reach each boundary
+        schedule_events = schedule.boundaries if schedule else []
+        pending_arrivals = schedule.arrival_count if schedule else 0
+        next_event = 0
+        paused = False
+        allocation = {}
+        
+        profiler = self.profiler
+        if profiler:
+            profiler.count('simulations')
+            profiler.count('objects_allocated', len(working_debts))
         
         for month in range(1, max_months + 1):
-            # Check if all debts are paid off
-            active_debts = [debt for debt in working_debts if debt.status == 'active']
-            if not active_debts:
+            bonus = Decimal('0')
+            if next_event < len(schedule_events) and schedule_events[next_event][0] == month:
+                extra_payment, bonus, paused, arrived, allocation = self._apply_schedule_events(
+                    schedule_events[next_event][1], working_debts, extra_payment, paused, allocation
+                )
+                next_event += 1
+                pending_arrivals -= len(arrived)
+                total_min_payments += sum(debt.min_payment for debt in arrived)
+                weekly_min_payments += sum(debt.min_payment for debt in arrived if debt.payment_frequency == 'weekly')
+                total_available_payment = total_min_payments + extra_payment
+                ordered_debts = sorted(working_debts, key=lambda x: x.apr, reverse=True)
+                if profiler:
+                    profiler.count('priority_sorts')
+            
+            # Active debts in avalanche order (highest APR first)
+            active_debts = [debt for debt in ordered_debts if debt.status == 'active']
+            if not active_debts and not pending_arrivals:
                 break
             
             # Calculate current date
-            current_date = datetime.now() + timedelta(days=30 * (month - 1))
+            current_date = month_date(start_date, month)
+            # Length and weekly paydays of the plan's calendar month
+            month_days, first_payday, paydays = month_calendar(start_date, month)
+            # Weekly-paid debts owe their minimum on each of the month's paydays
+            month_available_payment = total_available_payment
+            if weekly_min_payments:
+                month_available_payment += weekly_min_payments * (paydays - 1)
             
             month_data = {
                 'month': month,
@@ -99,30 +298,38 @@ class SimpleSimulationEngine:
                 'paid_off_this_month': []
             }
             
-            # Sort debts by APR (highest first) for avalanche
-            active_debts.sort(key=lambda x: x.apr, reverse=True)
+            if profiler:
+                # Active list, month record and one record per active debt
+                profiler.count('months_simulated')
+                profiler.count('interest_applications', len(active_debts))
+                profiler.count('objects_allocated', len(active_debts) + 2)
+                started = profiler.clock()
             
             # Step 0: Apply monthly interest to all active debts (once per month)
             debt_interest_map = {}
             for debt in active_debts:
                 if debt.status != 'active':
                     continue
-                monthly_interest = debt.apply_monthly_interest()
+                monthly_interest = debt.apply_monthly_interest(month_days, None if paused else first_payday)
                 debt_interest_map[debt.id] = monthly_interest
                 month_data['interest_this_month'] += monthly_interest
                 total_interest_paid += monthly_interest
             
+            if profiler:
+                started = profiler.lap('interest', started)
+            
             # Step 1: Apply minimum payments to all active debts
             for debt in active_debts:
                 if debt.status != 'active':
                     continue
                 
-                # Apply minimum payment
-                payment_result = debt.apply_payment(debt.min_payment)
+                # Apply minimum payment (nothing is paid during a payment pause)
+                min_payment_due = Decimal('0') if paused else debt.payment_due(paydays)
+                payment_result = debt.apply_payment(min_payment_due)
                 
                 # Track payments
-                month_data['payments_this_month'] += debt.min_payment
-                total_payments_made += debt.min_payment
+                month_data['payments_this_month'] += min_payment_due
+                total_payments_made += min_payment_due
                 
                 # Add debt info
                 debt_info = {
@@ -130,7 +337,7 @@ class SimpleSimulationEngine:
                     'name': debt.name,
                     'balance': debt.principal,
                     'interest_paid': debt_interest_map.get(debt.id, Decimal('0')),
-                    'payment_made': debt.min_payment,
+                    'payment_made': min_payment_due,
                     'status': debt.status
                 }
                 month_data['debts'].append(debt_info)
@@ -139,19 +346,31 @@ class SimpleSimulationEngine:
                 if debt.status == 'paid':
                     month_data['paid_off_this_month'].append(debt.name)
             
+            if profiler:
+                started = profiler.lap('minimum_payments', started)
+                iterations_before = profiler.counters['reallocation_iterations']
+            
             # Step 2: Reallocate freed payments and extra payment to remaining debts
             # Calculate how much extra payment is available (freed payments + extra payment)
             # Use the original total available payment to maintain constant payments
-            remaining_payment = total_available_payment - month_data['payments_this_month']
+            remaining_payment = month_available_payment - month_data['payments_this_month']
+            if paused:
+                remaining_payment = Decimal('0')
+            
+            # Committed allocations go to their debts first; the rest follows the strategy
+            if allocation and remaining_payment > 0:
+                allocated = self._apply_allocation(allocation, working_debts, month_data, remaining_payment)
+                total_payments_made += allocated
+                remaining_payment -= allocated
             
             while remaining_payment > 0:
-                # Get remaining active debts sorted by APR (highest first for avalanche)
-                remaining_debts = [debt for debt in working_debts if debt.status == 'active']
-                if not remaining_debts:
+                # Highest APR debt still active
+                target_debt = next((debt for debt in ordered_debts if debt.status == 'active'), None)
+                if target_debt is None:
                     break
                 
-                remaining_debts.sort(key=lambda x: x.apr, reverse=True)
-                target_debt = remaining_debts[0]
+                if profiler:
+                    profiler.count('reallocation_iterations')
                 
                 # Apply remaining payment to target debt
                 extra_result = target_debt.apply_payment(remaining_payment)
@@ -172,16 +391,29 @@ class SimpleSimulationEngine:
                 if target_debt.status == 'paid':
                     month_data['paid_off_this_month'].append(target_debt.name)
                     # Add the freed payment to remaining_payment for next iteration
-                    remaining_payment = target_debt.min_payment
+                    remaining_payment = target_debt.payment_due(paydays)
                 else:
                     remaining_payment = Decimal('0')  # No more payment available
             
+            # Step 3: Cascade any one-off bonus through the avalanche order
+            if bonus > 0:
+                total_payments_made += self._apply_bonus(
+                    bonus, working_debts, month_data, lambda debts: max(debts, key=lambda x: x.apr)
+                )
+            
+            if profiler:
+                profiler.lap('reallocation', started)
+                profiler.peak('reallocation_iterations',
+                              profiler.counters['reallocation_iterations'] - iterations_before)
+            
             # Calculate total balance
             month_data['total_balance'] = sum(debt.principal for debt in working_debts if debt.status == 'active')
             
             simulation_results.append(month_data)
         
         # Calculate summary
+        if profiler:
+            started = profiler.clock()
         final_debts = []
         for debt in working_debts:
             final_debts.append({
@@ -193,12 +425,10 @@ class SimpleSimulationEngine:
                 'total_interest_paid': float(debt.total_interest_paid)
             })
         
-        # Find debt-free date
+        # Find debt-free date (the last month, once nothing is left to arrive)
         debt_free_date = None
-        for month_data in simulation_results:
-            if month_data['total_balance'] <= Decimal('0'):
-                debt_free_date = month_data['date']
-                break
+        if simulation_results and simulation_results[-1]['total_balance'] <= Decimal('0'):
+            debt_free_date = simulation_results[-1]['date']
         
         summary = {
             'total_interest_paid': float(total_interest_paid),
@@ -208,33 +438,71 @@ class SimpleSimulationEngine:
             'final_total_balance': float(sum(debt.principal for debt in working_debts if debt.status == 'active'))
         }
         
+        if profiler:
+            profiler.lap('summary', started)
+            profiler.count('objects_allocated', len(final_debts))
+        
         return {
             'simulation_results': simulation_results,
             'summary': summary,
             'final_debts': final_debts
         }
     
-    def simulate_snowball(self, extra_payment: Decimal = Decimal('0'), max_months: int = 600) -> Dict[str, Any]:
+    @traced('simulate.snowball')
+    def simulate_snowball(self, extra_payment: Decimal = Decimal('0'), max_months: int = 600,
+                          schedule=None) -> Dict[str, Any]:
         """Simulate debt repayment using snowball strategy."""
         # Create working copies
         working_debts = [copy.deepcopy(debt) for debt in self.debts]
+        start_date = self.start_date or datetime.now()
         
         simulation_results = []
         total_interest_paid = Decimal('0')
         total_payments_made = Decimal('0')
         
         # Calculate total available payment once at the beginning (constant throughout simulation)
-        total_min_payments = sum(debt.min_payment for debt in self.debts)
+        compiled = compile_portfolio(self.debts)
+        total_min_payments = compiled.total_min_payments
         total_available_payment = total_min_payments + extra_payment
+        weekly_min_payments = compiled.weekly_min_payments
+        
+        # Sparse schedule of plan changes, consumed as the months reach each boundary
+        schedule_events = schedule.boundaries if schedule else []
+        pending_arrivals = schedule.arrival_count if schedule else 0
+        next_event = 0
+        paused = False
+        allocation = {}
+        
+        profiler = self.profiler
+        if profiler:
+            profiler.count('simulations')
+            profiler.count('objects_allocated', len(working_debts))
         
         for month in range(1, max_months + 1):
+            bonus = Decimal('0')
+            if next_event < len(schedule_events) and schedule_events[next_event][0] == month:
+                extra_payment, bonus, paused, arrived, allocation = self._apply_schedule_events(
+                    schedule_events[next_event][1], working_debts, extra_payment, paused, allocation
+                )
+                next_event += 1
+                pending_arrivals -= len(arrived)
+                total_min_payments += sum(debt.min_payment for debt in arrived)
+                weekly_min_payments += sum(debt.min_payment for debt in arrived if debt.payment_frequency == 'weekly')
+                total_available_payment = total_min_payments + extra_payment
+            
             # Check if all debts are paid off
             active_debts = [debt for debt in working_debts if debt.status == 'active']
-            if not active_debts:
+            if not active_debts and not pending_arrivals:
                 break
             
             # Calculate current date
-            current_date = datetime.now() + timedelta(days=30 * (month - 1))
+            current_date = month_date(start_date, month)
+            # Length and weekly paydays of the plan's calendar month
+            month_days, first_payday, paydays = month_calendar(start_date, month)
+            # Weekly-paid debts owe their minimum on each of the month's paydays
+            month_available_payment = total_available_payment
+            if weekly_min_payments:
+                month_available_payment += weekly_min_payments * (paydays - 1)
             
             month_data = {
                 'month': month,
@@ -249,27 +517,39 @@ class SimpleSimulationEngine:
             # Sort debts by balance (smallest first) for snowball
             active_debts.sort(key=lambda x: x.principal)
             
+            if profiler:
+                # Active list, month record and one record per active debt
+                profiler.count('months_simulated')
+                profiler.count('priority_sorts')
+                profiler.count('interest_applications', len(active_debts))
+                profiler.count('objects_allocated', len(active_debts) + 2)
+                started = profiler.clock()
+            
             # Step 0: Apply monthly interest to all active debts (once per month)
             debt_interest_map = {}
             for debt in active_debts:
                 if debt.status != 'active':
                     continue
-                monthly_interest = debt.apply_monthly_interest()
+                monthly_interest = debt.apply_monthly_interest(month_days, None if paused else first_payday)
                 debt_interest_map[debt.id] = monthly_interest
                 month_data['interest_this_month'] += monthly_interest
                 total_interest_paid += monthly_interest
             
+            if profiler:
+                started = profiler.lap('interest', started)
+            
             # Step 1: Apply minimum payments to all active debts
             for debt in active_debts:
                 if debt.status != 'active':
                     continue
                 
-                # Apply minimum payment
-                payment_result = debt.apply_payment(debt.min_payment)
+                # Apply minimum payment (nothing is paid during a payment pause)
+                min_payment_due = Decimal('0') if paused else debt.payment_due(paydays)
+                payment_result = debt.apply_payment(min_payment_due)
                 
                 # Track payments
-                month_data['payments_this_month'] += debt.min_payment
-                total_payments_made += debt.min_payment
+                month_data['payments_this_month'] += min_payment_due
+                total_payments_made += min_payment_due
                 
                 # Add debt info
                 debt_info = {
@@ -277,7 +557,7 @@ class SimpleSimulationEngine:
                     'name': debt.name,
                     'balance': debt.principal,
                     'interest_paid': debt_interest_map.get(debt.id, Decimal('0')),
-                    'payment_made': debt.min_payment,
+                    'payment_made': min_payment_due,
                     'status': debt.status
                 }
                 month_data['debts'].append(debt_info)
@@ -286,10 +566,22 @@ class SimpleSimulationEngine:
                 if debt.status == 'paid':
                     month_data['paid_off_this_month'].append(debt.name)
             
+            if profiler:
+                started = profiler.lap('minimum_payments', started)
+                iterations_before = profiler.counters['reallocation_iterations']
+            
             # Step 2: Reallocate freed payments and extra payment to remaining debts
             # Calculate how much extra payment is available (freed payments + extra payment)
             # Use the original total available payment to maintain constant payments
-            remaining_payment = total_available_payment - month_data['payments_this_month']
+            remaining_payment = month_available_payment - month_data['payments_this_month']
+            if paused:
+                remaining_payment = Decimal('0')
+            
+            # Committed allocations go to their debts first; the rest follows the strategy
+            if allocation and remaining_payment > 0:
+                allocated = self._apply_allocation(allocation, working_debts, month_data, remaining_payment)
+                total_payments_made += allocated
+                remaining_payment -= allocated
             
             while remaining_payment > 0:
                 # Get remaining active debts sorted by balance (smallest first for snowball)
@@ -299,6 +591,10 @@ class SimpleSimulationEngine:
                 
                 remaining_debts.sort(key=lambda x: x.principal)
                 target_debt = remaining_debts[0]
+                if profiler:
+                    profiler.count('reallocation_iterations')
+                    profiler.count('priority_sorts')
+                    profiler.count('objects_allocated')
                 
                 # Apply remaining payment to target debt
                 extra_result = target_debt.apply_payment(remaining_payment)
@@ -319,16 +615,29 @@ class SimpleSimulationEngine:
                 if target_debt.status == 'paid':
                     month_data['paid_off_this_month'].append(target_debt.name)
                     # Add the freed payment to remaining_payment for next iteration
-                    remaining_payment = target_debt.min_payment
+                    remaining_payment = target_debt.payment_due(paydays)
                 else:
                     remaining_payment = Decimal('0')  # No more payment available
             
+            # Step 3: Cascade any one-off bonus through the snowball order
+            if bonus > 0:
+                total_payments_made += self._apply_bonus(
+                    bonus, working_debts, month_data, lambda debts: min(debts, key=lambda x: x.principal)
+                )
+            
+            if profiler:
+                profiler.lap('reallocation', started)
+                profiler.peak('reallocation_iterations',
+                              profiler.counters['reallocation_iterations'] - iterations_before)
+            
             # Calculate total balance
             month_data['total_balance'] = sum(debt.principal for debt in working_debts if debt.status == 'active')
             
             simulation_results.append(month_data)
         
         # Calculate summary
+        if profiler:
+            started = profiler.clock()
         final_debts = []
         for debt in working_debts:
             final_debts.append({
@@ -340,12 +649,10 @@ class SimpleSimulationEngine:
                 'total_interest_paid': float(debt.total_interest_paid)
             })
         
-        # Find debt-free date
+        # Find debt-free date (the last month, once nothing is left to arrive)
         debt_free_date = None
-        for month_data in simulation_results:
-            if month_data['total_balance'] <= Decimal('0'):
-                debt_free_date = month_data['date']
-                break
+        if simulation_results and simulation_results[-1]['total_balance'] <= Decimal('0'):
+            debt_free_date = simulation_results[-1]['date']
         
         summary = {
             'total_interest_paid': float(total_interest_paid),
@@ -355,6 +662,10 @@ class SimpleSimulationEngine:
             'final_total_balance': float(sum(debt.principal for debt in working_debts if debt.status == 'active'))
         }
         
+        if profiler:
+            profiler.lap('summary', started)
+            profiler.count('objects_allocated', len(final_debts))
+        
         return {
             'simulation_results': simulation_results,
             'summary': summary,
@@ -409,16 +720,16 @@ class SimpleSimulationEngine:
             }
         }
     
-    def compare_strategies(self, extra_payment: Decimal = Decimal('0')) -> Dict[str, Any]:
+    def compare_strategies(self, extra_payment: Decimal = Decimal('0'), schedule=None) -> Dict[str, Any]:
         """Compare avalanche and snowball strategies."""
         if not self.debts:
             return {'error': 'No debts loaded'}
         
         # Run avalanche simulation
-        avalanche_result = self.simulate_avalanche(extra_payment)
+        avalanche_result = self.simulate_avalanche(extra_payment, schedule=schedule)
         
         # Run snowball simulation  
-        snowball_result = self.simulate_snowball(extra_payment)
+        snowball_result = self.simulate_snowball(extra_payment, schedule=schedule)
         
         # Calculate differences
         avalanche_months = avalanche_result['summary']['months_to_zero']
@@ -443,6 +754,7 @@ class SimpleSimulationEngine:
             }
         }
     
+    @traced('simulate.baseline')
     def simulate_baseline(self, extra_payment: Decimal = Decimal('0'), max_months: int = 600) -> Dict[str, Any]:
         """Simulate debt repayment WITHOUT payment reallocation (baseline comparison)."""
         if not self.debts:
@@ -450,6 +762,7 @@ class SimpleSimulationEngine:
         
         # Create working copies
         working_debts = [copy.deepcopy(debt) for debt in self.debts]
+        start_date = self.start_date or datetime.now()
         
         simulation_results = []
         total_interest_paid = Decimal('0')
@@ -462,7 +775,9 @@ class SimpleSimulationEngine:
                 break
             
             # Calculate current date
-            current_date = datetime.now() + timedelta(days=30 * (month - 1))
+            current_date = month_date(start_date, month)
+            # Length and weekly paydays of the plan's calendar month
+            month_days, first_payday, paydays = month_calendar(start_date, month)
             
             month_data = {
                 'month': month,
@@ -479,7 +794,7 @@ class SimpleSimulationEngine:
             for debt in active_debts:
                 if debt.status != 'active':
                     continue
-                monthly_interest = debt.apply_monthly_interest()
+                monthly_interest = debt.apply_monthly_interest(month_days, first_payday)
                 debt_interest_map[debt.id] = monthly_interest
                 month_data['interest_this_month'] += monthly_interest
                 total_interest_paid += monthly_interest
@@ -490,11 +805,12 @@ class SimpleSimulationEngine:
                     continue
                 
                 # Apply minimum payment only
-                payment_result = debt.apply_payment(debt.min_payment)
+                min_payment_due = debt.payment_due(paydays)
+                payment_result = debt.apply_payment(min_payment_due)
                 
                 # Track payments
-                month_data['payments_this_month'] += debt.min_payment
-                total_payments_made += debt.min_payment
+                month_data['payments_this_month'] += min_payment_due
+                total_payments_made += min_payment_due
                 
                 # Add debt info
                 debt_info = {
@@ -502,7 +818,7 @@ class SimpleSimulationEngine:
                     'name': debt.name,
                     'balance': debt.principal,
                     'interest_paid': debt_interest_map.get(debt.id, Decimal('0')),
-                    'payment_made': debt.min_payment,
+                    'payment_made': min_payment_due,
                     'status': debt.status
                 }
                 month_data['debts'].append(debt_info)
@@ -566,6 +882,7 @@ class SimpleSimulationEngine:
             }
         }
 
+    @traced('simulate.custom_order')
     def simulate_custom_order(self, custom_order: List[str], extra_payment: Decimal = Decimal('0'), max_months: int = 600) -> Dict[str, Any]:
         """Simulate debt repayment with custom milestone order."""
         if not self.debts:
@@ -573,6 +890,7 @@ class SimpleSimulationEngine:
         
         # Create working copies
         working_debts = [copy.deepcopy(debt) for debt in self.debts]
+        start_date = self.start_date or datetime.now()
         
         simulation_results = []
         total_interest_paid = Decimal('0')
@@ -590,7 +908,9 @@ class SimpleSimulationEngine:
                 break
             
             # Calculate current date
-            current_date = datetime.now() + timedelta(days=30 * (month - 1))
+            current_date = month_date(start_date, month)
+            # Length and weekly paydays of the plan's calendar month
+            month_days, first_payday, paydays = month_calendar(start_date, month)
             
             month_data = {
                 'month': month,
@@ -607,14 +927,14 @@ class SimpleSimulationEngine:
             for debt in active_debts:
                 if debt.status != 'active':
                     continue
-                monthly_interest = debt.apply_monthly_interest()
+                monthly_interest = debt.apply_monthly_interest(month_days, first_payday)
                 debt_interest_map[debt.id] = monthly_interest
                 month_data['interest_this_month'] += monthly_interest
                 total_interest_paid += monthly_interest
             
             # Step 1: Calculate total available payment for this month
             # Use ALL debts (including paid-off ones) to maintain constant total payment
-            total_min_payments = sum(debt.min_payment for debt in working_debts)
+            total_min_payments = sum(debt.payment_due(paydays) for debt in working_debts)
             total_available_payment = total_min_payments + extra_payment
             
             # Step 2: Apply payments according to custom order priority
@@ -628,9 +948,10 @@ class SimpleSimulationEngine:
                     break
                 
                 # Calculate payment for this debt
-                if remaining_payment >= debt.min_payment:
+                min_payment_due = debt.payment_due(paydays)
+                if remaining_payment >= min_payment_due:
                     # Can pay minimum payment
-                    payment_amount = debt.min_payment
+                    payment_amount = min_payment_due
                     remaining_payment -= payment_amount
                 else:
                     # Can only pay partial minimum
@@ -710,4 +1031,227 @@ class SimpleSimulationEngine:
                 'strategy': 'custom_order',
                 'custom_order': custom_order
             }
-        }
\ No newline at end of file
+        }
+    
+    @traced('simulate.summary')
+    def simulate_summary(self, strategy: str = 'avalanche', extra_payment: Decimal = Decimal('0'),
+                         max_months: int = 600, schedule=None) -> Dict[str, Any]:
+        """
+        Summary-only simulation for avalanche or snowball.
+        
+        Follows exactly the same monthly rules as simulate_avalanche and
+        simulate_snowball but keeps balances in flat lists and skips the
+        per-month records, so it is cheap enough to call many times from
+        solvers and searches.
+        """
+        # Rates, minimums and the avalanche ranking are shared with every run on this portfolio;
+        # schedule events that change them work on local copies
+        compiled = compile_portfolio(self.debts)
+        start_date = self.start_date or datetime.now()
+        ids = compiled.ids
+        balances = [debt.principal for debt in self.debts]
+        monthly_rates = compiled.monthly_rates
+        min_payments = compiled.min_payments
+        aprs = compiled.aprs
+        compounding = compiled.compounding
+        daily = compiled.daily
+        weekly = compiled.weekly
+        weekly_min_payments = compiled.weekly_min_payments
+        rank = compiled.avalanche_rank
+        active = list(compiled.active)
+        # Monthly rates with the daily-compounding debts' rates filled in, by month length
+        rate_tables = {}
+        # Minimum payments with the weekly-paid debts' monthly dues filled in, by payday count
+        due_tables = {}
+        
+        total_interest_paid = Decimal('0')
+        total_payments_made = Decimal('0')
+        total_available_payment = compiled.total_min_payments + extra_payment
+        months = 0
+        
+        schedule_events = schedule.boundaries if schedule else []
+        pending_arrivals = schedule.arrival_count if schedule else 0
+        next_event = 0
+        paused = False
+        allocation = {}
+        
+        profiler = self.profiler
+        if profiler:
+            profiler.count('simulations')
+        
+        for month in range(1, max_months + 1):
+            bonus = Decimal('0')
+            if next_event < len(schedule_events) and schedule_events[next_event][0] == month:
+                if any(event['type'] in ('rate_change', 'new_debt') for event in schedule_events[next_event][1]):
+                    ids, monthly_rates, min_payments, aprs = list(ids), list(monthly_rates), list(min_payments), list(aprs)
+                    compounding, daily, weekly = list(compounding), list(daily), list(weekly)
+                    rate_tables, due_tables = {}, {}
+                for event in schedule_events[next_event][1]:
+                    if event['type'] == 'extra_payment':
+                        extra_payment = event['amount']
+                    elif event['type'] == 'allocation':
+                        allocation = event['allocation']
+                    elif event['type'] == 'bonus':
+                        bonus += event['amount']
+                    elif event['type'] == 'pause':
+                        paused = event['paused']
+                    elif event['type'] == 'rate_change':
+                        for i in range(len(ids)):
+                            if ids[i] == event['debt_id']:
+                                aprs[i] = event['apr']
+                                monthly_rates[i] = monthly_rate(event['apr'], compounding[i])
+                    elif event['type'] == 'new_debt':
+                        debt = event['debt']
+                        ids.append(debt.id)
+                        balances.append(debt.principal)
+                        monthly_rates.append(monthly_rate(debt.apr, debt.compounding))
+                        min_payments.append(debt.min_payment)
+                        aprs.append(debt.apr)
+                        compounding.append(debt.compounding)
+                        if debt.compounding == 'daily':
+                            daily.append(len(balances) - 1)
+                        if debt.payment_frequency == 'weekly':
+                            weekly.append(len(balances) - 1)
+                            weekly_min_payments += debt.min_payment
+                        active.append(len(balances) - 1)
+                        pending_arrivals -= 1
+                    if event['type'] in ('rate_change', 'new_debt'):
+                        order = sorted(range(len(aprs)), key=lambda i: aprs[i], reverse=True)
+                        rank = [0] * len(order)
+                        for position, i in enumerate(order):
+                            rank[i] = position
+                total_available_payment = sum(min_payments) + extra_payment
+                next_event += 1
+            
+            if not active and not pending_arrivals:
+                break
+            months = month
+            
+            if profiler:
+                profiler.count('months_simulated')
+                profiler.count('interest_applications', len(active))
+                profiler.count('objects_allocated')  # the active list rebuilt after minimum payments
+                started = profiler.clock()
+            
+            # Step 0: Apply monthly interest to all active debts
+            rates = monthly_rates
+            dues = min_payments
+            month_available_payment = total_available_payment
+            credits = None
+            if daily or weekly:
+                days, first_payday, paydays = month_calendar(start_date, month)
+            if daily:
+                rates = rate_tables.get(days)
+                if rates is None:
+                    rates = rate_tables[days] = list(monthly_rates)
+                    for i in daily:
+                        rates[i] = daily_compounded_rate(aprs[i], days)
+            if weekly:
+                # Weekly-paid debts owe their minimum on each payday, and their payments
+                # during the month save interest (weekly_payment_credit)
+                dues = due_tables.get(paydays)
+                if dues is None:
+                    dues = due_tables[paydays] = list(min_payments)
+                    for i in weekly:
+                        dues[i] = min_payments[i] * paydays
+                month_available_payment += weekly_min_payments * (paydays - 1)
+                if not paused:
+                    current = set(active)
+                    credits = {
+                        i: weekly_payment_credit(aprs[i], compounding[i], days, first_payday, min_payments[i], balances[i])
+                        for i in weekly if i in current
+                    }
+            for i in active:
+                monthly_interest = balances[i] * rates[i]
+                if credits and i in credits:
+                    monthly_interest -= credits[i]
+                balances[i] += monthly_interest
+                total_interest_paid += monthly_interest
+            
+            if profiler:
+                started = profiler.lap('interest', started)
+            
+            # Step 1: Apply minimum payments to all active debts
+            payments_this_month = Decimal('0')
+            if not paused:
+                for i in active:
+                    if dues[i] >= balances[i]:
+                        balances[i] = Decimal('0')
+                    else:
+                        balances[i] -= dues[i]
+                    payments_this_month += dues[i]
+                active = [i for i in active if balances[i] > 0]
+            
+            if profiler:
+                started = profiler.lap('minimum_payments', started)
+                iterations_before = profiler.counters['reallocation_iterations']
+            
+            # Step 2: Reallocate freed payments and extra payment
+            remaining_payment = Decimal('0') if paused else month_available_payment - payments_this_month
+            if allocation and remaining_payment > 0:
+                for i in list(active):
+                    amount = allocation.get(ids[i])
+                    if not amount or remaining_payment <= 0:
+                        continue
+                    payment = min(amount, remaining_payment, balances[i])
+                    balances[i] -= payment
+                    remaining_payment -= payment
+                    payments_this_month += payment
+                    if balances[i] <= 0:
+                        active.remove(i)
+            while remaining_payment > 0 and active:
+                if strategy == 'snowball':
+                    target = min(active, key=lambda i: balances[i])
+                else:
+                    target = min(active, key=rank.__getitem__)
+                if profiler:
+                    # Picking the target scans the active debts in place of a re-sort
+                    profiler.count('reallocation_iterations')
+                    profiler.count('priority_sorts')
+                
+                payments_this_month += remaining_payment
+                if remaining_payment >= balances[target]:
+                    balances[target] = Decimal('0')
+                    active.remove(target)
+                    remaining_payment = dues[target]
+                else:
+                    balances[target] -= remaining_payment
+                    remaining_payment = Decimal('0')
+            
+            # Step 3: Cascade any one-off bonus through the strategy order
+            while bonus > 0 and active:
+                if strategy == 'snowball':
+                    target = min(active, key=lambda i: balances[i])
+                else:
+                    target = min(active, key=rank.__getitem__)
+                
+                payment = min(bonus, balances[target])
+                balances[target] -= payment
+                bonus -= payment
+                payments_this_month += payment
+                if balances[target] <= 0:
+                    active.remove(target)
+            
+            total_payments_made += payments_this_month
+            if profiler:
+                profiler.lap('reallocation', started)
+                profiler.peak('reallocation_iterations',
+                              profiler.counters['reallocation_iterations'] - iterations_before)
+        
+        if profiler:
+            started = profiler.clock()
+        final_total_balance = sum(balances[i] for i in active)
+        debt_free_date = None
+        if not active and not pending_arrivals and months > 0:
+            debt_free_date = month_date(start_date, months).strftime('%Y-%m-%d')
+        
+        if profiler:
+            profiler.lap('summary', started)
+        
+        return {
+            'total_interest_paid': float(total_interest_paid),
+            'total_payments_made': float(total_payments_made),
+            'months_to_zero': months,
+            'debt_free_date': debt_free_date,
+            'final_total_balance': float(final_total_balance)
+        }
@@ -8,6 +8,8 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Tuple
 import json
 
+from .compiled_portfolio import compile_portfolio, daily_compounded_rate
+
 
 class Debt:
     """Represents a single debt with all necessary attributes."""
@@ -30,16 +32,20 @@ class Debt:
     def calculate_monthly_interest(self) -> Decimal:
         """Calculate interest for one month based on compounding frequency."""
         if self.compounding == 'daily':
-            # Daily compounding: (1 + apr/365)^30 - 1
-            daily_rate = self.apr / Decimal('365')
-            monthly_multiplier = (Decimal('1') + daily_rate) ** Decimal('30')
-            return self.principal * (monthly_multiplier - Decimal('1'))
+            # Daily compounding: (1 + apr/365)^30 - 1, computed once per APR
+            return self.principal * daily_compounded_rate(self.apr, 30)
         elif self.compounding == 'monthly':
             # Monthly compounding: apr/12
             return self.principal * (self.apr / Decimal('12'))
         else:  # none
             return Decimal('0')
     
+    def monthly_payment(self) -> Decimal:
+        """Minimum paid per simulated month; weekly payments average 52/12 a month."""
+        if self.payment_frequency == 'weekly':
+            return self.min_payment * Decimal('52') / Decimal('12')
+        return self.min_payment
+    
     def apply_payment(self, payment_amount: Decimal) -> Dict[str, Any]:
         """Apply payment to debt and return payment breakdown."""
         if self.status != 'active':
@@ -101,6 +107,8 @@ class SimulationEngine:
         total_interest_paid = Decimal('0')
         total_payments_made = Decimal('0')
         available_extra = extra_payment
+        # sqrt(apr) for the hybrid score, computed once per portfolio rather than per month
+        apr_roots = dict(zip((d.id for d in debts), compile_portfolio(debts).apr_roots)) if strategy == 'hybrid' else None
         
         for month in range(self.max_horizon_months):
             month_data = {
@@ -122,12 +130,13 @@ class SimulationEngine:
             for debt in working_debts:
                 if debt.status == 'active':
                     # Apply minimum payment (this handles interest calculation and application)
-                    payment_result = debt.apply_payment(debt.min_payment)
+                    min_payment_due = debt.monthly_payment()
+                    payment_result = debt.apply_payment(min_payment_due)
                     
                     # Track interest and payments
                     month_data['interest_this_month'] += payment_result['interest_payment']
-                    month_data['payments_this_month'] += debt.min_payment
-                    total_payments_made += debt.min_payment
+                    month_data['payments_this_month'] += min_payment_due
+                    total_payments_made += min_payment_due
                     debt.total_interest_paid += payment_result['interest_payment']
                     total_interest_paid += payment_result['interest_payment']
                     
@@ -137,7 +146,7 @@ class SimulationEngine:
                         'name': debt.name,
                         'balance': debt.principal,
                         'interest_paid': payment_result['interest_payment'],
-                        'payment_made': debt.min_payment,
+                        'payment_made': min_payment_due,
                         'status': debt.status
                     }
                     month_data['debts'].append(debt_data)
@@ -145,11 +154,11 @@ class SimulationEngine:
                     if payment_result['paid_off']:
                         month_data['paid_off_this_month'].append(debt.name)
                         # Add freed payment to available extra
-                        available_extra += debt.min_payment
+                        available_extra += min_payment_due
             
             # Apply extra payment according to strategy
             while available_extra > 0:
-                target_debt = self._get_target_debt(working_debts, strategy)
+                target_debt = self._get_target_debt(working_debts, strategy, apr_roots)
                 if not target_debt:
                     break
                     
@@ -168,7 +177,7 @@ class SimulationEngine:
                 if extra_result['paid_off']:
                     month_data['paid_off_this_month'].append(target_debt.name)
                     # Add freed payment to available extra for next iteration
-                    available_extra = target_debt.min_payment
+                    available_extra = target_debt.monthly_payment()
                 else:
                     available_extra = Decimal('0')
             
@@ -208,7 +217,7 @@ class SimulationEngine:
             ]
         }
     
-    def _get_target_debt(self, debts: List[Debt], strategy: str) -> Debt:
+    def _get_target_debt(self, debts: List[Debt], strategy: str, apr_roots: Dict[Any, Decimal] = None) -> Debt:
         """Get the target debt for extra payment based on strategy."""
         active_debts = [d for d in debts if d.status == 'active']
         if not active_debts:
@@ -222,7 +231,7 @@ class SimulationEngine:
             return min(active_debts, key=lambda d: d.principal)
         elif strategy == 'hybrid':
             # APR-adjusted balance heuristic: balance / sqrt(apr)
-            return min(active_debts, key=lambda d: d.principal / (d.apr ** Decimal('0.5')))
+            return min(active_debts, key=lambda d: d.principal / apr_roots[d.id])
         else:
             return active_debts[0]  # Default to first debt
     
@@ -6,6 +6,7 @@ Psychological strategy - targets smallest balance first for quick wins.
 from decimal import Decimal
 from typing import List, Dict, Any
 from .simulation_engine import SimulationEngine, Debt
+from .tracing import traced
 
 
 class SnowballStrategy:
@@ -14,6 +15,7 @@ class SnowballStrategy:
     def __init__(self):
         self.simulation_engine = SimulationEngine()
     
+    @traced('strategy.snowball')
     def calculate_strategy(self, debts: List[Debt], extra_payment: Decimal = Decimal('0')) -> Dict[str, Any]:
         """Calculate snowball strategy results."""
         return self.simulation_engine.run_simulation(debts, extra_payment, 'snowball')
@@ -0,0 +1,128 @@
+"""
+Stack Sampler
+Opt-in sampling profiler for request threads, exported as collapsed stacks.
+
+While running, a background thread wakes every `interval` seconds, reads the
+current frame of each thread that is serving a request and counts its stack.
+Nothing is traced or hooked, so the request threads themselves only pay for
+registering and unregistering (a set add and discard); the sampler's own
+time is reported as `sampling_seconds` so its overhead stays visible.
+
+`collapsed()` returns one `frame;frame;...;leaf count` line per distinct
+stack, the input format of flamegraph.pl, speedscope and inferno. With
+`lines` on, each frame carries its line number, which separates hot spots
+that live inside one function (a Decimal `**` in a loop, say).
+"""
+
+from collections import Counter
+from typing import Dict, Any, Optional
+import os
+import sys
+import threading
+import time
+
+
+class StackSampler:
+    """Background sampler of the registered request threads."""
+    
+    def __init__(self, interval: float = 0.01, max_depth: int = 96, max_stacks: int = 20000):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.max_stacks = max_stacks
+        self.lines = False
+        self._tracked = set()
+        self._stacks = Counter()
+        self._lock = threading.Lock()
+        # Serialises start/stop, which join the sampling thread outside _lock
+        self._control = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._samples = 0
+        self._sampling_seconds = 0.0
+        self._dropped = 0
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+    
+    def start(self, interval: Optional[float] = None, lines: Optional[bool] = None):
+        """Start sampling (or change the interval and line mode of a running sampler)."""
+        with self._control:
+            if interval is not None:
+                self.interval = interval
+            if lines is not None:
+                self.lines = lines
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        """Stop sampling; the collected stacks are kept until reset()."""
+        with self._control:
+            if self._thread is None:
+                return
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+    
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self._samples = 0
+            self._sampling_seconds = 0.0
+            self._dropped = 0
+    
+    def track(self):
+        """Register the calling thread as serving a request."""
+        self._tracked.add(threading.get_ident())
+    
+    def untrack(self):
+        self._tracked.discard(threading.get_ident())
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            started = time.perf_counter()
+            frames = sys._current_frames()
+            stacks = [self._collapse(frames[ident]) for ident in tuple(self._tracked) if ident in frames]
+            
+            with self._lock:
+                for stack in stacks:
+                    if stack in self._stacks or len(self._stacks) < self.max_stacks:
+                        self._stacks[stack] += 1
+                    else:
+                        self._dropped += 1
+                self._samples += 1
+                self._sampling_seconds += time.perf_counter() - started
+    
+    def _collapse(self, frame) -> str:
+        """Root-to-leaf frame labels of a stack, joined by ';'."""
+        labels = []
+        while frame is not None and len(labels) < self.max_depth:
+            code = frame.f_code
+            name = getattr(code, 'co_qualname', code.co_name)
+            filename = os.path.basename(code.co_filename)
+            labels.append(f'{filename}:{name}:{frame.f_lineno}' if self.lines else f'{filename}:{name}')
+            frame = frame.f_back
+        return ';'.join(reversed(labels)).replace(' ', '_')
+    
+    def collapsed(self) -> str:
+        """Collected stacks in collapsed-stack format, most frequent first."""
+        with self._lock:
+            stacks = self._stacks.most_common()
+        return ''.join(f'{stack} {count}\n' for stack, count in stacks)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'running': self._thread is not None,
+                'interval_ms': round(self.interval * 1000, 3),
+                'lines': self.lines,
+                'samples': self._samples,
+                'stacks': len(self._stacks),
+                'stack_samples': sum(self._stacks.values()),
+                'dropped_samples': self._dropped,
+                'tracked_threads': len(self._tracked),
+                'sampling_seconds': round(self._sampling_seconds, 4)
+            }
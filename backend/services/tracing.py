@@ -0,0 +1,226 @@
+"""
+Tracing
+Per-request trace spans exported as OpenTelemetry JSON lines.
+
+A sampled request gets a root span; the repository, SQL, simulation and
+serialization code open child spans under whatever span is current, so a
+compare or scenario request shows each simulation it fans out into. Each
+finished trace is written as one line in the OTLP/JSON `resourceSpans`
+shape (what the OpenTelemetry Collector's file exporter writes and its
+otlpjsonfile receiver reads) to a size-rotated local file.
+
+Tracing is off until `tracer.configure()` is called. When a request is not
+sampled, or tracing is off, `tracer.span()` and `@traced` cost one context
+variable lookup. An incoming W3C `traceparent` header continues the
+caller's trace and keeps its sampling decision.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Dict, Any, Optional
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import random
+import re
+import threading
+import time
+
+
+# OTLP span kinds
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+STATUS_OK, STATUS_ERROR = 1, 2
+
+TRACEPARENT_PATTERN = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+_current = ContextVar('current_span', default=None)
+
+
+class Span:
+    """One timed operation within a trace."""
+    
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'kind', 'start', 'end', 'attributes', 'error', 'token')
+    
+    def __init__(self, trace: 'Trace', name: str, parent_id: Optional[str], kind: int, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.error = None
+        self.token = None
+        self.start = time.time_ns()
+        self.end = None
+    
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+    
+    def to_dict(self) -> Dict[str, Any]:
+        span = {
+            'traceId': self.trace.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start),
+            'endTimeUnixNano': str(self.end or self.start),
+            'attributes': [{'key': key, 'value': _any_value(value)} for key, value in self.attributes.items()],
+            'status': {'code': STATUS_ERROR, 'message': self.error} if self.error else {'code': STATUS_OK}
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+
+class Trace:
+    """Finished spans of one request, exported together when its root span ends."""
+    
+    def __init__(self, trace_id: str, max_spans: int):
+        self.trace_id = trace_id
+        self.max_spans = max_spans
+        self.spans = []
+        self.dropped = 0
+    
+    def add(self, span: Span):
+        if len(self.spans) < self.max_spans:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+
+class RotatingFileExporter:
+    """Writes each trace as one OTLP/JSON line to a file rotated by size."""
+    
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backups: int = 5,
+                 service_name: str = 'financial-freedom-api'):
+        self.service_name = service_name
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                             encoding='utf-8')
+        self._lock = threading.Lock()
+    
+    def export(self, spans: List[Span]):
+        line = json.dumps({
+            'resourceSpans': [{
+                'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': self.service_name}}]},
+                'scopeSpans': [{
+                    'scope': {'name': 'financial-freedom'},
+                    'spans': [span.to_dict() for span in spans]
+                }]
+            }]
+        }, separators=(',', ':'), default=str)
+        record = logging.LogRecord('tracing', logging.INFO, __file__, 0, line, None, None)
+        with self._lock:
+            self._handler.emit(record)
+
+
+class Tracer:
+    """Starts traces for sampled requests and opens spans under the current one."""
+    
+    def __init__(self):
+        self.exporter = None
+        self.sample_rate = 0.0
+        self.max_spans = 5000
+    
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+    
+    def configure(self, exporter: Any, sample_rate: float = 1.0, max_spans: int = 5000):
+        """Turn tracing on; `sample_rate` is the share of new traces recorded (0 to 1)."""
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.max_spans = max_spans
+    
+    def start_trace(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+                    traceparent: Optional[str] = None) -> Optional[Span]:
+        """Open the root span of a request, or return None if it is not sampled."""
+        if self.exporter is None:
+            return None
+        
+        match = TRACEPARENT_PATTERN.match(traceparent or '')
+        if match:
+            if not int(match.group(3), 16) & 1:
+                return None
+            trace_id, parent_id = match.group(1), match.group(2)
+        else:
+            if random.random() >= self.sample_rate:
+                return None
+            trace_id, parent_id = os.urandom(16).hex(), None
+        
+        span = Span(Trace(trace_id, self.max_spans), name, parent_id, SERVER, dict(attributes or {}))
+        span.token = _current.set(span)
+        return span
+    
+    def end_trace(self, span: Optional[Span], error: Optional[BaseException] = None):
+        """Close a root span and export its trace."""
+        if span is None:
+            return
+        try:
+            _current.reset(span.token)
+        except ValueError:
+            # Ended from another context than it started in
+            _current.set(None)
+        if error is not None:
+            span.error = str(error) or type(error).__name__
+        span.end = time.time_ns()
+        span.trace.add(span)
+        if span.trace.dropped:
+            span.attributes['trace.dropped_spans'] = span.trace.dropped
+        try:
+            self.exporter.export(span.trace.spans)
+        except Exception as e:
+            print(f"Trace export error: {e}")
+    
+    def current(self) -> Optional[Span]:
+        return _current.get()
+    
+    @contextmanager
+    def span(self, name: str, kind: int = INTERNAL, **attributes):
+        """Child span of the current one; yields None (and records nothing) outside a sampled trace."""
+        parent = _current.get()
+        if parent is None:
+            yield None
+            return
+        
+        span = Span(parent.trace, name, parent.span_id, kind, attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = str(e) or type(e).__name__
+            raise
+        finally:
+            _current.reset(token)
+            span.end = time.time_ns()
+            parent.trace.add(span)
+
+
+tracer = Tracer()
+
+
+def traced(name: str):
+    """Decorator that runs the function in a span named `name`."""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return function(*args, **kwargs)
+            with tracer.span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _any_value(value: Any) -> Dict[str, Any]:
+    """OTLP AnyValue for an attribute (int64 as a string, as proto3 JSON requires)."""
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
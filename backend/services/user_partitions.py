@@ -0,0 +1,59 @@
+"""
+User Partitions
+Per-user caches, kept in a bounded LRU.
+
+Each user's cached state (the last portfolio read, served while the database
+is unavailable) lives in its own partition, so households never see each
+other's entries; the least recently used partitions are dropped once the
+limit is reached and rebuilt on the user's next request.
+
+Partitions are shared by all of a user's concurrent requests, so they must
+not hold per-request working state such as a simulation engine's portfolio.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+import threading
+
+
+class UserPartitions:
+    """Bounded LRU of per-user cache instances."""
+    
+    def __init__(self, factory: Callable[[], Any], max_users: int = 1024):
+        self.factory = factory
+        self.max_users = max_users
+        self._partitions = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+    
+    def get(self, user_id: int) -> Any:
+        """Return the user's instance, creating it on first use."""
+        with self._lock:
+            instance = self._partitions.get(user_id)
+            if instance is not None:
+                self._partitions.move_to_end(user_id)
+                self._hits += 1
+                return instance
+            
+            self._misses += 1
+            instance = self.factory()
+            self._partitions[user_id] = instance
+            if len(self._partitions) > self.max_users:
+                self._partitions.popitem(last=False)
+            return instance
+    
+    def evict(self, user_id: int):
+        """Drop a user's instance (e.g. after their data changed wholesale)."""
+        with self._lock:
+            self._partitions.pop(user_id, None)
+    
+    def stats(self) -> Dict[str, int]:
+        """Partition count and hit/miss counters."""
+        with self._lock:
+            return {
+                'partitions': len(self._partitions),
+                'max_users': self.max_users,
+                'hits': self._hits,
+                'misses': self._misses
+            }
@@ -0,0 +1,23 @@
+"""
+Shared setup for the backend tests.
+
+The tests import `services` and `app` from backend/, and run the app against
+the in-memory repository so no database is needed.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('REPOSITORY', 'memory')
+os.environ.setdefault('TRUST_USER_HEADER', '1')
+
+
+@pytest.fixture(scope='session')
+def client():
+    """Flask test client over the in-memory repository."""
+    import app
+    return app.app.test_client()
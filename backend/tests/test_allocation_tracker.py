@@ -0,0 +1,115 @@
+"""Per-endpoint allocation tracking and the limits that switch it off by itself."""
+
+import time
+
+import pytest
+
+import app as api
+from services.allocation_tracker import AllocationTracker
+
+
+TOKEN = 'test-admin-token'
+
+
+@pytest.fixture
+def tracker():
+    messages = []
+    allocation_tracker = AllocationTracker(budget_bytes=1024, log=messages.append)
+    allocation_tracker.messages = messages
+    yield allocation_tracker
+    allocation_tracker.stop()
+
+
+def traced_request(tracker, endpoint, payload):
+    assert tracker.begin()
+    tracker.capture(payload)
+    tracker.end(endpoint)
+
+
+def test_records_peaks_and_payload_structures(tracker):
+    tracker.start()
+    payload = {'simulation_results': [{'debts': [{'balance': str(i)} for i in range(50)]} for _ in range(20)]}
+    traced_request(tracker, 'POST /api/calculate/simulate', payload)
+    traced_request(tracker, 'GET /api/debts', [])
+    
+    report = tracker.report()
+    assert report['traced_requests'] == 2
+    assert list(report['endpoints'])[0] == 'POST /api/calculate/simulate'
+    simulate = report['endpoints']['POST /api/calculate/simulate']
+    assert simulate['requests'] == 1
+    assert simulate['over_budget'] == 1
+    worst = simulate['worst_request']
+    paths = {item['path']: item['count'] for item in worst['structures']}
+    assert paths['$.simulation_results[].debts[].balance'] == 1000
+    assert not worst['payload_truncated']
+    assert any('Memory budget exceeded: POST /api/calculate/simulate' in message for message in tracker.messages)
+
+
+def test_nothing_is_traced_while_off(tracker):
+    assert not tracker.begin()
+    assert tracker.report()['traced_requests'] == 0
+
+
+def test_stops_after_max_requests(tracker):
+    tracker.start(max_requests=2)
+    traced_request(tracker, 'GET /api/debts', [])
+    traced_request(tracker, 'GET /api/debts', [])
+    assert not tracker.begin()
+    assert not tracker.enabled
+    assert tracker.report()['endpoints']['GET /api/debts']['requests'] == 2
+    assert 'stopped after 2 requests' in tracker.messages[-1]
+
+
+def test_stops_after_max_seconds(tracker):
+    tracker.start(max_seconds=0.01)
+    time.sleep(0.02)
+    assert not tracker.begin()
+    assert not tracker.enabled
+
+
+def test_restarting_restores_default_limits(tracker):
+    tracker.start(max_requests=2, max_seconds=5)
+    tracker.start()
+    assert (tracker.max_requests, tracker.max_seconds) == (1000, 600)
+
+
+@pytest.fixture
+def admin(monkeypatch):
+    monkeypatch.setattr(api, 'ADMIN_TOKEN', TOKEN)
+    yield {'X-Admin-Token': TOKEN}
+    api.allocation_tracker.stop()
+    api.allocation_tracker.reset()
+
+
+@pytest.mark.parametrize('body', [
+    {'enabled': True, 'budget_mb': 0},
+    {'enabled': True, 'frames': 26},
+    {'enabled': True, 'max_requests': 0},
+    {'enabled': True, 'max_requests': 1.5},
+    {'enabled': True, 'max_seconds': 0},
+    {'enabled': True, 'max_seconds': 86401},
+])
+def test_invalid_settings_are_rejected(client, admin, body):
+    assert client.post('/api/admin/allocations', headers=admin, json=body).status_code == 400
+    assert not api.allocation_tracker.enabled
+
+
+def test_endpoint_tracking_stops_after_max_requests(client, admin):
+    started = client.post('/api/admin/allocations', headers=admin,
+                          json={'enabled': True, 'max_requests': 3, 'budget_mb': 100}).get_json()
+    assert started['enabled'] and started['max_requests'] == 3
+    assert 'endpoints' not in started
+    
+    body = {'extra_payment': 100, 'debts': [
+        {'id': 1, 'name': 'Card', 'principal': 5000, 'apr': 19.9, 'min_payment': 150}
+    ]}
+    for _ in range(3):
+        assert client.post('/api/calculate/compare', headers={'X-User-Id': '971'}, json=body).status_code == 200
+    
+    report = client.get('/api/admin/allocations', headers=admin).get_json()
+    assert not report['enabled']
+    assert report['traced_requests'] == 3
+    compare = report['endpoints']['POST /api/calculate/compare']
+    assert compare['requests'] == 3
+    assert compare['over_budget'] == 0
+    assert compare['worst_request']['payload_bytes'] > 0
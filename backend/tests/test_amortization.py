@@ -0,0 +1,74 @@
+"""
+DebtAmortization against the engine: a lone debt paying its minimum with no
+extra payment follows exactly the schedule the engine simulates.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from services.amortization import DebtAmortization
+from services.simple_simulation_engine import SimpleSimulationEngine, SimpleDebt
+
+
+START = datetime(2025, 5, 20)
+TOLERANCE = Decimal('0.000001')
+
+
+def engine_months(debt):
+    engine = SimpleSimulationEngine(start_date=START)
+    engine.debts = [debt]
+    result = engine.simulate_avalanche(Decimal('0'))
+    return [month['debts'][0] for month in result['simulation_results']]
+
+
+@pytest.mark.parametrize('debt', [
+    SimpleDebt(1, 'Credit Card', Decimal('15000'), Decimal('0.185'), Decimal('300')),
+    SimpleDebt(2, 'Car Loan', Decimal('45000'), Decimal('0.0875'), Decimal('650')),
+    SimpleDebt(3, 'Family Loan', Decimal('6000'), Decimal('0.05'), Decimal('250'), 'none'),
+    SimpleDebt(4, 'Overdraft', Decimal('9000'), Decimal('0.21'), Decimal('400'), 'daily'),
+    SimpleDebt(5, 'Store Account', Decimal('4000'), Decimal('0.21'), Decimal('45'), 'monthly', 'weekly'),
+    SimpleDebt(6, 'Payday Loan', Decimal('3000'), Decimal('0.29'), Decimal('60'), 'daily', 'weekly'),
+], ids=lambda debt: debt.name)
+def test_schedule_matches_engine(debt):
+    expected = engine_months(debt)
+    amortization = DebtAmortization(debt, start_date=START)
+    rows = list(amortization.schedule())
+    
+    assert amortization.payoff_month == len(expected)
+    assert len(rows) == len(expected)
+    for row, month in zip(rows, expected):
+        assert abs(row['closing_balance'] - month['balance']) < TOLERANCE
+        assert abs(row['interest'] - month['interest_paid']) < TOLERANCE
+        assert abs(amortization.balance_after(row['month']) - max(month['balance'], Decimal('0'))) < TOLERANCE
+
+
+def test_random_access_matches_the_schedule():
+    debt = SimpleDebt(1, 'Car Loan', Decimal('45000'), Decimal('0.0875'), Decimal('650'))
+    amortization = DebtAmortization(debt, start_date=START)
+    rows = {row['month']: row for row in amortization.schedule()}
+    
+    for month in (1, 17, 40, amortization.payoff_month):
+        row = amortization.month(month)
+        assert abs(row['opening_balance'] - rows[month]['opening_balance']) < TOLERANCE
+        assert abs(row['principal'] - rows[month]['principal']) < TOLERANCE
+    assert amortization.month(amortization.payoff_month + 1) is None
+    assert amortization.balance_after(amortization.payoff_month) == 0
+    # Paging from a later month jumps straight there
+    assert next(amortization.schedule(40))['month'] == 40
+
+
+def test_payment_below_interest_never_pays_off():
+    debt = SimpleDebt(1, 'Loan', Decimal('50000'), Decimal('0.24'), Decimal('500'))
+    amortization = DebtAmortization(debt, start_date=START, max_months=120)
+    assert amortization.payoff_month is None
+    assert amortization.balance_after(120) > debt.principal
+
+
+def test_month_labels_follow_the_calendar():
+    debt = SimpleDebt(1, 'Loan', Decimal('1000'), Decimal('0.1'), Decimal('100'))
+    amortization = DebtAmortization(debt, start_date=START)
+    assert amortization.month_label(1) == '2025-05'
+    assert amortization.month_label(9) == '2026-01'
+    assert amortization.month_number('2026-01') == 9
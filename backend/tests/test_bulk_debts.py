@@ -0,0 +1,79 @@
+"""Bulk debt create, update and delete: all or nothing, per user."""
+
+import app as api
+
+
+def as_user(user_id):
+    return {'X-User-Id': str(user_id)}
+
+
+def debt(name, principal=1000):
+    return {'name': name, 'principal': principal, 'apr': 12, 'min_payment': 50}
+
+
+def names(client, user_id):
+    return sorted(d['name'] for d in client.get('/api/debts', headers=as_user(user_id)).get_json()['debts'])
+
+
+def test_create_returns_ids_in_request_order(client):
+    response = client.post('/api/debts/bulk', headers=as_user(701), json={'debts': [debt('A'), debt('B'), debt('C')]})
+    assert response.status_code == 201
+    results = response.get_json()['results']
+    assert [result['index'] for result in results] == [0, 1, 2]
+    for result, name in zip(results, 'ABC'):
+        assert client.get(f"/api/debts/{result['debt_id']}", headers=as_user(701)).get_json()['debt']['name'] == name
+
+
+def test_one_invalid_item_creates_nothing(client):
+    response = client.post('/api/debts/bulk', headers=as_user(702),
+                           json={'debts': [debt('A'), {'name': 'B', 'principal': -5, 'apr': 12, 'min_payment': 50}]})
+    assert response.status_code == 400
+    assert [result['status'] for result in response.get_json()['results']] == ['valid', 'invalid']
+    assert names(client, 702) == []
+
+
+def test_request_shape_and_size_are_checked(client):
+    assert client.post('/api/debts/bulk', headers=as_user(703), json={'debts': []}).status_code == 400
+    too_many = [debt(f'D{i}') for i in range(api.MAX_BULK_ITEMS + 1)]
+    assert client.post('/api/debts/bulk', headers=as_user(703), json={'debts': too_many}).status_code == 400
+    assert client.delete('/api/debts/bulk', headers=as_user(703), json={'ids': ['1']}).status_code == 400
+    assert names(client, 703) == []
+
+
+def test_update_changes_nothing_unless_every_debt_is_owned(client):
+    ids = [r['debt_id'] for r in client.post('/api/debts/bulk', headers=as_user(711),
+                                             json={'debts': [debt('A'), debt('B')]}).get_json()['results']]
+    theirs = client.post('/api/debts', headers=as_user(712), json=debt('X')).get_json()['debt_id']
+    
+    response = client.put('/api/debts/bulk', headers=as_user(711), json={'debts': [
+        {'id': ids[0], 'principal': 1}, {'id': theirs, 'principal': 1}
+    ]})
+    assert response.status_code == 400
+    assert [result['status'] for result in response.get_json()['results']] == ['valid', 'invalid']
+    assert client.get(f'/api/debts/{ids[0]}', headers=as_user(711)).get_json()['debt']['principal'] == 1000
+    assert client.get(f'/api/debts/{theirs}', headers=as_user(712)).get_json()['debt']['principal'] == 1000
+    
+    response = client.put('/api/debts/bulk', headers=as_user(711), json={'debts': [
+        {'id': ids[0], 'principal': 1}, {'id': ids[1], 'name': 'Renamed'}
+    ]})
+    assert response.status_code == 200
+    assert names(client, 711) == ['A', 'Renamed']
+
+
+def test_update_rejects_repeated_and_empty_items(client):
+    debt_id = client.post('/api/debts', headers=as_user(713), json=debt('A')).get_json()['debt_id']
+    repeated = {'debts': [{'id': debt_id, 'principal': 1}, {'id': debt_id, 'principal': 2}]}
+    assert client.put('/api/debts/bulk', headers=as_user(713), json=repeated).status_code == 400
+    assert client.put('/api/debts/bulk', headers=as_user(713), json={'debts': [{'id': debt_id}]}).status_code == 400
+
+
+def test_delete_reports_each_id(client):
+    ids = [r['debt_id'] for r in client.post('/api/debts/bulk', headers=as_user(721),
+                                             json={'debts': [debt('A'), debt('B')]}).get_json()['results']]
+    theirs = client.post('/api/debts', headers=as_user(722), json=debt('X')).get_json()['debt_id']
+    
+    response = client.delete('/api/debts/bulk', headers=as_user(721), json={'ids': [ids[0], theirs]})
+    assert response.status_code == 200
+    assert [result['status'] for result in response.get_json()['results']] == ['deleted', 'not_found']
+    assert names(client, 721) == ['B']
+    assert names(client, 722) == ['X']
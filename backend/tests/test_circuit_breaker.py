@@ -0,0 +1,83 @@
+"""CircuitBreaker state transitions, driven by a fake clock."""
+
+from services.circuit_breaker import CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def make_breaker():
+    clock = FakeClock()
+    return CircuitBreaker(failure_threshold=3, reset_timeout=30.0, clock=clock), clock
+
+
+def test_opens_after_threshold_consecutive_failures():
+    breaker, _ = make_breaker()
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.stats()['rejected_calls'] == 1
+
+
+def test_success_resets_the_failure_count():
+    breaker, _ = make_breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()['consecutive_failures'] == 1
+
+
+def test_half_open_allows_a_single_trial_call():
+    breaker, clock = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    
+    clock.now = 29.9
+    assert not breaker.allow()
+    assert breaker.stats()['retry_in_seconds'] == 0.1
+    
+    clock.now = 30.0
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one trial at a time
+    assert not breaker.allow()
+
+
+def test_successful_trial_closes_the_breaker():
+    breaker, clock = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 30.0
+    assert breaker.allow()
+    
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+    assert breaker.stats()['consecutive_failures'] == 0
+
+
+def test_failed_trial_reopens_for_another_period():
+    breaker, clock = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 30.0
+    assert breaker.allow()
+    
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now = 59.0
+    assert not breaker.allow()
+    clock.now = 60.0
+    assert breaker.allow()
@@ -0,0 +1,93 @@
+"""Commitment histories resolved into extra-payment changes by plan month."""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from services.commitment_timeline import CommitmentTimeline
+from services.payment_schedule import PaymentSchedule
+from services.plan_trajectory import add_months
+from services.simple_simulation_engine import SimpleSimulationEngine, SimpleDebt
+
+
+START = datetime(2026, 3, 10)
+
+
+def commitment(commitment_id, amount, created_at, starts_on=None, strategy='avalanche', custom_alloc=None):
+    return {'id': commitment_id, 'amount': amount, 'strategy': strategy, 'custom_alloc': custom_alloc,
+            'starts_on': starts_on, 'created_at': created_at}
+
+
+def as_user(user_id):
+    return {'X-User-Id': str(user_id)}
+
+
+def test_history_resolves_into_changes_by_month():
+    timeline = CommitmentTimeline([
+        commitment(1, 200, datetime(2025, 6, 1)),
+        commitment(2, 300, datetime(2025, 9, 1)),
+        commitment(3, 800, datetime(2025, 9, 2), starts_on=date(2026, 8, 1), custom_alloc={'2': 100}),
+        # Repeats the terms already in effect, so no change is listed
+        commitment(4, 300, datetime(2025, 10, 1), starts_on=date(2026, 5, 1)),
+    ], START)
+    
+    assert [(c['month'], c['extra_payment']) for c in timeline.changes] == [(1, 300), (6, 800)]
+    assert timeline.changes[-1]['allocation'] == {'2': Decimal('100')}
+    assert timeline.strategy == 'avalanche' and timeline.strategy_switch is None
+
+
+def test_latest_commitment_in_a_month_wins_and_unknown_strategies_are_avalanche():
+    timeline = CommitmentTimeline([
+        commitment(1, 200, datetime(2026, 1, 1), strategy='hybrid'),
+        commitment(2, 400, datetime(2026, 1, 1)),
+    ], START)
+    assert [(c['month'], c['extra_payment'], c['strategy']) for c in timeline.changes] == [(1, 400, 'avalanche')]
+
+
+def test_strategy_switch_is_reported():
+    timeline = CommitmentTimeline([
+        commitment(1, 200, datetime(2026, 1, 1), strategy='snowball'),
+        commitment(2, 400, datetime(2026, 1, 2), starts_on=date(2026, 7, 1)),
+    ], START)
+    assert timeline.strategy == 'snowball'
+    assert timeline.strategy_switch == 5
+
+
+def test_events_drive_the_simulation():
+    debts = [
+        SimpleDebt(1, 'Card', Decimal('5000'), Decimal('0.2'), Decimal('150')),
+        SimpleDebt(2, 'Loan', Decimal('20000'), Decimal('0.1'), Decimal('400')),
+    ]
+    timeline = CommitmentTimeline([
+        commitment(1, 100, datetime(2026, 1, 1)),
+        commitment(2, 500, datetime(2026, 1, 2), starts_on=date(2026, 6, 1), custom_alloc={'2': 200, '9': 50}),
+    ], START)
+    engine = SimpleSimulationEngine(start_date=START)
+    engine.debts = debts
+    months = engine.simulate_avalanche(schedule=PaymentSchedule.from_request(timeline.events(debts), debts))
+    
+    payments = [month['payments_this_month'] for month in months['simulation_results'][:5]]
+    assert payments == [650, 650, 650, 1050, 1050]
+    # From June the loan gets its minimum plus the 200 allocated to it
+    assert months['simulation_results'][3]['debts'][1]['payment_made'] == 600
+
+
+def test_api_refuses_commitments_that_switch_strategy_later(client):
+    later = add_months(date.today().strftime('%Y-%m'), 4)
+    response = client.post('/api/commitments', headers=as_user(901), json={'amount': 200, 'strategy': 'snowball'})
+    assert response.status_code == 201
+    response = client.post('/api/commitments', headers=as_user(901),
+                           json={'amount': 400, 'strategy': 'avalanche', 'starts_on': later})
+    assert response.status_code == 400
+    assert client.post('/api/commitments', headers=as_user(901),
+                       json={'amount': 400, 'strategy': 'snowball', 'starts_on': later}).status_code == 201
+    
+    timeline = client.get('/api/commitments', headers=as_user(901)).get_json()['timeline']
+    assert timeline['strategy'] == 'snowball'
+    assert [(c['month'], c['extra_payment']) for c in timeline['changes']] == [(1, 200), (5, 400)]
+
+
+def test_api_validates_commitments(client):
+    for body in ({'amount': -1}, {'amount': 100, 'strategy': 'hybrid'}, {'amount': 100, 'starts_on': 'soon'},
+                 {'amount': 100, 'custom_alloc': {'1': 150}}):
+        assert client.post('/api/commitments', headers=as_user(902), json=body).status_code == 400
+    assert client.get('/api/commitments', headers=as_user(902)).get_json()['commitments'] == []
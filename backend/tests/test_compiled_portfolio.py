@@ -0,0 +1,117 @@
+"""The compiled-portfolio cache and the closed forms it serves to the engines and strategies."""
+
+from decimal import Decimal
+
+import pytest
+
+from services.compiled_portfolio import (PortfolioCompiler, daily_compounded_rate, weekly_payment_credit,
+                                         monthly_rate)
+from services.hybrid_strategy import HybridStrategy
+from services.simulation_engine import Debt
+
+
+def portfolio(**overrides):
+    debts = [
+        Debt(1, 'Card', Decimal('4000'), Decimal('0.20'), Decimal('120')),
+        Debt(2, 'Store', Decimal('900'), Decimal('0.25'), Decimal('45'), payment_frequency='weekly'),
+        Debt(3, 'Loan', Decimal('12000'), Decimal('0.20'), Decimal('300'), compounding='daily'),
+        Debt(4, 'Family', Decimal('2000'), Decimal('0.0001'), Decimal('100'), compounding='none'),
+    ]
+    for name, value in overrides.items():
+        setattr(debts[0], name, value)
+    return debts
+
+
+def test_balances_are_not_part_of_the_key():
+    compiler = PortfolioCompiler()
+    first = compiler.compile(portfolio())
+    assert compiler.compile(portfolio(principal=Decimal('3500'))) is first
+    assert compiler.stats() == {'portfolios': 1, 'max_portfolios': 256, 'hits': 1, 'misses': 1}
+
+
+@pytest.mark.parametrize('field, value', [
+    ('apr', Decimal('0.21')), ('min_payment', Decimal('125')), ('compounding', 'daily'),
+    ('payment_frequency', 'weekly'), ('status', 'paid'), ('id', 9),
+])
+def test_every_other_debt_field_is_part_of_the_key(field, value):
+    compiler = PortfolioCompiler()
+    first = compiler.compile(portfolio())
+    assert compiler.compile(portfolio(**{field: value})) is not first
+
+
+def test_least_recently_used_portfolio_is_evicted():
+    compiler = PortfolioCompiler(max_portfolios=2)
+    a = compiler.compile(portfolio())
+    compiler.compile(portfolio(apr=Decimal('0.3')))
+    compiler.compile(portfolio())
+    compiler.compile(portfolio(apr=Decimal('0.4')))
+    assert compiler.compile(portfolio()) is a
+    assert compiler.stats()['portfolios'] == 2
+    assert compiler.stats()['misses'] == 3
+
+
+def test_compiled_constants():
+    compiled = PortfolioCompiler().compile(portfolio(status='paid'))
+    assert compiled.monthly_rates[0] == Decimal('0.20') / 12
+    assert compiled.monthly_rates[3] == 0
+    assert compiled.daily == [2]
+    assert compiled.weekly == [1]
+    assert compiled.weekly_min_payments == Decimal('45')
+    assert compiled.active == [1, 2, 3]
+    assert compiled.total_min_payments == Decimal('565')
+    # Ties keep portfolio order
+    assert compiled.avalanche_order == [1, 0, 2, 3]
+    assert compiled.avalanche_rank == [1, 0, 2, 3]
+    assert compiled.apr_roots[1] == Decimal('0.25') ** Decimal('0.5')
+
+
+def test_daily_rate_compounds_over_the_month():
+    apr = Decimal('0.1825')
+    assert daily_compounded_rate(apr, 30) == (1 + apr / 365) ** 30 - 1
+    assert daily_compounded_rate(apr, 31) > daily_compounded_rate(apr, 30)
+    assert monthly_rate(apr, 'none') == 0
+
+
+@pytest.mark.parametrize('compounding', ['monthly', 'daily', 'none'])
+@pytest.mark.parametrize('balance', [Decimal('50'), Decimal('130'), Decimal('10000')])
+def test_weekly_credit_matches_payment_by_payment_sum(compounding, balance):
+    apr, days, first_payday, payment = Decimal('0.24'), 31, 2, Decimal('60')
+    expected = Decimal('0')
+    remaining = balance
+    for payday in range(first_payday, days, 7):
+        paid = min(payment, remaining)
+        remaining -= paid
+        if compounding == 'daily':
+            expected += paid * ((1 + apr / 365) ** (days - payday) - 1)
+        elif compounding == 'monthly':
+            expected += paid * apr / 12 * (days - payday) / days
+    assert weekly_payment_credit(apr, compounding, days, first_payday, payment, balance) == pytest.approx(expected)
+
+
+def test_weekly_credit_is_zero_without_balance():
+    assert weekly_payment_credit(Decimal('0.2'), 'monthly', 30, 0, Decimal('50'), Decimal('0')) == 0
+
+
+def test_hybrid_scores_use_current_balances_of_a_cached_portfolio():
+    strategy = HybridStrategy()
+    debts = portfolio()
+    assert strategy.get_recommendation(debts)['target_debt']['name'] == 'Store'
+    
+    # Same portfolio version with a new balance: a cache hit, but the score must follow the balance
+    debts = portfolio()
+    debts[1].principal = Decimal('20000')
+    recommendation = strategy.get_recommendation(debts)
+    assert recommendation['target_debt']['name'] == 'Card'
+    assert recommendation['target_debt']['score'] == pytest.approx(float(Decimal('4000') / Decimal('0.20').sqrt()))
+    
+    analysis = strategy.get_strategy_analysis(debts)
+    assert [item['debt_name'] for item in analysis['debt_priorities']] == ['Card', 'Loan', 'Store', 'Family']
+
+
+def test_hybrid_skips_inactive_debts():
+    strategy = HybridStrategy()
+    debts = portfolio()
+    for debt in debts:
+        debt.status = 'paid'
+    assert strategy.get_recommendation(debts) == {'target_debt': None, 'rationale': 'No active debts'}
+    assert strategy.get_strategy_analysis(debts) == {'analysis': 'No active debts'}
@@ -0,0 +1,89 @@
+"""ConsolidationAnalyzer: offer costs, ranking and the simulated current plan."""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from services.consolidation_analysis import ConsolidationAnalyzer, calculate_monthly_payment
+from services.simple_simulation_engine import SimpleSimulationEngine, SimpleDebt
+
+
+START = datetime(2026, 1, 1)
+
+
+def portfolio():
+    return [
+        SimpleDebt(1, 'Credit Card', Decimal('15000'), Decimal('0.185'), Decimal('300')),
+        SimpleDebt(2, 'Car Loan', Decimal('45000'), Decimal('0.0875'), Decimal('650')),
+        SimpleDebt(3, 'Store Card', Decimal('3000'), Decimal('0.24'), Decimal('90')),
+    ]
+
+
+def analyzer():
+    return ConsolidationAnalyzer(SimpleSimulationEngine(start_date=START))
+
+
+def summary(debts, extra_payment):
+    engine = SimpleSimulationEngine(start_date=START)
+    engine.debts = debts
+    return engine.simulate_summary('avalanche', extra_payment)
+
+
+def test_annuity_payment_repays_the_loan():
+    payment = calculate_monthly_payment(Decimal('10000'), Decimal('0.12'), 24)
+    balance = Decimal('10000')
+    for _ in range(24):
+        balance = balance * (1 + Decimal('0.01')) - payment
+    assert abs(balance) < Decimal('0.000001')
+    assert calculate_monthly_payment(Decimal('1200'), Decimal('0'), 12) == 100
+
+
+def test_current_plan_is_the_simulated_one():
+    result = analyzer().analyze(portfolio(), analyzer().build_offers(portfolio(), [{'rate': 0.1, 'term': 48}]),
+                                extra_payment=Decimal('200'))
+    expected = summary(portfolio(), Decimal('200'))
+    assert result['current']['totalInterest'] == pytest.approx(expected['total_interest_paid'])
+    assert result['current']['monthsToZero'] == expected['months_to_zero']
+
+
+def test_partial_offer_simulates_the_debts_left_out():
+    debts = portfolio()
+    offers = analyzer().build_offers(debts, [{'rate': 0.1, 'term': 36, 'fees': 500, 'debt_ids': [1, 3]}])
+    offer = analyzer().analyze(debts, offers, extra_payment=Decimal('200'))['offers'][0]
+    
+    loan_payment = calculate_monthly_payment(Decimal('18500'), Decimal('0.1'), 36)
+    left_out = summary([debts[1]], Decimal('200'))
+    assert offer['loanPayment'] == pytest.approx(float(loan_payment))
+    assert offer['remainingDebtsInterest'] == pytest.approx(left_out['total_interest_paid'])
+    assert offer['totalCost'] == pytest.approx(float(loan_payment * 36) + 45000 + left_out['total_interest_paid'])
+    # Required payments only: the minimums replaced against the loan payment
+    assert offer['monthlySavings'] == pytest.approx(float(Decimal('390') - loan_payment))
+    assert offer['monthlyPayment'] == pytest.approx(float(loan_payment + 650 + 200))
+
+
+def test_offers_are_ranked_affordable_first_then_by_cost():
+    offers = analyzer().build_offers(portfolio(), grid={'rates': [0.06, 0.12], 'terms': [12, 60]})
+    ranked = analyzer().analyze(portfolio(), offers, max_monthly_payment=Decimal('1500'))['offers']
+    
+    assert [offer['rank'] for offer in ranked] == [1, 2, 3, 4]
+    # Repaying 63k over 12 months needs far more than 1500 a month
+    assert [offer['affordable'] for offer in ranked] == [True, True, False, False]
+    assert ranked[0]['totalCost'] <= ranked[1]['totalCost']
+    assert (ranked[0]['interestRate'], ranked[0]['termMonths']) == (0.06, 60)
+
+
+@pytest.mark.parametrize('offer', [
+    {'rate': 0.1, 'term': 0},
+    {'rate': -0.1, 'term': 12},
+    {'rate': 0.1, 'term': 12, 'debt_ids': [9]},
+])
+def test_invalid_offers_are_rejected(offer):
+    with pytest.raises(ValueError):
+        analyzer().build_offers(portfolio(), [offer])
+
+
+def test_offer_limit():
+    with pytest.raises(ValueError):
+        ConsolidationAnalyzer(SimpleSimulationEngine(), max_offers=3).build_offers(
+            portfolio(), grid={'rates': [0.1, 0.2], 'terms': [12, 24]})
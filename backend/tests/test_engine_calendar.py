@@ -0,0 +1,70 @@
+"""The primary engine steps calendar months: labels, month lengths and paydays agree."""
+
+from datetime import datetime
+import calendar
+from decimal import Decimal
+
+import pytest
+
+from services.amortization import DebtAmortization
+from services.compiled_portfolio import daily_compounded_rate
+from services.simple_simulation_engine import SimpleSimulationEngine, SimpleDebt, month_calendar, month_date
+
+
+START = datetime(2025, 1, 31)
+
+
+def engine(debts):
+    simulation_engine = SimpleSimulationEngine(start_date=START)
+    simulation_engine.debts = debts
+    return simulation_engine
+
+
+def test_months_are_labelled_with_the_calendar_month_charged():
+    result = engine([SimpleDebt(1, 'Loan', Decimal('20000'), Decimal('0.12'), Decimal('450'))]).simulate_avalanche()
+    dates = [month['date'] for month in result['simulation_results']]
+    
+    assert dates[:4] == ['2025-01-31', '2025-02-28', '2025-03-31', '2025-04-30']
+    assert dates[12] == '2026-01-31'
+    # One label per calendar month, however long the plan runs
+    assert len({label[:7] for label in dates}) == len(dates)
+    assert result['summary']['debt_free_date'] == dates[-1]
+
+
+@pytest.mark.parametrize('strategy', ['avalanche', 'snowball'])
+def test_summary_and_baseline_share_the_labels(strategy):
+    simulation_engine = engine([
+        SimpleDebt(1, 'Card', Decimal('6000'), Decimal('0.2'), Decimal('200')),
+        SimpleDebt(2, 'Loan', Decimal('30000'), Decimal('0.09'), Decimal('600')),
+    ])
+    full = simulation_engine.simulate_avalanche(Decimal('150')) if strategy == 'avalanche' \
+        else simulation_engine.simulate_snowball(Decimal('150'))
+    summary = simulation_engine.simulate_summary(strategy, Decimal('150'))
+    assert summary['debt_free_date'] == full['summary']['debt_free_date']
+    
+    baseline = simulation_engine.simulate_baseline()
+    months = baseline['simulation_results']
+    assert [month['date'] for month in months] == [
+        month_date(START, month['month']).strftime('%Y-%m-%d') for month in months
+    ]
+
+
+def test_daily_interest_follows_the_labelled_month():
+    debt = SimpleDebt(1, 'Overdraft', Decimal('9000'), Decimal('0.21'), Decimal('400'), 'daily')
+    months = engine([debt]).simulate_avalanche()['simulation_results']
+    
+    balance = debt.principal
+    for month in months[:14]:
+        days = month_calendar(START, month['month'])[0]
+        label = datetime.strptime(month['date'], '%Y-%m-%d')
+        assert days == calendar.monthrange(label.year, label.month)[1]
+        interest = balance * daily_compounded_rate(debt.apr, days)
+        assert abs(month['debts'][0]['interest_paid'] - interest) < Decimal('0.000001')
+        balance = month['debts'][0]['balance']
+
+
+def test_engine_labels_match_amortization():
+    debt = SimpleDebt(1, 'Payday Loan', Decimal('3000'), Decimal('0.29'), Decimal('60'), 'daily', 'weekly')
+    months = engine([debt]).simulate_avalanche()['simulation_results']
+    amortization = DebtAmortization(debt, start_date=START)
+    assert [month['date'][:7] for month in months] == [row['label'] for row in amortization.schedule()]
@@ -0,0 +1,69 @@
+"""EngineProfiler counters, and the `profile` flag on the calculation endpoints."""
+
+from datetime import datetime
+from decimal import Decimal
+
+from services.engine_profiler import EngineProfiler
+from services.simple_simulation_engine import SimpleSimulationEngine, SimpleDebt
+
+
+DEBTS = [
+    {'id': 1, 'name': 'Credit Card', 'principal': 15000, 'apr': 18.5, 'min_payment': 300},
+    {'id': 2, 'name': 'Car Loan', 'principal': 45000, 'apr': 8.75, 'min_payment': 650},
+]
+
+
+def as_user(user_id):
+    return {'X-User-Id': str(user_id)}
+
+
+def engine(profiler=None):
+    simulation_engine = SimpleSimulationEngine(start_date=datetime(2025, 1, 1), profiler=profiler)
+    simulation_engine.debts = [
+        SimpleDebt(1, 'Card', Decimal('3000'), Decimal('0.22'), Decimal('90')),
+        SimpleDebt(2, 'Store', Decimal('800'), Decimal('0.25'), Decimal('40')),
+        SimpleDebt(3, 'Loan', Decimal('9000'), Decimal('0.07'), Decimal('200')),
+    ]
+    return simulation_engine
+
+
+def test_clock_laps_accumulate_per_phase():
+    ticks = iter([1.0, 1.5, 3.0])
+    profiler = EngineProfiler(clock=lambda: next(ticks))
+    started = profiler.lap('interest', 0.5)
+    profiler.lap('interest', started)
+    profiler.lap('summary', 2.5)
+    assert profiler.phases['interest'] == 1.0
+    assert profiler.to_dict()['phases_ms']['summary'] == 500.0
+
+
+def test_peaks_keep_the_largest_value():
+    profiler = EngineProfiler()
+    for value in (2, 5, 3):
+        profiler.peak('reallocation_iterations', value)
+    assert profiler.to_dict()['peaks'] == {'peak_reallocation_iterations': 5}
+
+
+def test_profiling_does_not_change_results():
+    profiler = EngineProfiler()
+    assert engine(profiler).simulate_avalanche(Decimal('150')) == engine().simulate_avalanche(Decimal('150'))
+    
+    counters = profiler.counters
+    months = engine().simulate_avalanche(Decimal('150'))['summary']['months_to_zero']
+    assert counters['simulations'] == 1
+    assert counters['months_simulated'] == months
+    assert counters['interest_applications'] > 0
+    assert counters['reallocation_iterations'] >= 3
+
+
+def test_profile_is_returned_only_when_asked(client):
+    body = {'strategy': 'avalanche', 'extra_payment': 100, 'debts': DEBTS}
+    plain = client.post('/api/calculate/simulate', headers=as_user(951), json=body).get_json()
+    assert 'profile' not in plain
+    
+    for query, extra in (('?profile=true', {}), ('', {'profile': True})):
+        profiled = client.post(f'/api/calculate/simulate{query}', headers=as_user(951),
+                               json={**body, **extra}).get_json()
+        assert profiled['summary'] == plain['summary']
+        assert profiled['profile']['counters']['simulations'] == 1
+        assert set(profiled['profile']['phases_ms']) >= set(EngineProfiler.PHASES)
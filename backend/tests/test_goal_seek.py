@@ -0,0 +1,89 @@
+"""GoalSeekSolver solutions meet the goal, and a step past them doesn't."""
+
+from datetime import datetime
+from decimal import Decimal
+import copy
+
+import pytest
+
+from services.goal_seek import GoalSeekSolver
+from services.simple_simulation_engine import SimpleSimulationEngine, SimpleDebt
+
+
+START = datetime(2026, 1, 1)
+
+
+def portfolio():
+    return [
+        SimpleDebt(1, 'Credit Card', Decimal('15000'), Decimal('0.185'), Decimal('300')),
+        SimpleDebt(2, 'Car Loan', Decimal('45000'), Decimal('0.0875'), Decimal('650')),
+        SimpleDebt(3, 'Store Card', Decimal('3000'), Decimal('0.24'), Decimal('90')),
+    ]
+
+
+def summary(debts, extra_payment=Decimal('0'), strategy='avalanche'):
+    engine = SimpleSimulationEngine(start_date=START)
+    engine.debts = debts
+    return engine.simulate_summary(strategy, extra_payment)
+
+
+def with_rate(debts, index, rate):
+    debts = list(debts)
+    debts[index] = copy.copy(debts[index])
+    debts[index].apr = Decimal(str(rate))
+    return debts
+
+
+@pytest.mark.parametrize('strategy', ['avalanche', 'snowball'])
+def test_extra_payment_is_the_smallest_that_meets_months(strategy):
+    solver = GoalSeekSolver(SimpleSimulationEngine(start_date=START))
+    result = solver.solve(portfolio(), 'extra_payment', 'months_to_zero', 36, strategy)
+    
+    assert result['achievable']
+    solution = Decimal(str(result['solution']))
+    assert summary(portfolio(), solution, strategy)['months_to_zero'] <= 36
+    assert summary(portfolio(), solution - Decimal('0.02'), strategy)['months_to_zero'] > 36
+
+
+def test_interest_target_is_met():
+    solver = GoalSeekSolver(SimpleSimulationEngine(start_date=START))
+    result = solver.solve(portfolio(), 'extra_payment', 'interest_saved', 5000)
+    
+    saved = Decimal(str(result['baseline_summary']['total_interest_paid'])) - \
+        Decimal(str(result['summary']['total_interest_paid']))
+    assert result['achievable'] and saved >= 5000
+    assert summary(portfolio(), Decimal(str(result['solution'])) - Decimal('0.02'))['total_interest_paid'] > \
+        result['baseline_summary']['total_interest_paid'] - 5000
+
+
+def test_rate_is_the_highest_that_meets_the_goal():
+    solver = GoalSeekSolver(SimpleSimulationEngine(start_date=START))
+    # The goal is met well above twice the current rate, past the initial bracket
+    result = solver.solve(portfolio(), 'rate', 'months_to_zero', 80, extra_payment=Decimal('400'), debt_id=3)
+    
+    assert result['achievable']
+    solution = result['solution']
+    assert solution > 1
+    assert summary(with_rate(portfolio(), 2, solution), Decimal('400'))['months_to_zero'] <= 80
+    assert summary(with_rate(portfolio(), 2, solution + 0.000003), Decimal('400'))['months_to_zero'] > 80
+
+
+def test_rate_met_at_every_rate_has_no_solution():
+    debts = [SimpleDebt(1, 'Tab', Decimal('1'), Decimal('0.1'), Decimal('10000'))]
+    result = GoalSeekSolver(SimpleSimulationEngine(start_date=START)).solve(
+        debts, 'rate', 'months_to_zero', 1, debt_id=1)
+    assert result['achievable']
+    assert result['solution'] is None
+    assert result['met_up_to'] >= 1000
+
+
+def test_goal_already_met_needs_no_lump_sum():
+    solver = GoalSeekSolver(SimpleSimulationEngine(start_date=START))
+    result = solver.solve(portfolio(), 'lump_sum', 'months_to_zero', 600)
+    assert result['achievable'] and result['solution'] == 0
+
+
+def test_unreachable_goal_is_not_achievable():
+    solver = GoalSeekSolver(SimpleSimulationEngine(start_date=START))
+    result = solver.solve(portfolio(), 'rate', 'total_interest', 0, debt_id=1)
+    assert not result['achievable']
@@ -0,0 +1,69 @@
+"""Calculation endpoints take an inline `debts` list in place of the stored portfolio."""
+
+import pytest
+
+import app as api
+
+
+DEBTS = [
+    {'id': 1, 'name': 'Credit Card', 'principal': 15000, 'apr': 18.5, 'min_payment': 300},
+    {'id': 2, 'name': 'Car Loan', 'principal': 45000, 'apr': 8.75, 'min_payment': 650},
+]
+
+
+def as_user(user_id):
+    return {'X-User-Id': str(user_id)}
+
+
+@pytest.fixture
+def no_repository(monkeypatch):
+    """Fail any read of stored debts."""
+    def unavailable(user_id):
+        raise AssertionError('stored debts were read')
+    monkeypatch.setattr(api.repository, 'active_debts', unavailable)
+
+
+def test_inline_debts_match_the_same_stored_debts(client):
+    client.post('/api/debts/bulk', headers=as_user(801), json={'debts': [
+        {key: value for key, value in debt.items() if key != 'id'} for debt in DEBTS
+    ]})
+    stored = client.post('/api/calculate/avalanche', headers=as_user(801), json={'extra_payment': 250}).get_json()
+    inline = client.post('/api/calculate/avalanche', headers=as_user(802),
+                         json={'extra_payment': 250, 'debts': DEBTS}).get_json()
+    assert inline['summary'] == stored['summary']
+
+
+@pytest.mark.parametrize('method, url, body', [
+    ('post', '/api/calculate/simulate', {'strategy': 'snowball'}),
+    ('post', '/api/calculate/compare', {'extra_payment': 100}),
+    ('post', '/api/calculate/months-to-zero', {'extra_payment': 100}),
+    ('post', '/api/calculate/consolidation', {}),
+    ('post', '/api/insights/recommend', {'strategy': 'avalanche'}),
+    ('post', '/api/insights/top-targets', {}),
+    ('post', '/api/analytics/timeline', {}),
+])
+def test_endpoints_calculate_without_reading_stored_debts(client, no_repository, method, url, body):
+    response = getattr(client, method)(url, headers=as_user(811), json={**body, 'debts': DEBTS})
+    assert response.status_code == 200, response.get_json()
+
+
+def test_ids_and_names_default_to_the_position(client, no_repository):
+    response = client.post('/api/calculate/simulate', headers=as_user(821), json={'debts': [
+        {'principal': 1000, 'apr': 10, 'min_payment': 100},
+        {'principal': 2000, 'apr': 20, 'min_payment': 100},
+    ]})
+    debts = response.get_json()['simulation_results'][0]['debts']
+    assert sorted((debt['id'], debt['name']) for debt in debts) == [(1, 'Debt 1'), (2, 'Debt 2')]
+
+
+@pytest.mark.parametrize('debts, message', [
+    ([{'principal': 1000, 'apr': 10}], 'debts[0]: Missing required field: min_payment'),
+    ([DEBTS[0], {**DEBTS[1], 'principal': -1}], 'debts[1]'),
+    ([DEBTS[0], {**DEBTS[1], 'id': 1}], 'Inline debt ids must be unique'),
+    ({'principal': 1000}, 'debts must be a list'),
+    ([DEBTS[0]] * (api.MAX_BULK_ITEMS + 1), 'debts must be a list'),
+])
+def test_invalid_inline_debts_are_rejected(client, no_repository, debts, message):
+    response = client.post('/api/calculate/avalanche', headers=as_user(831), json={'debts': debts})
+    assert response.status_code == 400
+    assert message in response.get_json()['error']
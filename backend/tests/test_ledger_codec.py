@@ -0,0 +1,77 @@
+"""Ledger encode/decode round trip against the simulation it was encoded from."""
+
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+import pytest
+
+from services.ledger_codec import LedgerCodec, LedgerReader
+from services.payment_schedule import PaymentSchedule
+from services.simple_simulation_engine import SimpleSimulationEngine, SimpleDebt
+
+
+def cents(value):
+    return float(Decimal(str(value)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+
+
+@pytest.fixture(scope='module')
+def simulation():
+    engine = SimpleSimulationEngine(start_date=datetime(2025, 1, 1))
+    engine.debts = [
+        SimpleDebt(1, 'Credit Card', Decimal('15000'), Decimal('0.185'), Decimal('300')),
+        SimpleDebt(2, 'Car Loan', Decimal('45000'), Decimal('0.0875'), Decimal('650'), 'daily'),
+        SimpleDebt(3, 'Store Account', Decimal('4000'), Decimal('0.21'), Decimal('45'), 'monthly', 'weekly'),
+    ]
+    # A debt arriving mid-plan joins the ledger in a later month
+    schedule = PaymentSchedule.from_request([
+        {'type': 'new_debt', 'month': 20,
+         'debt': {'id': 9, 'name': 'Furniture', 'principal': 6000, 'apr': 19.5, 'min_payment': 200}}
+    ], engine.debts)
+    return engine.simulate_avalanche(Decimal('500'), schedule=schedule)
+
+
+def expected_column(simulation, debt_id, field, first, last):
+    values = []
+    for month in simulation['simulation_results'][first - 1:last]:
+        entry = next((debt for debt in month['debts'] if debt['id'] == debt_id), None)
+        values.append(cents(entry[field]) if entry else 0.0)
+    return values
+
+
+@pytest.mark.parametrize('block_months', [1, 7, 60])
+def test_round_trip_restores_every_column(simulation, block_months):
+    reader = LedgerReader(LedgerCodec(block_months=block_months).encode(simulation))
+    months = simulation['simulation_results']
+    assert reader.months == len(months)
+    assert sorted(debt['id'] for debt in reader.debts) == [1, 2, 3, 9]
+    
+    ledger = reader.read()
+    assert ledger['months'] == list(range(1, len(months) + 1))
+    assert ledger['dates'] == [month['date'] for month in months]
+    for debt in ledger['debts']:
+        assert debt['balance'] == expected_column(simulation, debt['id'], 'balance', 1, len(months))
+        assert debt['payment'] == expected_column(simulation, debt['id'], 'payment_made', 1, len(months))
+        assert debt['interest'] == expected_column(simulation, debt['id'], 'interest_paid', 1, len(months))
+    assert ledger['totals']['total_balance'] == [cents(month['total_balance']) for month in months]
+    assert ledger['totals']['interest'] == [cents(month['interest_this_month']) for month in months]
+    assert ledger['totals']['payments'] == [cents(month['payments_this_month']) for month in months]
+
+
+def test_partial_read_decodes_only_the_requested_range(simulation):
+    reader = LedgerReader(LedgerCodec(block_months=12).encode(simulation))
+    ledger = reader.read(month_from=10, month_to=30, debt_ids=['2', 9], fields=['balance'])
+    
+    assert ledger['months'] == list(range(10, 31))
+    assert [debt['id'] for debt in ledger['debts']] == [2, 9]
+    assert set(ledger['debts'][0]) == {'id', 'name', 'balance'}
+    assert ledger['debts'][0]['balance'] == expected_column(simulation, 2, 'balance', 10, 30)
+    # Before it arrives the new debt reads as zero
+    assert ledger['debts'][1]['balance'] == expected_column(simulation, 9, 'balance', 10, 30)
+    assert ledger['debts'][1]['balance'][0] == 0.0
+
+
+def test_reader_rejects_foreign_data_and_unknown_fields(simulation):
+    with pytest.raises(ValueError):
+        LedgerReader(b'not a ledger')
+    with pytest.raises(ValueError):
+        LedgerReader(LedgerCodec().encode(simulation)).read(fields=['principal'])
@@ -0,0 +1,46 @@
+"""The load-testing harness in benchmarks/load_test.py, run briefly against an in-process server."""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                'benchmarks'))
+
+import load_test
+
+
+def test_synthetic_minimums_cover_interest():
+    rng = random.Random(3)
+    for _ in range(50):
+        debts = load_test.synthetic_portfolio(rng, max_debts=5)
+        assert 1 <= len(debts) <= 5
+        for debt in debts:
+            assert 5 <= debt['apr'] <= 28
+            assert debt['min_payment'] > debt['principal'] * debt['apr'] / 1200
+
+
+@pytest.mark.parametrize('q, expected', [(0.5, 3), (0.95, 5), (0.99, 5), (0.2, 1), (0.21, 2)])
+def test_nearest_rank_percentile(q, expected):
+    assert load_test.percentile([1, 2, 3, 4, 5], q) == expected
+
+
+def test_percentile_of_no_samples():
+    assert load_test.percentile([], 0.5) == 0.0
+
+
+def test_run_reports_every_request():
+    base_url, user_ids, server = load_test.start_local_api('memory', users=3, max_debts=4, seed=7)
+    try:
+        report = load_test.LoadTest(base_url, user_ids, seed=2).run(concurrency=3, requests=60)
+    finally:
+        server.shutdown()
+    
+    total = report['total']
+    assert total['requests'] == 60
+    assert total['errors'] == 0
+    assert sum(stats['requests'] for stats in report['endpoints'].values()) == 60
+    assert set(report['endpoints']) <= {name for name, *_ in load_test.DASHBOARD_MIX}
+    assert total['p50_ms'] <= total['p95_ms'] <= total['p99_ms'] <= total['max_ms']
@@ -0,0 +1,53 @@
+"""The in-memory repository implements the Repository interface with MySQL's semantics."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from services.memory_repository import MemoryRepository
+from services.repository import Repository, create_repository
+
+
+def debt(name, principal=1000):
+    return {'name': name, 'principal': principal, 'apr': 12, 'min_payment': 50}
+
+
+def test_incomplete_backend_cannot_be_constructed():
+    class Partial(Repository):
+        def active_debts(self, user_id):
+            return []
+    
+    with pytest.raises(TypeError):
+        Partial()
+    assert not MemoryRepository.__abstractmethods__
+
+
+def test_memory_repository_is_seeded_for_the_default_user():
+    repository = create_repository('memory')
+    assert [d.name for d in repository.active_debts(1)] == ['Credit Card', 'Car Loan', 'Personal Loan', 'Student Loan']
+    # APRs are stored as percentages and served as fractions
+    assert repository.active_debts(1)[0].apr == Decimal('0.185')
+    assert repository.active_debts(2) == []
+
+
+def test_deleting_a_debt_deletes_its_payments():
+    repository = MemoryRepository()
+    kept, deleted = repository.create_debts(7, [debt('Kept'), debt('Deleted')])
+    payments = [(kept, Decimal('10'), date(2026, 1, 5)), (deleted, Decimal('20'), date(2026, 1, 6))]
+    repository.import_payments(7, [payments], 'one-off')
+    
+    assert repository.delete_debts(7, [deleted, 999]) == {deleted}
+    rows, _ = repository.list_payments(7, ['debt_id', 'amount'], None)
+    assert [row['debt_id'] for row in rows] == [kept]
+
+
+def test_bulk_update_changes_nothing_unless_every_debt_is_owned():
+    repository = MemoryRepository()
+    mine = repository.create_debts(7, [debt('Mine')])[0]
+    theirs = repository.create_debts(8, [debt('Theirs')])[0]
+    
+    assert repository.update_debts(7, [{'id': mine, 'principal': 1}, {'id': theirs, 'principal': 1}]) == [theirs]
+    assert repository.get_debt(7, mine)['principal'] == 1000
+    assert repository.update_debts(7, [{'id': mine, 'principal': 1}]) == []
+    assert repository.get_debt(7, mine)['principal'] == 1
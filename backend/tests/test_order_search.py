@@ -0,0 +1,85 @@
+"""
+The branch-and-bound order search against brute force: every permutation
+simulated with the engine's custom-order rules.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+import itertools
+import random
+
+import pytest
+
+from services.order_search import CustomOrderSearch
+from services.simple_simulation_engine import SimpleSimulationEngine, SimpleDebt
+
+
+START = datetime(2025, 1, 9)
+
+
+def score(result, objective, early_win_months=12):
+    """The search's objective for an engine result, lower is better."""
+    summary = result['summary']
+    if objective == 'interest':
+        return (summary['total_interest_paid'],)
+    if objective == 'months':
+        return (summary['months_to_zero'], summary['total_interest_paid'])
+    paid = {}
+    for month in result['simulation_results']:
+        for name in month['paid_off_this_month']:
+            paid.setdefault(name, month['month'])
+    return (-sum(1 for month in paid.values() if month <= early_win_months), summary['total_interest_paid'])
+
+
+def same_score(found, best):
+    """Equal leading terms, and interest equal to within float rounding."""
+    if found[:-1] != best[:-1]:
+        return False
+    return abs(found[-1] - best[-1]) <= 1e-6 * max(1.0, abs(best[-1]))
+
+
+def random_portfolio(rng, compounding, frequencies):
+    return [
+        SimpleDebt(i, f'Debt {i}', Decimal(rng.randint(800, 30000)),
+                   Decimal(rng.choice(['0.05', '0.11', '0.18', '0.24', '0.29'])),
+                   Decimal(rng.randint(50, 400)), rng.choice(compounding), rng.choice(frequencies))
+        for i in range(rng.choice([3, 4]))
+    ]
+
+
+@pytest.mark.parametrize('compounding, frequencies', [
+    (['monthly'], ['monthly']),
+    (['monthly', 'daily', 'none'], ['monthly']),
+    (['monthly', 'daily'], ['monthly', 'weekly']),
+])
+@pytest.mark.parametrize('objective', CustomOrderSearch.OBJECTIVES)
+def test_search_matches_brute_force(compounding, frequencies, objective):
+    rng = random.Random(7)
+    engine = SimpleSimulationEngine(start_date=START)
+    for _ in range(4):
+        debts = random_portfolio(rng, compounding, frequencies)
+        extra = Decimal(rng.choice([100, 400, 900]))
+        engine.debts = debts
+        
+        best = min(score(engine.simulate_custom_order(list(order), extra), objective)
+                   for order in itertools.permutations(debt.name for debt in debts))
+        
+        found = CustomOrderSearch().search(debts, extra, objective, START)
+        assert found['exhaustive']
+        assert same_score(score(engine.simulate_custom_order(found['best_order'], extra), objective), best)
+
+
+def test_node_limit_stops_the_search_with_a_complete_order():
+    rng = random.Random(3)
+    debts = [
+        SimpleDebt(i, f'Debt {i}', Decimal(rng.randint(800, 30000)), Decimal('0.18'), Decimal(rng.randint(50, 400)))
+        for i in range(7)
+    ]
+    found = CustomOrderSearch(node_limit=20).search(debts, Decimal('300'), 'interest', START)
+    assert not found['exhaustive']
+    assert sorted(found['best_order']) == sorted(debt.name for debt in debts)
+
+
+def test_unknown_objective_is_rejected():
+    with pytest.raises(ValueError):
+        CustomOrderSearch().search([], Decimal('0'), 'fastest', START)
@@ -0,0 +1,71 @@
+"""Keyset paging of the debt and payment listings."""
+
+import pytest
+
+
+def get(client, user_id, url):
+    response = client.get(url, headers={'X-User-Id': str(user_id)})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def walk(client, user_id, url, key):
+    """Every row of a listing, following next_cursor, and the page sizes seen."""
+    rows, sizes = [], []
+    cursor = None
+    while True:
+        page = get(client, user_id, url + (f'&cursor={cursor}' if cursor else ''))
+        rows.extend(page[key])
+        sizes.append(len(page[key]))
+        cursor = page['next_cursor']
+        if not cursor:
+            return rows, sizes
+
+
+@pytest.fixture(scope='module')
+def debt_ids(client):
+    # Bulk inserts share one timestamp, so the id tie-break decides the order
+    response = client.post('/api/debts/bulk', headers={'X-User-Id': '401'}, json={'debts': [
+        {'name': f'Debt {i}', 'principal': 1000 + i, 'apr': 10, 'min_payment': 50} for i in range(23)
+    ]})
+    assert response.status_code == 201
+    return [result['debt_id'] for result in response.get_json()['results']]
+
+
+def test_pages_cover_every_debt_once_newest_first(client, debt_ids):
+    rows, sizes = walk(client, 401, '/api/debts?limit=5&fields=id,name', 'debts')
+    assert [row['id'] for row in rows] == sorted(debt_ids, reverse=True)
+    assert sizes == [5, 5, 5, 5, 3]
+    assert set(rows[0]) == {'id', 'name'}
+
+
+def test_debts_are_unpaginated_without_limit_or_cursor(client, debt_ids):
+    page = get(client, 401, '/api/debts')
+    assert len(page['debts']) == len(debt_ids)
+    assert page['next_cursor'] is None
+
+
+def test_page_size_is_capped_and_bad_parameters_are_rejected(client, debt_ids):
+    assert len(get(client, 401, '/api/debts?limit=0')['debts']) == 1
+    for url in ('/api/debts?cursor=not-a-cursor', '/api/debts?fields=id,user_id'):
+        assert client.get(url, headers={'X-User-Id': '401'}).status_code == 400
+
+
+def test_listing_is_scoped_to_the_user(client, debt_ids):
+    assert get(client, 402, '/api/debts')['debts'] == []
+
+
+def test_payment_pages_follow_date_then_id(client, debt_ids):
+    lines = ['Date,Amount,Debt'] + [f'2030-01-{day % 4 + 1:02d},{10 + day},{debt_ids[day % 3]}' for day in range(11)]
+    response = client.post('/api/payments/import?update_balances=false', data='\n'.join(lines),
+                           content_type='text/csv', headers={'X-User-Id': '401'})
+    assert response.get_json()['imported'] == 11
+    
+    rows, sizes = walk(client, 401, '/api/payments?limit=4', 'payments')
+    assert sizes == [4, 4, 3]
+    keys = [(row['payment_date'], row['id']) for row in rows]
+    assert keys == sorted(keys, reverse=True)
+    assert len({row['id'] for row in rows}) == 11
+    
+    rows, _ = walk(client, 401, f'/api/payments?limit=2&debt_id={debt_ids[0]}&from=2030-01-02', 'payments')
+    assert rows and all(row['debt_id'] == debt_ids[0] and row['payment_date'] >= '2030-01-02' for row in rows)
@@ -0,0 +1,130 @@
+"""Payment import: row matching, refunds, re-import dedupe and debt ownership."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from services.payment_import import PaymentImporter
+
+
+DEBTS = [
+    {'id': 1, 'name': 'Car Loan', 'balance_date': date(2025, 1, 31)},
+    {'id': 2, 'name': 'Car Loan 2', 'balance_date': None},
+    {'id': 3, 'name': 'Credit Card', 'balance_date': None},
+]
+
+
+def run(importer, text, **options):
+    return [row for batch in importer.batches(text.splitlines(), DEBTS, **options) for row in batch]
+
+
+def test_rows_match_by_debt_column_keyword_and_name():
+    importer = PaymentImporter()
+    rows = run(importer, '\n'.join([
+        'Date,Description,Amount,Debt',
+        '2025-02-01,Transfer,100.00,3',
+        '2025-02-02,Transfer,110.00,credit card',
+        '2025-02-03,VISA 4412 payment,120.00,',
+        '2025-02-04,Payment Car Loan 2 ref 88,130.00,',
+        '2025-02-05,Groceries,140.00,',
+    ]), keywords={'visa 4412': 3})
+    
+    assert rows == [
+        (3, Decimal('100.00'), date(2025, 2, 1)),
+        (3, Decimal('110.00'), date(2025, 2, 2)),
+        (3, Decimal('120.00'), date(2025, 2, 3)),
+        # The longest matching name wins
+        (2, Decimal('130.00'), date(2025, 2, 4)),
+    ]
+    assert importer.stats['unmatched'] == 1
+    assert importer.stats['totals'] == {3: Decimal('330.00'), 2: Decimal('130.00')}
+
+
+def test_refunds_are_skipped_not_paid():
+    importer = PaymentImporter()
+    text = 'Date,Description,Amount\n2025-02-01,Credit Card,-50.00\n2025-02-02,Credit Card,(25.00)\n'
+    assert run(importer, text) == []
+    assert importer.stats['credits'] == 2
+    
+    # Exports that show payments as money out flip the sign
+    importer = PaymentImporter()
+    rows = run(importer, 'Date,Description,Amount\n2025-02-01,Credit Card,-50.00\n2025-02-02,Credit Card,20\n',
+               negative_payments=True)
+    assert rows == [(3, Decimal('50.00'), date(2025, 2, 1))]
+    assert importer.stats['credits'] == 1
+
+
+def test_payments_up_to_the_balance_date_are_already_reflected():
+    importer = PaymentImporter()
+    rows = run(importer, 'Date,Description,Amount\n2025-01-31,Car Loan,650\n2025-02-28,Car Loan,650\n')
+    assert len(rows) == 2
+    assert importer.stats['already_reflected'] == 1
+    assert importer.stats['totals'] == {1: Decimal('650')}
+
+
+def test_reimport_skips_stored_payments_once_each():
+    text = 'Date,Description,Amount\n2025-02-01,Credit Card,99.50\n2025-02-01,Credit Card,99.50\n'
+    requested = []
+    
+    def existing(date_from, date_to):
+        requested.append((date_from, date_to))
+        # One identical payment is already stored, so one of the two rows is new
+        return {(3, date(2025, 2, 1), Decimal('99.5')): 1}
+    
+    importer = PaymentImporter(batch_size=1)
+    rows = run(importer, text, existing=existing)
+    assert rows == [(3, Decimal('99.50'), date(2025, 2, 1))]
+    assert importer.stats['duplicates'] == 1
+    assert importer.stats['totals'] == {3: Decimal('99.50')}
+    assert requested[0] == (date(2025, 2, 1), date(2025, 2, 1))
+
+
+def test_keywords_must_target_known_debts():
+    importer = PaymentImporter()
+    with pytest.raises(ValueError, match='unknown debts: 42'):
+        importer.resolve_keywords({'rent': 42}, DEBTS)
+    with pytest.raises(ValueError):
+        importer.resolve_keywords(['visa'], DEBTS)
+    assert importer.resolve_keywords({'VISA': '3'}, DEBTS) == [('visa', 3)]
+
+
+# ------------------------------------------------------------------ endpoint
+
+def create_debt(client, user_id, name):
+    response = client.post('/api/debts', json={'name': name, 'principal': 5000, 'apr': 12, 'min_payment': 150},
+                           headers={'X-User-Id': str(user_id)})
+    assert response.status_code == 201
+    return response.get_json()['debt_id']
+
+
+def post_csv(client, user_id, text, **options):
+    query = '&'.join(f'{key}={value}' for key, value in options.items())
+    return client.post(f'/api/payments/import?{query}', data=text, content_type='text/csv',
+                       headers={'X-User-Id': str(user_id)})
+
+
+def test_import_only_touches_the_users_own_debts(client):
+    own = create_debt(client, 301, 'Own Loan')
+    other = create_debt(client, 302, 'Other Loan')
+    
+    response = post_csv(client, 301, 'Date,Description,Amount\n2030-01-05,x,10\n', keywords=f'{{"x": {other}}}')
+    assert response.status_code == 400
+    
+    # Another user's debt id in the debt column doesn't match
+    response = post_csv(client, 301, f'Date,Amount,Debt\n2030-01-05,10,{other}\n2030-01-05,10,{own}\n')
+    body = response.get_json()
+    assert response.status_code == 200
+    assert (body['imported'], body['unmatched']) == (1, 1)
+    assert client.get(f'/api/debts/{other}', headers={'X-User-Id': '302'}).get_json()['debt']['principal'] == 5000
+
+
+def test_reimporting_an_export_does_not_pay_twice(client):
+    debt_id = create_debt(client, 303, 'Reimported Loan')
+    text = 'Date,Description,Amount\n2030-02-01,Reimported Loan,100\n2030-03-01,Reimported Loan,100\n'
+    
+    first = post_csv(client, 303, text).get_json()
+    second = post_csv(client, 303, text).get_json()
+    assert (first['imported'], first['duplicates']) == (2, 0)
+    assert (second['imported'], second['duplicates']) == (0, 2)
+    assert client.get(f'/api/debts/{debt_id}', headers={'X-User-Id': '303'}).get_json()['debt']['principal'] == 4800
@@ -0,0 +1,117 @@
+"""Sparse schedule events: how they compile and what they do to a simulated plan."""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from services.payment_schedule import PaymentSchedule
+from services.plan_trajectory import add_months
+from services.simple_simulation_engine import SimpleSimulationEngine, SimpleDebt
+
+
+START = datetime(2026, 1, 1)
+
+
+def portfolio():
+    return [
+        SimpleDebt(1, 'Card', Decimal('5000'), Decimal('0.2'), Decimal('150')),
+        SimpleDebt(2, 'Loan', Decimal('20000'), Decimal('0.1'), Decimal('400')),
+    ]
+
+
+def months(events, extra_payment=Decimal('300'), strategy='avalanche'):
+    engine = SimpleSimulationEngine(start_date=START)
+    schedule = PaymentSchedule.from_request(events, portfolio())
+    return engine.run_simulation(portfolio(), extra_payment, strategy, schedule)['simulation_results']
+
+
+def test_events_compile_into_sorted_month_boundaries():
+    schedule = PaymentSchedule.from_request([
+        {'type': 'bonus', 'month': 7, 'amount': 100},
+        {'type': 'pause', 'month': 3, 'months': 2},
+        {'type': 'extra_payment', 'month': 3, 'amount': 50},
+    ])
+    assert [month for month, _ in schedule.boundaries] == [3, 5, 7]
+    assert [event['type'] for event in schedule.boundaries[0][1]] == ['pause', 'extra_payment']
+    assert schedule.boundaries[1][1] == [{'type': 'pause', 'paused': False}]
+    assert PaymentSchedule.from_request([]) is None
+
+
+def test_dated_events_land_in_their_calendar_month():
+    in_three_months = add_months(datetime.now().strftime('%Y-%m'), 3)
+    schedule = PaymentSchedule.from_request([
+        {'type': 'bonus', 'date': in_three_months, 'amount': 100},
+        {'type': 'bonus', 'date': '2000-01', 'amount': 100},
+    ])
+    assert [month for month, _ in schedule.boundaries] == [1, 4]
+
+
+def test_events_naming_unknown_debts_are_rejected():
+    with pytest.raises(ValueError, match='unknown debts: 3, 4'):
+        PaymentSchedule.from_request([
+            {'type': 'rate_change', 'month': 2, 'debt_id': 3, 'apr': 10},
+            {'type': 'allocation', 'month': 2, 'allocation': {'4': 50, '1': 20}},
+        ], portfolio())
+    
+    # Ids from JSON keys match stored integer ids, and debts the schedule adds are known
+    PaymentSchedule.from_request([
+        {'type': 'rate_change', 'month': 2, 'debt_id': '2', 'apr': 10},
+        {'type': 'new_debt', 'month': 4, 'debt': {'id': 9, 'principal': 900, 'apr': 25, 'min_payment': 40}},
+        {'type': 'allocation', 'month': 5, 'allocation': {'9': 100}},
+    ], portfolio())
+
+
+@pytest.mark.parametrize('event', [
+    {'type': 'holiday', 'month': 2},
+    {'type': 'pause', 'month': 2, 'months': 0},
+    {'type': 'allocation', 'month': 2, 'allocation': {'1': -5}},
+    {'type': 'bonus', 'amount': 100},
+])
+def test_invalid_events_are_rejected(event):
+    with pytest.raises(ValueError):
+        PaymentSchedule.from_request([event])
+
+
+def test_bonus_pays_down_the_balance_in_its_month():
+    base = months(None)
+    bonus = months([{'type': 'bonus', 'month': 3, 'amount': 1000}])
+    assert bonus[1]['total_balance'] == base[1]['total_balance']
+    assert bonus[2]['total_balance'] == base[2]['total_balance'] - 1000
+    assert len(bonus) < len(base)
+
+
+def test_pause_skips_payments_for_its_months():
+    paused = months([{'type': 'pause', 'month': 3, 'months': 2}])
+    assert [month['payments_this_month'] for month in paused[1:5]] == [850, 0, 0, 850]
+
+
+def test_extra_payment_change_applies_from_its_month():
+    base = months(None)
+    raised = months([{'type': 'extra_payment', 'month': 4, 'amount': 800}])
+    assert [month['payments_this_month'] for month in raised[:5]] == [850, 850, 850, 1350, 1350]
+    assert raised[2]['total_balance'] == base[2]['total_balance']
+
+
+def test_new_debt_arrives_in_its_month():
+    arrived = months([{'type': 'new_debt', 'month': 4,
+                       'debt': {'id': 9, 'name': 'Store Card', 'principal': 1000, 'apr': 30, 'min_payment': 50}}])
+    assert [[debt['id'] for debt in month['debts']] for month in arrived[2:4]] == [[1, 2], [9, 1, 2]]
+    # Avalanche sends the extra payment to the new 30% debt first
+    assert arrived[3]['debts'][0]['payment_made'] == 350
+
+
+def test_rate_change_applies_from_its_month():
+    changed = months([{'type': 'rate_change', 'month': 3, 'debt_id': 2, 'apr': 0}])
+    base = months(None)
+    assert changed[1]['debts'][1]['interest_paid'] == base[1]['debts'][1]['interest_paid'] > 0
+    assert changed[2]['debts'][1]['interest_paid'] == 0
+
+
+def test_api_rejects_schedules_naming_unknown_debts(client):
+    response = client.post('/api/calculate/simulate', json={
+        'debts': [{'id': 1, 'name': 'Card', 'principal': 5000, 'apr': 20, 'min_payment': 150}],
+        'schedule': [{'type': 'rate_change', 'month': 2, 'debt_id': 7, 'apr': 5}]
+    })
+    assert response.status_code == 400
+    assert 'unknown debts: 7' in response.get_json()['error']
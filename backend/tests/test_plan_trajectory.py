@@ -0,0 +1,98 @@
+"""
+PlanTrajectory roll-forward: replaying the planned payments of closed months
+must land on the planned balances, so only real drift re-simulates the plan.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from services.plan_trajectory import PlanTrajectory
+from services.simple_simulation_engine import SimpleDebt
+
+
+def planned_payments(state, count):
+    """The plan's own payments for its first `count` months, as recorded actuals."""
+    return {
+        entry['month']: {debt_id: Decimal(str(amount)) for debt_id, amount in entry['payments'].items()}
+        for entry in state['months'][:count]
+    }
+
+
+def portfolio(compounding='monthly', payment_frequency='monthly'):
+    return [
+        SimpleDebt(1, 'Store Card', Decimal('5000'), Decimal('0.2'), Decimal('40'), compounding, payment_frequency),
+        SimpleDebt(2, 'Car Loan', Decimal('9000'), Decimal('0.1'), Decimal('250')),
+    ]
+
+
+@pytest.mark.parametrize('compounding', ['monthly', 'daily', 'none'])
+def test_weekly_debt_on_plan_does_not_diverge(compounding):
+    trajectory = PlanTrajectory()
+    state = trajectory.build(portfolio(compounding, 'weekly'), extra_payment=Decimal('100'), today=date(2026, 1, 15))
+    
+    stats = trajectory.roll_forward(state, planned_payments(state, 3), today=date(2026, 4, 2))
+    assert stats['months_closed'] == ['2026-01', '2026-02', '2026-03']
+    assert stats['diverged_months'] == []
+    assert stats['resimulations'] == 0
+
+
+def test_weekly_paydays_follow_the_resimulated_plan():
+    trajectory = PlanTrajectory()
+    state = trajectory.build(portfolio('monthly', 'weekly'), extra_payment=Decimal('100'), today=date(2026, 1, 15))
+    
+    # An extra 500 on the car loan in January re-simulates from February
+    actuals = planned_payments(state, 1)
+    actuals['2026-01']['2'] += Decimal('500')
+    assert trajectory.roll_forward(state, actuals, today=date(2026, 2, 3))['diverged_months'] == ['2026-01']
+    
+    # Following the new plan from there on is on plan again
+    stats = trajectory.roll_forward(state, planned_payments(state, 4), today=date(2026, 5, 1))
+    assert stats['months_closed'] == ['2026-02', '2026-03', '2026-04']
+    assert stats['diverged_months'] == []
+
+
+def test_month_without_payments_diverges():
+    trajectory = PlanTrajectory()
+    state = trajectory.build(portfolio(), extra_payment=Decimal('100'), today=date(2026, 1, 15))
+    planned_months = len(state['months'])
+    
+    actuals = planned_payments(state, 2)
+    del actuals['2026-02']
+    stats = trajectory.roll_forward(state, actuals, today=date(2026, 3, 1))
+    assert stats['diverged_months'] == ['2026-02']
+    
+    february = state['months'][1]
+    assert february['actual'] and february['payments'] == {}
+    # Nothing was paid, so February closes on January's balances plus interest
+    assert all(february['balances'][k] > v for k, v in state['months'][0]['balances'].items())
+    assert len(state['months']) > planned_months
+
+
+def test_plan_is_served_by_calendar_month():
+    trajectory = PlanTrajectory()
+    state = trajectory.build(portfolio(), today=date(2026, 1, 31))
+    assert state['months'][0]['month'] == '2026-01'
+    assert state['months'][12]['month'] == '2027-01'
+    
+    assert trajectory.months_to_close(state, today=date(2026, 1, 1)) == []
+    assert trajectory.months_to_close(state, today=date(2026, 3, 10)) == ['2026-01', '2026-02']
+    
+    trajectory.roll_forward(state, planned_payments(state, 2), today=date(2026, 3, 10))
+    view = trajectory.view(state, include_history=True, today=date(2026, 3, 10))
+    assert view['closed_through'] == '2026-02'
+    assert [entry['month'] for entry in view['history']] == ['2026-01', '2026-02']
+    assert view['months'][0]['month'] == '2026-03'
+    assert view['summary']['months_remaining'] == len(state['months']) - 2
+
+
+@pytest.mark.parametrize('compounding', ['daily', 'none'])
+def test_compounding_on_plan_does_not_diverge(compounding):
+    trajectory = PlanTrajectory()
+    # February's 28 days and March's 31 charge different daily-compounded interest
+    state = trajectory.build(portfolio(compounding), extra_payment=Decimal('100'), today=date(2026, 1, 15))
+    
+    stats = trajectory.roll_forward(state, planned_payments(state, 6), today=date(2026, 7, 1))
+    assert len(stats['months_closed']) == 6
+    assert stats['diverged_months'] == []
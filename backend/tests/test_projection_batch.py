@@ -0,0 +1,68 @@
+"""The batch projection agrees with what the API simulates from the same commitments."""
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import app as api
+from services.projection_batch import project_portfolio
+
+
+def as_user(user_id):
+    return {'X-User-Id': str(user_id)}
+
+
+def batch_task(user_id, start_date):
+    """The task _chunks builds for a user, read from the API's repository."""
+    debts = [
+        (debt.id, debt.name, str(debt.principal), str(debt.apr), str(debt.min_payment),
+         debt.compounding, debt.payment_frequency)
+        for debt in api.repository.active_debts(user_id)
+    ]
+    return user_id, start_date, debts, api.repository.list_commitments(user_id)
+
+
+def seed(client, user_id, commitments):
+    ids = []
+    for name, principal, apr, minimum in [('Card', 8000, 21, 240), ('Loan', 20000, 9, 420)]:
+        response = client.post('/api/debts', headers=as_user(user_id), json={
+            'name': name, 'principal': principal, 'apr': apr, 'min_payment': minimum
+        })
+        ids.append(response.get_json()['debt_id'])
+    for commitment in commitments(ids):
+        assert client.post('/api/commitments', headers=as_user(user_id), json=commitment).status_code == 201
+    return ids
+
+
+def test_projection_matches_the_committed_simulation(client):
+    later = (date.today().replace(day=1) + timedelta(days=130)).strftime('%Y-%m')
+    seed(client, 601, lambda ids: [
+        {'amount': 300, 'strategy': 'snowball', 'custom_alloc': {str(ids[1]): 100}},
+        {'amount': 900, 'strategy': 'snowball', 'starts_on': later},
+    ])
+    
+    row = project_portfolio(batch_task(601, datetime.now()))
+    result = client.post('/api/calculate/simulate', headers=as_user(601),
+                         json={'use_commitments': True}).get_json()
+    
+    _, strategy, extra_payment, debt_count, _, _, months_to_zero, _, total_interest, cleared, _ = row
+    assert (strategy, extra_payment, debt_count, cleared) == ('snowball', Decimal('300'), 2, True)
+    assert months_to_zero == result['summary']['months_to_zero']
+    assert total_interest == Decimal(str(result['summary']['total_interest_paid'])).quantize(Decimal('0.01'))
+
+
+def test_future_commitment_is_not_applied_now(client):
+    later = (date.today().replace(day=1) + timedelta(days=400)).strftime('%Y-%m')
+    seed(client, 611, lambda ids: [{'amount': 2000, 'starts_on': later}])
+    seed(client, 612, lambda ids: [])
+    
+    scheduled = project_portfolio(batch_task(611, datetime.now()))
+    none = project_portfolio(batch_task(612, datetime.now()))
+    assert scheduled[1:3] == ('avalanche', Decimal('0'))
+    assert none[1:3] == ('avalanche', Decimal('0'))
+    # The commitment still shortens the plan once it starts
+    assert none[6] > scheduled[6] > 13
+
+
+def test_user_without_debts_is_cleared():
+    row = project_portfolio((621, datetime(2026, 1, 1), [], []))
+    assert row[3] == 0 and row[6] == 0 and row[9] is True
@@ -0,0 +1,74 @@
+"""Request counters, phase histograms and the quantiles the CLI reads back from them."""
+
+import time
+
+import pytest
+
+from services.request_metrics import (RequestMetrics, PhaseTimer, TimedRepository, parse_histograms,
+                                      quantile)
+
+
+def test_observations_render_as_cumulative_histograms():
+    metrics = RequestMetrics(buckets=(0.01, 0.1, 1.0))
+    for total in (0.005, 0.05, 0.05, 2.0):
+        metrics.observe('/api/debts', 'GET', 200, total, {'db': total / 2, 'compute': total / 2, 'serialize': 0.0})
+    metrics.observe('/api/debts', 'GET', 500, 0.5, {'db': 0.5, 'compute': 0.0, 'serialize': 0.0})
+    text = metrics.render()
+    
+    assert 'http_requests_total{endpoint="/api/debts",method="GET",status="200"} 4' in text
+    assert 'http_requests_total{endpoint="/api/debts",method="GET",status="500"} 1' in text
+    durations = parse_histograms(text, 'http_request_duration_seconds')
+    assert durations[(('endpoint', '/api/debts'), ('method', 'GET'))] == [
+        (0.01, 1.0), (0.1, 3.0), (1.0, 4.0), (float('inf'), 5.0)
+    ]
+    assert 'http_request_duration_seconds_sum{endpoint="/api/debts",method="GET"} 2.605000' in text
+    phases = parse_histograms(text, 'http_request_phase_seconds')
+    assert (('endpoint', '/api/debts'), ('method', 'GET'), ('phase', 'db')) in phases
+
+
+def test_label_values_are_escaped_and_parsed_back():
+    metrics = RequestMetrics(buckets=(1.0,))
+    metrics.observe('/odd "path"\\', 'GET', 200, 0.5, {})
+    (key,) = parse_histograms(metrics.render(), 'http_request_duration_seconds')
+    assert dict(key)['endpoint'] == '/odd "path"\\'
+
+
+def test_quantiles_interpolate_within_buckets():
+    buckets = [(0.1, 50.0), (0.2, 90.0), (0.4, 100.0), (float('inf'), 100.0)]
+    assert quantile(0.5, buckets) == pytest.approx(0.1)
+    assert quantile(0.7, buckets) == pytest.approx(0.15)
+    assert quantile(0.95, buckets) == pytest.approx(0.3)
+    assert quantile(0.5, []) is None
+
+
+def test_phase_timer_leaves_the_rest_to_compute():
+    timer = PhaseTimer()
+    with timer.phase('db'):
+        time.sleep(0.01)
+    total, phases = timer.finish()
+    assert set(phases) == {'db', 'compute', 'serialize'}
+    assert phases['db'] >= 0.01
+    assert phases['db'] + phases['compute'] + phases['serialize'] == pytest.approx(total)
+
+
+def test_timed_repository_books_calls_into_the_db_phase():
+    timer = PhaseTimer()
+    
+    class Slow:
+        name = 'slow'
+        
+        def fetch(self, value):
+            time.sleep(0.01)
+            return value
+    
+    repository = TimedRepository(Slow(), lambda: timer)
+    assert repository.fetch(3) == 3
+    assert repository.name == 'slow'
+    assert timer.phases['db'] >= 0.01
+
+
+def test_metrics_endpoint_counts_requests(client):
+    client.get('/api/health')
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'http_requests_total{endpoint="/api/health",method="GET",status="200"}' in text
+    assert 'phase="db"' in text
@@ -0,0 +1,73 @@
+"""
+simulate_summary against the full avalanche and snowball simulations: the
+same monthly rules, so the same summary.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+import random
+
+import pytest
+
+from services.payment_schedule import PaymentSchedule
+from services.simple_simulation_engine import SimpleSimulationEngine, SimpleDebt
+
+
+START = datetime(2025, 3, 14)
+
+
+def random_portfolio(rng):
+    return [
+        SimpleDebt(i, f'Debt {i}', Decimal(rng.randint(500, 40000)),
+                   Decimal(rng.choice(['0', '0.065', '0.125', '0.185', '0.27'])),
+                   Decimal(rng.randint(40, 700)),
+                   rng.choice(['monthly', 'daily', 'none']), rng.choice(['monthly', 'weekly']))
+        for i in range(1, rng.randint(2, 6) + 1)
+    ]
+
+
+def full_summary(engine, strategy, extra, schedule=None):
+    if strategy == 'snowball':
+        return engine.simulate_snowball(extra, schedule=schedule)['summary']
+    return engine.simulate_avalanche(extra, schedule=schedule)['summary']
+
+
+@pytest.mark.parametrize('strategy', ['avalanche', 'snowball'])
+def test_summary_matches_full_simulation(strategy):
+    rng = random.Random(11)
+    engine = SimpleSimulationEngine(start_date=START)
+    for _ in range(15):
+        engine.debts = random_portfolio(rng)
+        extra = Decimal(rng.choice([0, 150, 600]))
+        assert engine.simulate_summary(strategy, extra) == full_summary(engine, strategy, extra)
+
+
+@pytest.mark.parametrize('strategy', ['avalanche', 'snowball'])
+def test_summary_matches_full_simulation_with_schedule(strategy):
+    rng = random.Random(5)
+    engine = SimpleSimulationEngine(start_date=START)
+    for _ in range(10):
+        debts = random_portfolio(rng)
+        engine.debts = debts
+        schedule = PaymentSchedule.from_request([
+            {'type': 'extra_payment', 'month': 4, 'amount': 900},
+            {'type': 'bonus', 'month': 7, 'amount': 2500},
+            {'type': 'pause', 'month': 10, 'months': 2},
+            {'type': 'rate_change', 'month': 12, 'debt_id': debts[0].id, 'apr': 21.0},
+            {'type': 'allocation', 'month': 2, 'allocation': {str(debts[-1].id): 75}},
+            {'type': 'new_debt', 'month': 6,
+             'debt': {'id': 99, 'name': 'Store Card', 'principal': 3200, 'apr': 24.0, 'min_payment': 120}},
+        ], debts)
+        extra = Decimal(rng.choice([100, 400]))
+        assert engine.simulate_summary(strategy, extra, schedule=schedule) == \
+            full_summary(engine, strategy, extra, schedule)
+
+
+def test_summary_reports_plans_that_never_clear():
+    engine = SimpleSimulationEngine(start_date=START)
+    # The minimum doesn't cover the interest
+    engine.debts = [SimpleDebt(1, 'Loan', Decimal('50000'), Decimal('0.24'), Decimal('500'))]
+    summary = engine.simulate_summary('avalanche', Decimal('0'), max_months=120)
+    assert summary == engine.simulate_avalanche(Decimal('0'), max_months=120)['summary']
+    assert summary['debt_free_date'] is None
+    assert summary['final_total_balance'] > 50000
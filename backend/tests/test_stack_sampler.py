@@ -0,0 +1,123 @@
+"""The sampling profiler and the token-gated admin endpoints that drive it."""
+
+import threading
+import time
+
+import pytest
+
+import app as api
+from services.stack_sampler import StackSampler
+
+
+TOKEN = 'test-admin-token'
+
+
+def spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_samples_only_tracked_threads():
+    sampler = StackSampler(interval=0.002)
+    stop, registered = threading.Event(), threading.Event()
+    
+    def tracked():
+        sampler.track()
+        registered.set()
+        spin(stop)
+        sampler.untrack()
+    
+    threads = [threading.Thread(target=tracked), threading.Thread(target=spin, args=(stop,))]
+    for thread in threads:
+        thread.start()
+    registered.wait()
+    sampler.start()
+    time.sleep(0.1)
+    sampler.stop()
+    stop.set()
+    for thread in threads:
+        thread.join()
+    
+    stats = sampler.stats()
+    assert not stats['running']
+    assert stats['samples'] > 0
+    assert stats['stack_samples'] <= stats['samples']
+    lines = sampler.collapsed().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(' ', 1)
+        assert int(count) > 0
+        assert 'test_stack_sampler.py:test_samples_only_tracked_threads.<locals>.tracked' in stack
+    
+    sampler.reset()
+    assert sampler.collapsed() == ''
+    assert sampler.stats()['samples'] == 0
+
+
+def test_stacks_beyond_the_limit_are_dropped():
+    sampler = StackSampler(interval=0.002, max_stacks=1)
+    sampler.lines = True
+    stop = threading.Event()
+    
+    def tracked():
+        sampler.track()
+        spin(stop)
+    
+    thread = threading.Thread(target=tracked)
+    thread.start()
+    sampler.start()
+    time.sleep(0.1)
+    sampler.stop()
+    stop.set()
+    thread.join()
+    assert sampler.stats()['stacks'] == 1
+
+
+@pytest.fixture
+def admin(monkeypatch):
+    monkeypatch.setattr(api, 'ADMIN_TOKEN', TOKEN)
+    yield {'X-Admin-Token': TOKEN}
+    api.stack_sampler.stop()
+    api.stack_sampler.reset()
+
+
+@pytest.mark.parametrize('url', ['/api/admin/profiler', '/api/admin/profiler/stacks', '/api/admin/allocations'])
+def test_admin_endpoints_fail_closed_without_a_token(client, monkeypatch, url):
+    monkeypatch.setattr(api, 'ADMIN_TOKEN', None)
+    response = client.get(url, headers={'X-Admin-Token': ''})
+    assert response.status_code == 403
+    assert 'ADMIN_TOKEN is not set' in response.get_json()['error']
+
+
+def test_admin_endpoints_need_the_right_token(client, admin):
+    assert client.get('/api/admin/profiler').status_code == 403
+    assert client.get('/api/admin/profiler', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+    assert client.get('/api/admin/profiler', headers=admin).status_code == 200
+
+
+@pytest.mark.parametrize('interval_ms', [0, 5000, True, '10'])
+def test_invalid_interval_is_rejected(client, admin, interval_ms):
+    response = client.post('/api/admin/profiler', headers=admin, json={'enabled': True, 'interval_ms': interval_ms})
+    assert response.status_code == 400
+    assert not api.stack_sampler.running
+
+
+def test_profiler_samples_requests_between_start_and_stop(client, admin):
+    started = client.post('/api/admin/profiler', headers=admin, json={'enabled': True, 'interval_ms': 1}).get_json()
+    assert started['running'] and started['interval_ms'] == 1.0
+    
+    body = {'extra_payment': 100, 'debts': [
+        {'id': 1, 'name': 'Card', 'principal': 900000, 'apr': 19.9, 'min_payment': 15000}
+    ]}
+    deadline = time.perf_counter() + 5
+    while api.stack_sampler.stats()['stack_samples'] == 0 and time.perf_counter() < deadline:
+        client.post('/api/calculate/compare', headers={'X-User-Id': '961'}, json=body)
+    
+    stopped = client.post('/api/admin/profiler', headers=admin, json={'enabled': False}).get_json()
+    assert not stopped['running']
+    assert stopped['stack_samples'] > 0
+    
+    response = client.get('/api/admin/profiler/stacks?reset=true', headers=admin)
+    assert response.content_type.startswith('text/plain')
+    assert 'app.py:' in response.get_data(as_text=True)
+    assert client.get('/api/admin/profiler/stacks', headers=admin).get_data(as_text=True) == ''
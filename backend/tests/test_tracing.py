@@ -0,0 +1,163 @@
+"""Trace spans, W3C traceparent propagation and the rotating OTLP/JSON file exporter."""
+
+import json
+
+import pytest
+
+from services.tracing import Tracer, RotatingFileExporter, tracer, traced, SERVER, INTERNAL, STATUS_ERROR
+
+
+TRACE_ID = '4bf92f3577b34da6a3ce929d0e0e4736'
+PARENT_ID = '00f067aa0ba902b7'
+
+
+class ListExporter:
+    def __init__(self):
+        self.traces = []
+    
+    def export(self, spans):
+        self.traces.append([span.to_dict() for span in spans])
+
+
+@pytest.fixture
+def exporter():
+    return ListExporter()
+
+
+@pytest.fixture
+def local_tracer(exporter):
+    local = Tracer()
+    local.configure(exporter)
+    return local
+
+
+def test_off_until_configured():
+    local = Tracer()
+    assert not local.enabled
+    assert local.start_trace('GET /') is None
+    with local.span('work') as span:
+        assert span is None
+
+
+def test_child_spans_nest_under_the_current_span(local_tracer, exporter):
+    root = local_tracer.start_trace('POST /api/calculate/compare', {'http.method': 'POST'})
+    with local_tracer.span('simulate', strategy='avalanche', months=42) as simulate:
+        with local_tracer.span('sql'):
+            pass
+    local_tracer.end_trace(root)
+    assert local_tracer.current() is None
+    
+    (spans,) = exporter.traces
+    by_name = {span['name']: span for span in spans}
+    assert spans[-1]['name'] == 'POST /api/calculate/compare'
+    assert by_name['POST /api/calculate/compare']['kind'] == SERVER
+    assert 'parentSpanId' not in by_name['POST /api/calculate/compare']
+    assert by_name['simulate']['parentSpanId'] == root.span_id
+    assert by_name['sql']['parentSpanId'] == simulate.span_id
+    assert by_name['simulate']['kind'] == INTERNAL
+    assert {span['traceId'] for span in spans} == {root.trace.trace_id}
+    assert by_name['simulate']['attributes'] == [
+        {'key': 'strategy', 'value': {'stringValue': 'avalanche'}},
+        {'key': 'months', 'value': {'intValue': '42'}}
+    ]
+
+
+def test_errors_mark_the_span_and_propagate(local_tracer, exporter):
+    root = local_tracer.start_trace('GET /')
+    with pytest.raises(ValueError):
+        with local_tracer.span('parse'):
+            raise ValueError('bad amount')
+    local_tracer.end_trace(root, RuntimeError())
+    
+    parse, request_span = exporter.traces[0]
+    assert parse['status'] == {'code': STATUS_ERROR, 'message': 'bad amount'}
+    assert request_span['status'] == {'code': STATUS_ERROR, 'message': 'RuntimeError'}
+
+
+def test_traceparent_continues_the_callers_trace(local_tracer):
+    local_tracer.sample_rate = 0.0
+    root = local_tracer.start_trace('GET /', traceparent=f'00-{TRACE_ID}-{PARENT_ID}-01')
+    assert (root.trace.trace_id, root.parent_id) == (TRACE_ID, PARENT_ID)
+    local_tracer.end_trace(root)
+
+
+def test_traceparent_keeps_the_callers_sampling_decision(local_tracer):
+    assert local_tracer.start_trace('GET /', traceparent=f'00-{TRACE_ID}-{PARENT_ID}-00') is None
+
+
+def test_malformed_traceparent_starts_a_new_trace(local_tracer):
+    root = local_tracer.start_trace('GET /', traceparent=f'00-{TRACE_ID.upper()}-{PARENT_ID}-01')
+    assert root.trace.trace_id != TRACE_ID.upper()
+    assert root.parent_id is None
+    local_tracer.end_trace(root)
+
+
+def test_spans_beyond_the_limit_are_counted_not_kept(exporter):
+    local = Tracer()
+    local.configure(exporter, max_spans=3)
+    root = local.start_trace('GET /')
+    for _ in range(5):
+        with local.span('step'):
+            pass
+    local.end_trace(root)
+    
+    (spans,) = exporter.traces
+    assert len(spans) == 3
+    assert root.attributes['trace.dropped_spans'] == 3
+
+
+def test_traced_functions_only_record_inside_a_trace(monkeypatch, exporter):
+    monkeypatch.setattr(tracer, 'exporter', exporter)
+    monkeypatch.setattr(tracer, 'sample_rate', 1.0)
+    
+    @traced('double')
+    def double(value):
+        return value * 2
+    
+    assert double(2) == 4
+    root = tracer.start_trace('GET /')
+    assert double(3) == 6
+    tracer.end_trace(root)
+    assert [span['name'] for span in exporter.traces[0]] == ['double', 'GET /']
+
+
+def test_file_exporter_writes_one_otlp_line_per_trace_and_rotates(tmp_path):
+    path = tmp_path / 'traces' / 'spans.jsonl'
+    local = Tracer()
+    local.configure(RotatingFileExporter(str(path), max_bytes=2000, backups=2))
+    for _ in range(20):
+        root = local.start_trace('GET /api/debts', {'http.route': '/api/debts'})
+        with local.span('repository.active_debts'):
+            pass
+        local.end_trace(root)
+    
+    files = sorted(path.parent.iterdir())
+    assert [file.name for file in files] == ['spans.jsonl', 'spans.jsonl.1', 'spans.jsonl.2']
+    for file in files:
+        for line in file.read_text().splitlines():
+            (resource,) = json.loads(line)['resourceSpans']
+            assert resource['resource']['attributes'][0]['value'] == {'stringValue': 'financial-freedom-api'}
+            assert [span['name'] for span in resource['scopeSpans'][0]['spans']] == [
+                'repository.active_debts', 'GET /api/debts'
+            ]
+
+
+def test_requests_are_traced_end_to_end(client, monkeypatch, exporter):
+    monkeypatch.setattr(tracer, 'exporter', exporter)
+    monkeypatch.setattr(tracer, 'sample_rate', 1.0)
+    body = {'extra_payment': 100, 'debts': [
+        {'id': 1, 'name': 'Card', 'principal': 5000, 'apr': 19.9, 'min_payment': 150}
+    ]}
+    response = client.post('/api/calculate/compare', json=body,
+                           headers={'X-User-Id': '981', 'traceparent': f'00-{TRACE_ID}-{PARENT_ID}-01'})
+    assert response.status_code == 200
+    
+    (spans,) = exporter.traces
+    root = spans[-1]
+    assert root['name'] == 'POST /api/calculate/compare'
+    assert (root['traceId'], root['parentSpanId']) == (TRACE_ID, PARENT_ID)
+    attributes = {item['key']: item['value'] for item in root['attributes']}
+    assert attributes['http.status_code'] == {'intValue': '200'}
+    assert attributes['enduser.id'] == {'stringValue': '981'}
+    assert response.headers['traceparent'] == f"00-{TRACE_ID}-{root['spanId']}-01"
+    assert 'serialize' in {span['name'] for span in spans}
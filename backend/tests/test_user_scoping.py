@@ -0,0 +1,66 @@
+"""Every endpoint works on one user's data, named by a trusted X-User-Id header."""
+
+import app as api
+
+
+def as_user(user_id):
+    return {'X-User-Id': str(user_id)}
+
+
+def create_debt(client, user_id, name):
+    response = client.post('/api/debts', headers=as_user(user_id), json={
+        'name': name, 'principal': 5000, 'apr': 15, 'min_payment': 150
+    })
+    assert response.status_code == 201
+    return response.get_json()['debt_id']
+
+
+def test_requests_without_a_header_use_the_default_user(client):
+    names = {debt['name'] for debt in client.get('/api/debts').get_json()['debts']}
+    assert {'Credit Card', 'Car Loan', 'Personal Loan', 'Student Loan'} <= names
+    assert client.get('/api/debts', headers=as_user(api.DEFAULT_USER_ID)).get_json()['debts']
+
+
+def test_header_is_refused_unless_trusted(client, monkeypatch):
+    monkeypatch.setattr(api, 'TRUST_USER_HEADER', False)
+    assert client.get('/api/debts', headers=as_user(501)).status_code == 403
+    assert client.get('/api/debts').status_code == 200
+
+
+def test_invalid_header_is_rejected(client):
+    assert client.get('/api/debts', headers={'X-User-Id': 'admin'}).status_code == 400
+
+
+def test_other_users_debts_are_not_found(client):
+    debt_id = create_debt(client, 511, 'Overdraft')
+    
+    assert client.get(f'/api/debts/{debt_id}', headers=as_user(512)).status_code == 404
+    assert client.put(f'/api/debts/{debt_id}', headers=as_user(512), json={'principal': 1}).status_code == 404
+    assert client.delete(f'/api/debts/{debt_id}', headers=as_user(512)).status_code == 404
+    assert client.get(f'/api/debts/{debt_id}/amortization', headers=as_user(512)).status_code == 404
+    
+    response = client.get(f'/api/debts/{debt_id}', headers=as_user(511))
+    assert response.get_json()['debt']['principal'] == 5000
+    assert [debt['id'] for debt in client.get('/api/debts', headers=as_user(511)).get_json()['debts']] == [debt_id]
+
+
+def test_calculations_use_only_the_users_debts(client):
+    create_debt(client, 521, 'Store Card')
+    response = client.post('/api/calculate/avalanche', headers=as_user(521), json={'extra_payment': 100})
+    assert response.status_code == 200
+    assert {debt['name'] for debt in response.get_json()['simulation_results'][0]['debts']} == {'Store Card'}
+    
+    response = client.post('/api/calculate/avalanche', headers=as_user(522), json={'extra_payment': 100})
+    assert response.status_code == 400
+
+
+def test_snapshots_are_scoped_to_the_user(client):
+    create_debt(client, 531, 'Loan')
+    response = client.post('/api/snapshots', headers=as_user(531), json={'name': 'Plan A'})
+    assert response.status_code == 201
+    snapshot_id = response.get_json()['id']
+    
+    assert client.get(f'/api/snapshots/{snapshot_id}', headers=as_user(532)).status_code == 404
+    assert client.delete(f'/api/snapshots/{snapshot_id}', headers=as_user(532)).status_code == 404
+    assert client.get('/api/snapshots', headers=as_user(532)).get_json()['snapshots'] == []
+    assert [s['id'] for s in client.get('/api/snapshots', headers=as_user(531)).get_json()['snapshots']] == [snapshot_id]
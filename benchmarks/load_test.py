@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Load test
+Replays the dashboard's request mix against the API and reports latency.
+
+By default the API is started in this process on the in-memory repository
+(no MySQL needed), seeded with synthetic portfolios for `--users` users and
+served over HTTP by a threaded server on a free local port. Each worker keeps
+one keep-alive connection, picks a random user and a weighted dashboard call
+(debts, summary, compare, timeline, balance trend, impact) and records its
+latency; throughput and p50/p95/p99 per endpoint are printed at the end.
+
+Pass --url to load an API that is already running instead (for example under
+gunicorn, or on MySQL); its synthetic users are then created through the bulk
+debt endpoint, so point it at a database you can throw away, and start it
+with TRUST_USER_HEADER=1 so it accepts the synthetic users' X-User-Id headers.
+    
+    python benchmarks/load_test.py --users 200 --concurrency 16 --requests 5000
+"""
+
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import random
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+
+# First synthetic user id, clear of the sample data seeded for the default user
+FIRST_USER_ID = 1000
+
+EXTRA_PAYMENTS = (0, 250, 500, 1000, 2000)
+
+# (name, method, path, body builder, weight): a dashboard load fetches the
+# debts and summary, then the charts and strategy cards recalculate
+DASHBOARD_MIX = [
+    ('debts', 'GET', '/api/debts', None, 20),
+    ('summary', 'GET', '/api/debts/summary', None, 20),
+    ('compare', 'POST', '/api/calculate/compare',
+     lambda rng: {'extra_payment': rng.choice(EXTRA_PAYMENTS)}, 15),
+    ('timeline', 'POST', '/api/analytics/timeline',
+     lambda rng: {'strategy': rng.choice(('avalanche', 'snowball')), 'extra_payment': rng.choice(EXTRA_PAYMENTS)}, 15),
+    ('balance_trend', 'POST', '/api/analytics/balance-trend',
+     lambda rng: {'strategy': rng.choice(('avalanche', 'snowball')), 'extra_payment': rng.choice(EXTRA_PAYMENTS)}, 15),
+    ('impact', 'POST', '/api/calculate/impact',
+     lambda rng: {'base_extra': rng.choice(EXTRA_PAYMENTS), 'additional_extra': 500}, 15)
+]
+
+
+def synthetic_portfolio(rng: random.Random, max_debts: int = 12) -> List[Dict[str, Any]]:
+    """
+    A household's debts: log-normal balances, APRs from 5% to 28% and
+    minimums that always cover the month's interest.
+    """
+    debts = []
+    for index in range(rng.randint(1, max_debts)):
+        principal = round(min(rng.lognormvariate(9.8, 1.0), 2000000), 2)
+        apr = round(rng.uniform(5, 28), 2)
+        min_payment = round(principal * (apr / 1200 + rng.uniform(0.01, 0.03)), 2)
+        debts.append({
+            'name': f'Debt {index + 1}',
+            'principal': principal,
+            'apr': apr,
+            'min_payment': max(min_payment, 50.0)
+        })
+    return debts
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class LoadTest:
+    """Weighted request mix replayed by a pool of workers against one base URL."""
+    
+    def __init__(self, base_url: str, user_ids: List[int], mix=DASHBOARD_MIX, seed: int = 1):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.user_ids = user_ids
+        self.mix = mix
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._samples = {name: [] for name, *_ in mix}
+        self._errors = {name: 0 for name, *_ in mix}
+    
+    def run(self, concurrency: int, requests: Optional[int] = None,
+            duration: Optional[float] = None) -> Dict[str, Any]:
+        """Send `requests` calls in total, or keep going for `duration` seconds."""
+        remaining = [requests if requests is not None else float('inf')]
+        deadline = time.perf_counter() + duration if duration else None
+        
+        def take() -> bool:
+            if deadline and time.perf_counter() >= deadline:
+                return False
+            with self._lock:
+                if remaining[0] <= 0:
+                    return False
+                remaining[0] -= 1
+                return True
+        
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            workers = [pool.submit(self._worker, random.Random(self.seed * 1000 + worker), take)
+                       for worker in range(concurrency)]
+            for worker in workers:
+                worker.result()
+        return self.report(time.perf_counter() - started)
+    
+    def _worker(self, rng: random.Random, take: Callable[[], bool]):
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        names = [name for name, *_ in self.mix]
+        weights = [weight for *_, weight in self.mix]
+        calls = {name: (method, path, body) for name, method, path, body, _ in self.mix}
+        
+        try:
+            while take():
+                name = rng.choices(names, weights)[0]
+                method, path, body = calls[name]
+                payload = json.dumps(body(rng)) if body else None
+                headers = {'X-User-Id': str(rng.choice(self.user_ids))}
+                if payload is not None:
+                    headers['Content-Type'] = 'application/json'
+                
+                started = time.perf_counter()
+                try:
+                    connection.request(method, self.prefix + path, payload, headers)
+                    response = connection.getresponse()
+                    response.read()
+                    failed = response.status >= 400
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    failed = True
+                elapsed = time.perf_counter() - started
+                
+                with self._lock:
+                    self._samples[name].append(elapsed)
+                    if failed:
+                        self._errors[name] += 1
+        finally:
+            connection.close()
+    
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        """Throughput and latency percentiles (ms) per endpoint and overall."""
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+            errors = dict(self._errors)
+        
+        def stats(values: List[float], failed: int) -> Dict[str, Any]:
+            return {
+                'requests': len(values),
+                'errors': failed,
+                'rps': round(len(values) / elapsed, 1) if elapsed else 0.0,
+                'p50_ms': round(percentile(values, 0.50) * 1000, 2),
+                'p95_ms': round(percentile(values, 0.95) * 1000, 2),
+                'p99_ms': round(percentile(values, 0.99) * 1000, 2),
+                'max_ms': round(values[-1] * 1000, 2) if values else 0.0
+            }
+        
+        return {
+            'elapsed_seconds': round(elapsed, 2),
+            'endpoints': {name: stats(values, errors[name]) for name, values in samples.items() if values},
+            'total': stats(sorted(v for values in samples.values() for v in values), sum(errors.values()))
+        }
+
+
+def start_local_api(repository: str, users: int, max_debts: int, seed: int) -> Tuple[str, List[int], Any]:
+    """Serve the API from this process on a free port, with synthetic users seeded directly."""
+    os.environ['REPOSITORY'] = repository
+    os.environ['TRUST_USER_HEADER'] = '1'
+    import app as api
+    from werkzeug.serving import make_server, WSGIRequestHandler
+    
+    class KeepAliveHandler(WSGIRequestHandler):
+        protocol_version = 'HTTP/1.1'
+    
+    rng = random.Random(seed)
+    user_ids = list(range(FIRST_USER_ID, FIRST_USER_ID + users))
+    for user_id in user_ids:
+        api.repository.create_debts(user_id, synthetic_portfolio(rng, max_debts))
+    
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, api.app, threaded=True, request_handler=KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}', user_ids, server
+
+
+def seed_remote_api(base_url: str, users: int, max_debts: int, seed: int) -> List[int]:
+    """Create the synthetic users' debts through the bulk endpoint of a running API."""
+    parts = urlsplit(base_url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+    rng = random.Random(seed)
+    user_ids = list(range(FIRST_USER_ID, FIRST_USER_ID + users))
+    for user_id in user_ids:
+        body = json.dumps({'debts': synthetic_portfolio(rng, max_debts)})
+        connection.request('POST', parts.path.rstrip('/') + '/api/debts/bulk', body,
+                           {'Content-Type': 'application/json', 'X-User-Id': str(user_id)})
+        response = connection.getresponse()
+        response.read()
+        if response.status != 201:
+            raise RuntimeError(f'Seeding user {user_id} failed with HTTP {response.status}')
+    connection.close()
+    return user_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay the dashboard request mix and report latency.')
+    parser.add_argument('--url', help='Base URL of a running API (default: start one in-process)')
+    parser.add_argument('--repository', default='memory', help='Repository for the in-process API')
+    parser.add_argument('--users', type=int, default=100, help='Synthetic users to seed')
+    parser.add_argument('--max-debts', type=int, default=12, help='Most debts per synthetic portfolio')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent workers')
+    parser.add_argument('--requests', type=int, default=2000, help='Total requests to send')
+    parser.add_argument('--duration', type=float, help='Run for this many seconds instead of --requests')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for portfolios and the mix')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+    
+    server = None
+    if args.url:
+        base_url = args.url
+        user_ids = seed_remote_api(base_url, args.users, args.max_debts, args.seed)
+    else:
+        base_url, user_ids, server = start_local_api(args.repository, args.users, args.max_debts, args.seed)
+    
+    try:
+        report = LoadTest(base_url, user_ids, seed=args.seed).run(
+            args.concurrency, None if args.duration else args.requests, args.duration
+        )
+    finally:
+        if server:
+            server.shutdown()
+    
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    
+    print(f'{len(user_ids)} users, {args.concurrency} workers, {report["elapsed_seconds"]}s against {base_url}')
+    print(f'{"endpoint":<16} {"requests":>9} {"errors":>7} {"rps":>8} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"max ms":>9}')
+    for name, stats in list(report['endpoints'].items()) + [('total', report['total'])]:
+        print(f'{name:<16} {stats["requests"]:>9} {stats["errors"]:>7} {stats["rps"]:>8} {stats["p50_ms"]:>9} '
+              f'{stats["p95_ms"]:>9} {stats["p99_ms"]:>9} {stats["max_ms"]:>9}')
+
+
+if __name__ == '__main__':
+    main()
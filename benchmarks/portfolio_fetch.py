@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Portfolio fetch benchmark
+Seeds up to 100k users into a scratch MySQL database and checks that fetching
+one user's portfolio stays flat as the number of users grows.
+
+Uses the same MYSQL_* environment variables as the API. The scratch database
+(financial_freedom_bench by default) is created from database/init.sql and
+dropped again unless --keep is given.
+    
+    python benchmarks/portfolio_fetch.py --users 100000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import mysql.connector
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+FETCH_QUERY = """
+    SELECT id, name, principal, apr, min_payment, payment_frequency, 
+           compounding, status
+    FROM debts 
+    WHERE user_id = %s AND status = 'active'
+"""
+
+
+def connect(database=None):
+    """Connect with the API's environment configuration."""
+    config = {
+        'host': os.getenv('MYSQL_HOST', 'localhost'),
+        'port': int(os.getenv('MYSQL_PORT', 3306)),
+        'user': os.getenv('MYSQL_USER', 'financial_user'),
+        'password': os.getenv('MYSQL_PASSWORD', 'financial_pass')
+    }
+    if database:
+        config['database'] = database
+    return mysql.connector.connect(**config)
+
+
+def create_schema(cursor, database):
+    """Create the scratch database from init.sql, without its sample rows."""
+    cursor.execute(f"DROP DATABASE IF EXISTS {database}")
+    cursor.execute(f"CREATE DATABASE {database}")
+    cursor.execute(f"USE {database}")
+    
+    with open(os.path.join(ROOT, 'database', 'init.sql')) as handle:
+        script = handle.read()
+    for statement in script.split(';'):
+        lines = [line for line in statement.splitlines() if not line.strip().startswith('--')]
+        statement = '\n'.join(lines).strip()
+        if statement.upper().startswith(('CREATE TABLE', 'CREATE INDEX')):
+            cursor.execute(statement)
+
+
+def seed_users(connection, first_user, last_user, debts_per_user, chunk=5000):
+    """Insert users first_user..last_user with their debts, one transaction per chunk."""
+    cursor = connection.cursor()
+    for start in range(first_user, last_user + 1, chunk):
+        end = min(start + chunk - 1, last_user)
+        cursor.executemany(
+            "INSERT INTO users (id, name, email) VALUES (%s, %s, %s)",
+            [(user_id, f'User {user_id}', f'user{user_id}@bench.local') for user_id in range(start, end + 1)]
+        )
+        debts = []
+        for user_id in range(start, end + 1):
+            for n in range(debts_per_user):
+                debts.append((
+                    user_id, f'Debt {n + 1}',
+                    round(random.uniform(1000, 250000), 2),
+                    round(random.uniform(5, 25), 2),
+                    round(random.uniform(100, 3000), 2),
+                    'active' if n else 'paid'
+                ))
+        cursor.executemany("""
+            INSERT INTO debts (user_id, name, principal, apr, min_payment, status)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, debts)
+        connection.commit()
+    cursor.close()
+
+
+def measure(connection, users, samples):
+    """Latency percentiles (ms) of the scoped portfolio fetch for random users."""
+    cursor = connection.cursor()
+    timings = []
+    for _ in range(samples):
+        user_id = random.randint(1, users)
+        started = time.perf_counter()
+        cursor.execute(FETCH_QUERY, (user_id,))
+        cursor.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    
+    cursor.execute("EXPLAIN " + FETCH_QUERY, (1,))
+    columns = [column[0] for column in cursor.description]
+    plan = dict(zip(columns, cursor.fetchone()))
+    cursor.close()
+    
+    timings.sort()
+    return {
+        'p50': statistics.median(timings),
+        'p95': timings[int(len(timings) * 0.95) - 1],
+        'p99': timings[int(len(timings) * 0.99) - 1],
+        'index': plan.get('key'),
+        'rows': plan.get('rows')
+    }
+
+
+def measure_endpoint(database, users, samples):
+    """Latency percentiles (ms) of GET /api/debts through the Flask app."""
+    os.environ['MYSQL_DB'] = database
+    os.environ['TRUST_USER_HEADER'] = '1'
+    import app as api
+    api.DB_CONFIG['database'] = database
+    client = api.app.test_client()
+    
+    timings = []
+    for _ in range(samples):
+        user_id = random.randint(1, users)
+        started = time.perf_counter()
+        response = client.get('/api/debts', headers={'X-User-Id': str(user_id)})
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.get_json()
+    
+    timings.sort()
+    return {'p50': statistics.median(timings), 'p95': timings[int(len(timings) * 0.95) - 1]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--checkpoints', default='1000,10000,100000',
+                        help='User counts at which latency is measured')
+    parser.add_argument('--debts-per-user', type=int, default=5)
+    parser.add_argument('--samples', type=int, default=1000)
+    parser.add_argument('--database', default='financial_freedom_bench')
+    parser.add_argument('--endpoint', action='store_true', help='Also time GET /api/debts')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch database')
+    args = parser.parse_args()
+    
+    checkpoints = sorted({int(c) for c in args.checkpoints.split(',') if int(c) <= args.users} | {args.users})
+    random.seed(42)
+    
+    connection = connect()
+    cursor = connection.cursor()
+    create_schema(cursor, args.database)
+    cursor.close()
+    connection.close()
+    
+    connection = connect(args.database)
+    results = []
+    seeded = 0
+    try:
+        for users in checkpoints:
+            started = time.perf_counter()
+            seed_users(connection, seeded + 1, users, args.debts_per_user)
+            seeded = users
+            result = measure(connection, users, args.samples)
+            result['users'] = users
+            result['seed_seconds'] = time.perf_counter() - started
+            if args.endpoint:
+                endpoint = measure_endpoint(args.database, users, args.samples)
+                result['endpoint_p50'] = endpoint['p50']
+                result['endpoint_p95'] = endpoint['p95']
+            results.append(result)
+            print(f"{users:>8} users  p50 {result['p50']:.3f} ms  p95 {result['p95']:.3f} ms  "
+                  f"p99 {result['p99']:.3f} ms  index {result['index']}  rows {result['rows']}"
+                  + (f"  endpoint p50 {result['endpoint_p50']:.3f} ms" if args.endpoint else ''))
+    finally:
+        connection.close()
+        if not args.keep:
+            connection = connect()
+            connection.cursor().execute(f"DROP DATABASE IF EXISTS {args.database}")
+            connection.close()
+    
+    growth = results[-1]['p95'] / results[0]['p95'] if results[0]['p95'] else 1
+    print(f"p95 grew {growth:.2f}x from {results[0]['users']} to {results[-1]['users']} users")
+    return 0 if growth < 2 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -53,6 +53,7 @@ CREATE TABLE commitments (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     strategy ENUM('avalanche', 'snowball', 'hybrid', 'custom') DEFAULT 'avalanche',
     custom_alloc JSON,
+    starts_on DATE,  -- month the commitment takes effect; NULL means from created_at
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
@@ -63,21 +64,60 @@ CREATE TABLE plan_snapshots (
     name VARCHAR(255) NOT NULL,
     snapshot_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     json_state JSON NOT NULL,
+    ledger MEDIUMBLOB,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Plan trajectories table - persisted month-by-month plan, rolled forward as months close
+CREATE TABLE plan_trajectories (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT,
+    strategy ENUM('avalanche', 'snowball') DEFAULT 'avalanche',
+    extra_payment DECIMAL(10,2) NOT NULL DEFAULT 0,
+    anchor_month DATE NOT NULL,
+    closed_through DATE,
+    portfolio_signature CHAR(40) NOT NULL,
+    trajectory JSON NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Projections table - payoff projection per user, recomputed by the batch job
+-- (python -m services.projection_batch) and read by the summary endpoint
+CREATE TABLE projections (
+    user_id INT PRIMARY KEY,
+    strategy ENUM('avalanche', 'snowball') DEFAULT 'avalanche',
+    extra_payment DECIMAL(10,2) NOT NULL DEFAULT 0,
+    debt_count INT NOT NULL,
+    total_balance DECIMAL(14,2) NOT NULL,
+    total_min_payments DECIMAL(12,2) NOT NULL,
+    months_to_zero INT NOT NULL,
+    debt_free_date DATE,
+    total_interest DECIMAL(16,2) NOT NULL,
+    cleared BOOLEAN NOT NULL,
+    computed_at TIMESTAMP NOT NULL,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
 -- Indexes for performance
-CREATE INDEX idx_debts_user_id ON debts(user_id);
-CREATE INDEX idx_debts_status ON debts(status);
-CREATE INDEX idx_payments_debt_id ON payments(debt_id);
-CREATE INDEX idx_payments_user_id ON payments(user_id);
-CREATE INDEX idx_payments_date ON payments(payment_date);
-CREATE INDEX idx_commitments_user_id ON commitments(user_id);
-CREATE INDEX idx_snapshots_user_id ON plan_snapshots(user_id);
+-- Every query is scoped by user, so user_id leads each composite index
+-- (it also serves the user_id foreign keys).
+CREATE INDEX idx_debts_user_status ON debts(user_id, status);
+CREATE INDEX idx_debts_user_created ON debts(user_id, created_at);
+CREATE INDEX idx_payments_user_date ON payments(user_id, payment_date);
+CREATE INDEX idx_payments_debt_date ON payments(debt_id, payment_date);
+CREATE INDEX idx_commitments_user_created ON commitments(user_id, created_at);
+CREATE INDEX idx_snapshots_user_date ON plan_snapshots(user_id, snapshot_date);
+CREATE INDEX idx_trajectories_user_updated ON plan_trajectories(user_id, updated_at);
+
+-- Default household for single-user installs (requests without X-User-Id);
+-- existing installs get it, and their unscoped rows, from migrate_user_scoping.sql
+INSERT INTO users (id, name, email) VALUES (1, 'Default User', 'user@localhost');
 
 -- Insert sample data for testing (optional)
-INSERT INTO debts (name, principal, apr, min_payment, payment_frequency, compounding, notes) VALUES
-('Credit Card', 15000.00, 18.50, 300.00, 'monthly', 'monthly', 'High interest credit card debt'),
-('Car Loan', 45000.00, 8.75, 650.00, 'monthly', 'monthly', 'Vehicle financing'),
-('Personal Loan', 25000.00, 12.25, 400.00, 'monthly', 'monthly', 'Bank personal loan'),
-('Student Loan', 35000.00, 6.50, 280.00, 'monthly', 'monthly', 'Education debt');
+INSERT INTO debts (user_id, name, principal, apr, min_payment, payment_frequency, compounding, notes) VALUES
+(1, 'Credit Card', 15000.00, 18.50, 300.00, 'monthly', 'monthly', 'High interest credit card debt'),
+(1, 'Car Loan', 45000.00, 8.75, 650.00, 'monthly', 'monthly', 'Vehicle financing'),
+(1, 'Personal Loan', 25000.00, 12.25, 400.00, 'monthly', 'monthly', 'Bank personal loan'),
+(1, 'Student Loan', 35000.00, 6.50, 280.00, 'monthly', 'monthly', 'Education debt');
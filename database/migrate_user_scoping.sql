@@ -0,0 +1,35 @@
+-- Migrate a database created before per-user scoping
+-- Run once against an existing install (fresh installs get this from init.sql):
+--     mysql -u root -p financial_freedom < database/migrate_user_scoping.sql
+--
+-- Rows written before scoping have no user_id. Every query now filters on
+-- user_id, so they are assigned to the default household; set
+-- @default_user_id to the backend's DEFAULT_USER_ID if it isn't 1.
+
+USE financial_freedom;
+
+SET @default_user_id = 1;
+
+INSERT IGNORE INTO users (id, name, email) VALUES (@default_user_id, 'Default User', 'user@localhost');
+
+UPDATE debts SET user_id = @default_user_id WHERE user_id IS NULL;
+UPDATE payments SET user_id = @default_user_id WHERE user_id IS NULL;
+UPDATE commitments SET user_id = @default_user_id WHERE user_id IS NULL;
+UPDATE plan_snapshots SET user_id = @default_user_id WHERE user_id IS NULL;
+
+-- Composite indexes led by user_id replace the single-column ones
+-- (created first, as they take over serving the foreign keys)
+CREATE INDEX idx_debts_user_status ON debts(user_id, status);
+CREATE INDEX idx_debts_user_created ON debts(user_id, created_at);
+CREATE INDEX idx_payments_user_date ON payments(user_id, payment_date);
+CREATE INDEX idx_payments_debt_date ON payments(debt_id, payment_date);
+CREATE INDEX idx_commitments_user_created ON commitments(user_id, created_at);
+CREATE INDEX idx_snapshots_user_date ON plan_snapshots(user_id, snapshot_date);
+
+DROP INDEX idx_debts_user_id ON debts;
+DROP INDEX idx_debts_status ON debts;
+DROP INDEX idx_payments_debt_id ON payments;
+DROP INDEX idx_payments_user_id ON payments;
+DROP INDEX idx_payments_date ON payments;
+DROP INDEX idx_commitments_user_id ON commitments;
+DROP INDEX idx_snapshots_user_id ON plan_snapshots;
@@ -62,6 +62,16 @@ export const getDebt = async (debtId) => {
   }
 };
 
+export const getDebtAmortization = async (debtId, params = {}) => {
+  try {
+    const response = await api.get(`/api/debts/${debtId}/amortization`, { params });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching debt amortization:', error);
+    throw error;
+  }
+};
+
 export const createDebt = async (debtData) => {
   try {
     const response = await api.post('/api/debts', debtData);